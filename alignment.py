@@ -0,0 +1,143 @@
+# ============================================================
+# LapVis v2 — Telemetry Engine
+# Distance Alignment: shared distance grid + batch resampler
+# ============================================================
+
+import logging
+
+import numpy as np
+
+from kernels import batch_interp
+from telemetry import MissingTelemetry, driver_arrays, lap_telemetry
+
+log = logging.getLogger(__name__)
+
+# Channels carried for every lap of a session
+LAP_CHANNELS = ('Speed', 'Throttle', 'Brake')
+FIELD_CHANNELS = ('Distance', 'Time', 'X', 'Y', 'BrakeOnset') + LAP_CHANNELS
+
+
+def lap_arrays(lap, arrays=None):
+    """
+    Extract the raw NumPy arrays of a single lap (native merge engine).
+    Time is in seconds from the start of the lap, Distance in metres.
+    """
+    tel = lap_telemetry(lap, arrays)
+    return {ch: np.asarray(tel[ch], dtype=float) for ch in FIELD_CHANNELS}
+
+
+def session_lap_arrays(session):
+    """
+    Arrays for every timed lap of a session (in/out laps excluded).
+
+    Returns a dict with one entry per lap:
+        Driver, LapNumber, Stint, LapTime (s) -> 1-D arrays
+        Laps                                  -> list of lap_arrays() dicts
+    """
+    laps = session.laps.pick_wo_box()
+    laps = laps[laps['LapTime'].notna()]
+
+    drivers, numbers, stints, times, arrays = [], [], [], [], []
+    raw, skipped = {}, []
+    for _, lap in laps.iterlaps():
+        drv = lap['DriverNumber']
+        try:
+            if drv not in raw:
+                raw[drv] = driver_arrays(session, drv)
+            tel = lap_arrays(lap, raw[drv])
+        except MissingTelemetry as e:
+            skipped.append(f"{lap['Driver']} lap {int(lap['LapNumber'])}: {e}")
+            continue
+        if len(tel['Distance']) < 2:
+            skipped.append(f"{lap['Driver']} lap {int(lap['LapNumber'])}: under 2 samples")
+            continue
+
+        drivers.append(lap['Driver'])
+        numbers.append(int(lap['LapNumber']))
+        stints.append(0 if np.isnan(lap['Stint']) else int(lap['Stint']))
+        times.append(lap['LapTime'].total_seconds())
+        arrays.append(tel)
+
+    if skipped:
+        log.warning("skipped %d laps without telemetry: %s", len(skipped), "; ".join(skipped))
+    return {
+        'Driver': np.array(drivers),
+        'LapNumber': np.array(numbers, dtype=int),
+        'Stint': np.array(stints, dtype=int),
+        'LapTime': np.array(times, dtype=float),
+        'Laps': arrays,
+    }
+
+
+# --------------------------------------------------------
+# Shared distance grid
+# --------------------------------------------------------
+def reference_length(laps):
+    """Median integrated lap length (m) — the length of the shared grid."""
+    return float(np.median([lap['Distance'][-1] for lap in laps]))
+
+
+def distance_grid(length, step=5.0):
+    """Evenly spaced distance axis from 0 to `length` metres."""
+    n = max(int(np.ceil(length / step)), 1) + 1
+    return np.linspace(0.0, length, n)
+
+
+def _scaled_distance(lap, length):
+    # Each lap integrates to a slightly different length — stretch it onto
+    # the shared grid so the same index means the same place on track
+    d = lap['Distance']
+    if d[-1] <= 0:
+        return d
+    return d * (length / d[-1])
+
+
+# --------------------------------------------------------
+# Batch resampler
+# --------------------------------------------------------
+def stack_laps(laps, grid, channels=LAP_CHANNELS):
+    """
+    Resample N laps onto the shared grid.
+    Returns {channel: (N, len(grid)) array}.
+    """
+    length = grid[-1]
+    distances = [_scaled_distance(lap, length) for lap in laps]
+
+    return {ch: batch_interp(grid, distances, [lap[ch] for lap in laps])
+            for ch in channels}
+
+
+def stack_lap_times(laps, grid, lap_times):
+    """
+    Elapsed lap time (s) at every grid point for N laps, shape (N, len(grid)).
+    Each lap is pinned to 0 s at the line and to its official lap time at the
+    finish, so sums over any split of the grid add up to the lap time.
+    """
+    length = grid[-1]
+    out = np.empty((len(laps), len(grid)))
+
+    for row, (lap, lap_time) in enumerate(zip(laps, lap_times)):
+        t = np.maximum.accumulate(np.clip(lap['Time'], 0.0, lap_time))
+        out[row] = np.interp(grid, _scaled_distance(lap, length), t)
+
+    out[:, 0] = 0.0
+    out[:, -1] = lap_times
+
+    return out
+
+
+def percentile_bands(stack, q=(10, 50, 90)):
+    """
+    Percentiles of a (laps, grid) stack along the lap axis in one call.
+    Returns shape (len(q), grid).
+    """
+    return np.percentile(stack, q, axis=0)
+
+
+def time_delta(ref, other):
+    """
+    Time delta (s) of `other` relative to `ref` at every sample of `ref`,
+    aligned by distance. Positive = `other` is behind.
+    """
+    t_other = np.interp(ref['Distance'], other['Distance'], other['Time'])
+    return t_other - ref['Time']
@@ -2,29 +2,35 @@
 # LapVis — F1 Telemetry Intelligence Dashboard
 # ================================================================
 
+import time
+_T0 = time.perf_counter()
+
 import os
 import streamlit as st
-import fastf1
-import matplotlib.pyplot as plt
-import matplotlib.patheffects as pe
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 import numpy as np
-import plotly.graph_objects as go
 
-# --------------------------------------------------
-# FASTF1 CACHE (ONLY ONCE)
-# --------------------------------------------------
-CACHE_DIR = "fastf1_cache"
-os.makedirs(CACHE_DIR, exist_ok=True)
-fastf1.Cache.enable_cache(CACHE_DIR)
-
-# -------------------------------------------------------
-# Warm up FastF1 engine (removes first load lag)
-# -------------------------------------------------------
-if "engine_warm" not in st.session_state:
-    with st.spinner("Warming telemetry engine..."):
-        warm = fastf1.get_session(2023, "Monaco", "Q")
-        warm.load(laps=False, telemetry=False)
-    st.session_state.engine_warm = True
+import catalog
+from alignment import session_lap_arrays, time_delta
+from comparison import compare, load_parallel
+from consistency import consistency_envelope
+from downsample import POINTS, visible, visible_series
+from export import FORMATS, comparison_columns, session_columns, to_arrow, to_bytes
+from insights import all_panels, strategy_prediction
+from laptable import TABLE_PATH, load_table, query
+from minisectors import analyse_minisectors, minisector_of
+from perf import FIRST_PAINT_BUDGET_MS, elapsed_ms, graph_timings, lazy_module, tracked
+from racetimeline import minisector_timeline, race_timeline
+from scanning import scan_session, segments_for, summary
+from scheduler import Graph, summarize
+from season import METRICS, SEASON_PATH, circuit_table, driver_summary, leaderboard, load_aggregates
+from sharedcache import cache_key, get_or_compute, shared_store
+from telemetry import lap_telemetry
+
+# Rendering libraries are only imported when the first view draws
+fastf1 = lazy_module("fastf1")
+plt = lazy_module("matplotlib.pyplot")
+go = lazy_module("plotly.graph_objects")
 
 # --------------------------------------------------
 # STREAMLIT PAGE SETUP (ONLY ONCE)
@@ -130,32 +136,135 @@ label {
 </style>
 """, unsafe_allow_html=True)
 
-# --------------------------------------------------
-# FASTF1 ENGINE PRELOAD (HUGE SPEED BOOST)
-# --------------------------------------------------
-if "preload_done" not in st.session_state:
-    with st.spinner("Preparing telemetry engine..."):
-        preload = fastf1.get_session(2023, "Monaco", "Q")
-        preload.load(laps=True, telemetry=True)
-    st.session_state.preload_done = True
 # -------------------------------------------------------
 # Helpers
 # -------------------------------------------------------
+# Overridable so load tests can run against a fixture cache, offline
+CACHE_DIR = os.environ.get("LAPVIS_CACHE_DIR", "fastf1_cache")
+OFFLINE = os.environ.get("LAPVIS_OFFLINE") == "1"
+YEARS = [2021, 2022, 2023, 2024, 2025]
+
+
+@st.cache_resource
+def telemetry_engine():
+    # FastF1 cache (only once per process, on first session load)
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    fastf1.Cache.enable_cache(CACHE_DIR)
+    if OFFLINE:
+        fastf1.Cache.offline_mode(True)
+    return fastf1
+
+
+@tracked(st.cache_data)
+def load_catalog():
+    return catalog.load_catalog()
+
 
-@st.cache_data
+@tracked(st.cache_data)
 def get_races_for_year(year):
-    schedule = fastf1.get_event_schedule(year)
+    races = catalog.events(load_catalog(), year)
+    if races:
+        return races
+    schedule = telemetry_engine().get_event_schedule(year)
     return schedule['EventName'].tolist()
 
 
-@st.cache_data
+def get_sessions(year, race):
+    return catalog.sessions(load_catalog(), year, race) or ['FP1', 'FP2', 'FP3', 'Q', 'R', 'S']
+
+
+@tracked(st.cache_data)
 def load_session(year, race, session_type):
     # This is what made LapVis super fast
-    s = fastf1.get_session(year, race, session_type)
+    s = telemetry_engine().get_session(year, race, session_type)
     s.load()
     return s
 
 
+# Field-wide results are tens of MB and only ever read: cache_resource
+# hands every rerun the same object instead of unpickling a fresh copy
+@tracked(st.cache_resource)
+def load_field_laps(year, race, session_type):
+    # Every timed lap of every driver, as raw arrays for the field engines
+    return get_or_compute(
+        shared_store(), cache_key('field', year, race, session_type),
+        lambda: session_lap_arrays(load_session(year, race, session_type)))
+
+
+@tracked(st.cache_data)
+def load_lap_telemetry(year, race, session_type, driver):
+    def process():
+        session = load_session(year, race, session_type)
+        return lap_telemetry(session.laps.pick_drivers(driver).pick_fastest())
+
+    # Shared across replicas: only one of them loads the session for it
+    return get_or_compute(shared_store(),
+                          cache_key('lap', year, race, session_type, driver), process)
+
+
+@tracked(st.cache_resource)
+def load_session_scan(year, race, session_type):
+    # Anomaly / risk segments for every lap of every driver
+    return get_or_compute(
+        shared_store(), cache_key('scan', year, race, session_type),
+        lambda: scan_session(load_field_laps(year, race, session_type)))
+
+
+@tracked(st.cache_resource)
+def load_minisectors(year, race, session_type, n=25):
+    # Minisector times / owners / ideal laps of the whole field
+    return analyse_minisectors(load_field_laps(year, race, session_type), n=n)
+
+
+@tracked(st.cache_data)
+def load_race_timeline(year, race, session_type):
+    # Gap / interval / position matrices of the whole field
+    return get_or_compute(
+        shared_store(), cache_key('timeline', year, race, session_type),
+        lambda: race_timeline(load_session(year, race, session_type)))
+
+
+@tracked(st.cache_data)
+def load_comparison(ref, other):
+    # ref / other: (year, race, session_type, driver)
+    return get_or_compute(
+        shared_store(), cache_key('comparison', *ref, *other),
+        lambda: compare(load_lap_telemetry(*ref), load_lap_telemetry(*other)))
+
+
+@tracked(st.cache_data)
+def load_trace(year, race, session_type, ref, other):
+    # Both fastest laps on ref's distance samples: full resolution,
+    # the zoomed trace charts slice their visible window out of it
+    def process():
+        t1 = load_lap_telemetry(year, race, session_type, ref)
+        t2 = load_lap_telemetry(year, race, session_type, other)
+        return {
+            'Distance': np.asarray(t1['Distance'], dtype=float),
+            'SpeedRef': np.asarray(t1['Speed'], dtype=float),
+            'SpeedOther': np.interp(t1['Distance'], t2['Distance'], t2['Speed']),
+            'Delta': time_delta(t1, t2),
+        }
+
+    return get_or_compute(shared_store(),
+                          cache_key('trace', year, race, session_type, ref, other), process)
+
+
+def file_mtime(path):
+    # Part of the cache key of file-backed loaders: a rebuilt file is a miss
+    return os.path.getmtime(path) if os.path.exists(path) else 0.0
+
+
+@tracked(st.cache_data)
+def load_lap_table(mtime):
+    return load_table()
+
+
+@tracked(st.cache_data)
+def load_season(mtime):
+    return load_aggregates()
+
+
 def get_drivers(session):
     return sorted(session.laps['Driver'].unique())
 
@@ -165,32 +274,82 @@ def get_drivers(session):
 # -------------------------------------------------------
 st.sidebar.header("Session Controls")
 
-year = st.sidebar.selectbox("Year", [2021, 2022, 2023, 2024, 2025])
-race = st.sidebar.selectbox("Race", get_races_for_year(year))
-session_type = st.sidebar.selectbox("Session", ['FP1', 'FP2', 'FP3', 'Q', 'R', 'S'])
-
-# Load session FIRST
-session = load_session(year, race, session_type)
+# Keyed so a session can be selected in one rerun (loadtest.py)
+year = st.sidebar.selectbox("Year", YEARS, key="year")
+race = st.sidebar.selectbox("Race", get_races_for_year(year), key="race")
+session_type = st.sidebar.selectbox("Session", get_sessions(year, race), key="session")
 
-# Get drivers AFTER session load
-driver_list = get_drivers(session)
+# Drivers come from the catalog when available, so the sidebar is
+# complete before the session itself is loaded
+driver_list = catalog.drivers(load_catalog(), year, race, session_type)
+if not driver_list:
+    driver_list = get_drivers(load_session(year, race, session_type))
 
 driver1 = st.sidebar.selectbox("Driver 1", driver_list, index=0)
 driver2 = st.sidebar.selectbox("Driver 2", driver_list, index=1)
 
-# Get fastest laps
-lap1 = session.laps.pick_drivers(driver1).pick_fastest()
-lap2 = session.laps.pick_drivers(driver2).pick_fastest()
+first_paint = elapsed_ms(_T0)
+st.sidebar.caption(f"Sidebar ready in {first_paint:.0f} ms "
+                   f"(budget {FIRST_PAINT_BUDGET_MS} ms)")
+
+# -------------------------------------------------------
+# Page data — every loader of the page as one dependency graph
+# -------------------------------------------------------
+def after(fn, *args):
+    # Node that runs fn(*args) once its dependencies are done (fn reads
+    # them from the caches they just filled)
+    return lambda *_: fn(*args)
+
+
+def page_graph():
+    # session -> fastest laps -> trace / insight panels; session -> field
+    # laps -> scan / minisectors; race timeline and file-backed tables on
+    # their own. The tabs then read every loader from the cache.
+    key = (year, race, session_type)
+    graph = Graph("page")
+    graph.add('tel1', load_lap_telemetry, *key, driver1)
+    graph.add('tel2', load_lap_telemetry, *key, driver2)
+    graph.add('trace', after(load_trace, *key, driver1, driver2), deps=('tel1', 'tel2'))
+    graph.add('insights', lambda t1, t2: all_panels(t1, t2, driver1, driver2),
+              deps=('tel1', 'tel2'))
+    graph.add('field', load_field_laps, *key)
+    graph.add('scan', after(load_session_scan, *key), deps=('field',))
+    graph.add('minisectors', after(load_minisectors, *key, st.session_state.get("minisectors_n", 25)),
+              deps=('field',))
+    if session_type in ('R', 'S'):
+        graph.add('timeline', load_race_timeline, *key)
+    graph.add('lap_table', load_lap_table, file_mtime(TABLE_PATH))
+    graph.add('season', load_season, file_mtime(SEASON_PATH))
+    return graph
+
+
+# Worker threads render nothing, but the cached loaders need the
+# session's script context. A failed prefetch is retried (and reported)
+# by the tab that needs it; only the two fastest laps are required here.
+_ctx = get_script_run_ctx()
+page = page_graph().run(initializer=lambda: add_script_run_ctx(ctx=_ctx))
+for node in ('tel1', 'tel2', 'insights'):
+    if isinstance(page[node], Exception):
+        raise page[node]
+
+page_stats = summarize(graph_timings()['page'])
+st.sidebar.caption(f"Page data in {page_stats['wall_ms']:.0f} ms "
+                   f"(critical path {page_stats['critical_ms']:.0f} ms, "
+                   f"steps {page_stats['steps_ms']:.0f} ms)")
+
+# Fastest-lap telemetry (native merge engine, cached per driver)
+tel1 = page['tel1']
+tel2 = page['tel2']
 
 # -------------------------------------------------------
 # Base telemetry for maps
 # -------------------------------------------------------
-tel = lap1.get_telemetry()
-x = tel['X'].values
-y = tel['Y'].values
-speed = tel['Speed'].values
-throttle = tel['Throttle'].values
-brake = tel['Brake'].astype(int).values
+tel = tel1
+x = tel['X']
+y = tel['Y']
+speed = tel['Speed']
+throttle = tel['Throttle']
+brake = tel['Brake'].astype(int)
 
 # -------------------------------------------------------
 # Styling helper
@@ -228,13 +387,10 @@ def plot_map(data, title, cmap):
 # Racing Line Overlay
 # -------------------------------------------------------
 def plot_overlay():
-    t1 = lap1.get_telemetry()
-    t2 = lap2.get_telemetry()
-
     fig, ax = plt.subplots(figsize=(10,7), facecolor='#0b0f14')
 
-    ax.plot(t1['X'], t1['Y'], color='#00FFFF', linewidth=2)
-    ax.plot(t2['X'], t2['Y'], color='#FF69B4', linewidth=2)
+    ax.plot(tel1['X'], tel1['Y'], color='#00FFFF', linewidth=2)
+    ax.plot(tel2['X'], tel2['Y'], color='#FF69B4', linewidth=2)
 
     dark(ax, "Racing Line Overlay")
     ax.axis('off')
@@ -249,88 +405,398 @@ def plot_overlay():
 # -------------------------------------------------------
 # Speed Trace Comparison
 # -------------------------------------------------------
-def plot_speed_trace():
-    t1 = lap1.get_car_data().add_distance()
-    t2 = lap2.get_car_data().add_distance()
+def distance_window(trace, key):
+    # Visible distance window; the full lap is the LTTB overview
+    end = float(np.ceil(trace['Distance'][-1]))
+    lo, hi = st.slider("Distance window (m)", 0.0, end, (0.0, end), step=10.0, key=key)
+    return lo, hi
 
-    fig, ax = plt.subplots(figsize=(12,5), facecolor='#0b0f14')
 
-    ax.plot(t1['Distance'], t1['Speed'], color='#00FFFF', label=driver1)
-    ax.plot(t2['Distance'], t2['Speed'], color='#FF69B4', label=driver2)
+def trace_figure(title, unit, lo, hi):
+    fig = go.Figure()
+    fig.update_layout(
+        title=title,
+        plot_bgcolor="#0b0f14",
+        paper_bgcolor="#0b0f14",
+        font=dict(color="white"),
+        xaxis_title="Distance (m)",
+        yaxis_title=unit,
+        xaxis_range=[lo, hi],
+        height=420,
+        margin=dict(t=40, b=30),
+    )
+    return fig
 
-    dark(ax, "Speed Trace Comparison")
-    ax.set_xlabel("Distance (m)", color='white')
-    ax.set_ylabel("Speed (km/h)", color='white')
 
-    legend = ax.legend()
-    for t in legend.get_texts():
-        t.set_color('white')
+def plot_speed_trace():
+    trace = load_trace(year, race, session_type, driver1, driver2)
+    lo, hi = distance_window(trace, "speed_window")
 
-    st.pyplot(fig, width='stretch')
+    fig = trace_figure("Speed Trace Comparison", "Speed (km/h)", lo, hi)
+    series = visible_series(trace, 'Distance', ('SpeedRef', 'SpeedOther'), lo, hi)
+    for key, name, color in (('SpeedRef', driver1, '#00FFFF'), ('SpeedOther', driver2, '#FF69B4')):
+        xs, ys = series[key]
+        fig.add_trace(go.Scattergl(x=xs, y=ys, mode='lines', name=name, line=dict(color=color)))
+
+    st.plotly_chart(fig, use_container_width=True)
+    st.caption(f"≤ {POINTS} points per lap — narrow the window for full resolution")
 
 # -------------------------------------------------------
 # TRUE Lap Delta — Broadcast Style
 # -------------------------------------------------------
 def plot_true_delta():
-    t1 = lap1.get_car_data().add_distance()
-    t2 = lap2.get_car_data().add_distance()
+    trace = load_trace(year, race, session_type, driver1, driver2)
+    lo, hi = distance_window(trace, "delta_window")
+    xs, ys = visible(trace['Distance'], trace['Delta'], lo, hi)
+
+    fig = trace_figure(f"Lap Delta — {driver1} vs {driver2}", "Time Delta (s)", lo, hi)
+    # Wide translucent line underneath = glow
+    fig.add_trace(go.Scattergl(x=xs, y=ys, mode='lines', showlegend=False, hoverinfo='skip',
+                               line=dict(color='rgba(0,245,212,0.15)', width=8)))
+    fig.add_trace(go.Scattergl(x=xs, y=ys, mode='lines', showlegend=False,
+                               line=dict(color='#00F5D4', width=2.5)))
+    fig.add_hline(y=0, line_color='white', opacity=0.6)
+    fig.update_yaxes(gridcolor='rgba(255,255,255,0.08)')
 
-    d = t1['Distance'].values
-    t1s = t1['Time'].dt.total_seconds().values
-    t2_interp = np.interp(d, t2['Distance'], t2['Time'].dt.total_seconds())
+    st.plotly_chart(fig, use_container_width=True)
 
-    delta = t2_interp - t1s
+# -------------------------------------------------------
+# Time Loss Map
+# -------------------------------------------------------
+def plot_time_loss_map():
+    delta = time_delta(tel1, tel2)
+    norm = (delta - delta.min()) / (delta.max() - delta.min())
 
-    fig, ax = plt.subplots(figsize=(14,5), facecolor='#0b0f14')
+    fig, ax = plt.subplots(figsize=(10,7), facecolor='#0b0f14')
+    ax.scatter(tel1['X'], tel1['Y'], c=norm, cmap='RdYlGn_r', s=8)
+
+    dark(ax, "Time Loss Map (Green = Gain, Red = Loss)")
+    ax.axis('off')
+
+    st.pyplot(fig, width='stretch')
+
+# -------------------------------------------------------
+# Minisectors — fastest driver per minisector + ideal laps
+# -------------------------------------------------------
+def format_lap_time(seconds):
+    if not np.isfinite(seconds):
+        return "—"
+    return f"{int(seconds // 60)}:{seconds % 60:06.3f}"
 
-    line = ax.plot(d, delta, color='#00F5D4', linewidth=2.5)[0]
-    line.set_path_effects([
-        pe.Stroke(linewidth=8, foreground='#00F5D4', alpha=0.15),
-        pe.Normal()
-    ])
 
-    ax.axhline(0, color='white', linewidth=1, alpha=0.6)
-    ax.grid(color='white', alpha=0.08)
+def plot_minisectors():
+    n = st.slider("Minisectors", 10, 100, 25, step=5, key="minisectors_n")
 
-    dark(ax, f"Lap Delta — {driver1} vs {driver2}")
-    ax.set_xlabel("Distance (m)", color='white')
-    ax.set_ylabel("Time Delta (s)", color='white')
+    field = load_field_laps(year, race, session_type)
+    if len(field['Laps']) == 0:
+        st.warning("No timed laps with telemetry in this session.")
+        return
 
+    ms = load_minisectors(year, race, session_type, n)
+    drivers = ms['Drivers']
+
+    # Colour lap1's racing line by the driver owning each minisector
+    owner = ms['Owner'][minisector_of(tel['Distance'], ms)]
+    palette = plt.get_cmap('tab20')
+
+    fig, ax = plt.subplots(figsize=(10,7), facecolor='#0b0f14')
+    ax.scatter(x, y, c=[palette(i % 20) for i in owner], s=8)
+
+    for i in np.unique(ms['Owner']):
+        ax.scatter([], [], color=palette(i % 20), label=drivers[i])
+    legend = ax.legend(loc='lower left', frameon=False)
+    for t in legend.get_texts():
+        t.set_color('white')
+
+    dark(ax, f"Fastest Driver per Minisector ({n})")
+    ax.axis('off')
     st.pyplot(fig, width='stretch')
 
+    # Theoretical best lap of every driver
+    order = np.argsort(ms['IdealLap'])
+    st.dataframe({
+        "Driver": drivers[order].tolist(),
+        "Best Lap": [format_lap_time(t) for t in ms['BestLap'][order]],
+        "Ideal Lap": [format_lap_time(t) for t in ms['IdealLap'][order]],
+        "Left on Table (s)": np.round(ms['BestLap'] - ms['IdealLap'], 3)[order].tolist(),
+    }, width='stretch')
+
+    st.info(f"Field theoretical best lap: **{format_lap_time(ms['FieldIdealLap'])}**")
+
 # -------------------------------------------------------
-# Time Loss Map
+# Consistency Envelope — all of driver1's laps as p10/p50/p90 bands
 # -------------------------------------------------------
-def plot_time_loss_map():
-    tel1 = lap1.get_telemetry().add_distance()
-    tel2 = lap2.get_telemetry().add_distance()
+def band_figure(grid, bands, title, unit, color):
+    low, mid, high = bands
+    fig = go.Figure([
+        go.Scatter(x=grid, y=high, mode='lines', line=dict(width=0),
+                   showlegend=False, hoverinfo='skip'),
+        go.Scatter(x=grid, y=low, mode='lines', line=dict(width=0),
+                   fill='tonexty', fillcolor=color + '33', name="p10–p90"),
+        go.Scatter(x=grid, y=mid, mode='lines', line=dict(color=color, width=2),
+                   name="p50"),
+    ])
+    fig.update_layout(
+        title=title,
+        plot_bgcolor="#0b0f14",
+        paper_bgcolor="#0b0f14",
+        font=dict(color="white"),
+        xaxis_title="Distance (m)",
+        yaxis_title=unit,
+        height=320,
+        margin=dict(t=40, b=30),
+    )
+    return fig
+
+
+def plot_consistency():
+    field = load_field_laps(year, race, session_type)
 
-    d1 = tel1['Distance'].values
-    t1 = tel1['Time'].dt.total_seconds().values
+    stints = sorted(set(field['Stint'][field['Driver'] == driver1].tolist()))
+    chosen = st.multiselect("Stints", stints, default=stints)
+    if not chosen:
+        st.info("No stint selected — showing every stint.")
 
-    t2_interp = np.interp(
-        d1,
-        tel2['Distance'].values,
-        tel2['Time'].dt.total_seconds().values
+    env = consistency_envelope(field, driver1, stints=chosen)
+    if env is None:
+        st.warning(f"No timed laps for {driver1} in the selected stints.")
+        return
+
+    st.caption(f"{driver1}: {env['Laps']} laps — bands are p10 / p50 / p90")
+
+    st.plotly_chart(band_figure(env['Grid'], env['Speed'],
+                                "Speed Envelope", "Speed (km/h)", '#00FFFF'),
+                    use_container_width=True)
+    st.plotly_chart(band_figure(env['Grid'], env['Throttle'],
+                                "Throttle Envelope", "Throttle (%)", '#00F5D4'),
+                    use_container_width=True)
+
+    low, mid, high = env['BrakeOnset']
+    st.dataframe({
+        "Corner": list(range(1, len(env['Corners']) + 1)),
+        "Brake Onset p50 (m)": np.round(mid).tolist(),
+        "Spread p10–p90 (m)": np.round(high - low, 1).tolist(),
+    }, width='stretch')
+
+# -------------------------------------------------------
+# Year-over-Year — same circuit across seasons
+# -------------------------------------------------------
+def plot_cross_session():
+    col1, col2 = st.columns(2)
+    years = col1.multiselect("Compare against years", [y for y in YEARS if y != year])
+    drivers = col2.multiselect("Drivers", driver_list, default=[driver1])
+
+    if not years or not drivers:
+        st.info(f"Reference: **{driver1} {year} {race} {session_type}**. "
+                "Pick years and drivers to overlay.")
+        return
+
+    # Each (year, driver) fastest lap is cached on its own, so adding a
+    # year only loads that year; uncached ones load concurrently
+    ctx = get_script_run_ctx()
+    keys = [(y, race, session_type, d) for y in years for d in drivers]
+    laps = load_parallel(keys, load_lap_telemetry,
+                         initializer=lambda: add_script_run_ctx(ctx=ctx))
+
+    fig = go.Figure()
+    for (y, _, _, d), other in laps.items():
+        if isinstance(other, Exception):
+            st.warning(f"{d} {y}: not available ({other})")
+            continue
+        cmp = load_comparison((year, race, session_type, driver1), (y, race, session_type, d))
+        fig.add_trace(go.Scatter(x=cmp['Distance'], y=cmp['Delta'],
+                                 mode='lines', name=f"{d} {y}"))
+
+    fig.add_hline(y=0, line_color='white', opacity=0.5)
+    fig.update_layout(
+        title=f"Delta to {driver1} {year} (positive = slower)",
+        plot_bgcolor="#0b0f14",
+        paper_bgcolor="#0b0f14",
+        font=dict(color="white"),
+        xaxis_title="Distance (m)",
+        yaxis_title="Time Delta (s)",
     )
+    st.plotly_chart(fig, use_container_width=True)
 
-    delta = t2_interp - t1
-    norm = (delta - delta.min()) / (delta.max() - delta.min())
+# -------------------------------------------------------
+# Race Timeline — gaps, intervals and positions (race sessions)
+# -------------------------------------------------------
+def replay_figure(tl):
+    # One frame per lap: the field in running order, bars = gap to leader
+    def frame(lap):
+        pos = tl['Position'][:, lap]
+        running = np.flatnonzero(~np.isnan(pos))
+        running = running[np.argsort(pos[running])]
+        return go.Bar(x=tl['GapToLeader'][running, lap], y=pos[running],
+                      text=tl['Drivers'][running], textposition='outside',
+                      orientation='h', marker_color='#00FFFF')
+
+    laps = tl['Laps']
+    fig = go.Figure(
+        data=[frame(0)],
+        frames=[go.Frame(data=[frame(i)], name=str(lap)) for i, lap in enumerate(laps)],
+    )
+    fig.update_layout(
+        title="Race Replay — gap to leader by lap",
+        plot_bgcolor="#0b0f14",
+        paper_bgcolor="#0b0f14",
+        font=dict(color="white"),
+        xaxis=dict(title="Gap to leader (s)",
+                   range=[0, np.nanpercentile(tl['GapToLeader'], 95) * 1.2]),
+        yaxis=dict(title="Position", autorange='reversed', dtick=1),
+        height=600,
+        updatemenus=[dict(type="buttons", buttons=[
+            dict(label="▶ Play", method="animate",
+                 args=[None, {"frame": {"duration": 150}, "transition": {"duration": 0}}])])],
+        sliders=[dict(currentvalue={"prefix": "Lap "},
+                      steps=[dict(method="animate", label=str(lap),
+                                  args=[[str(lap)], {"mode": "immediate"}]) for lap in laps])],
+    )
+    return fig
 
-    fig, ax = plt.subplots(figsize=(10,7), facecolor='#0b0f14')
-    ax.scatter(tel1['X'], tel1['Y'], c=norm, cmap='RdYlGn_r', s=8)
 
-    dark(ax, "Time Loss Map (Green = Gain, Red = Loss)")
-    ax.axis('off')
+def plot_race_timeline():
+    if session_type not in ('R', 'S'):
+        st.info("The race timeline is available for race and sprint sessions.")
+        return
 
-    st.pyplot(fig, width='stretch')
+    tl = load_race_timeline(year, race, session_type)
+    axis, gaps = tl['Laps'], tl['GapToLeader']
 
-def plot_strategy_predictor():
-    car = lap1.get_car_data().add_distance()
-    speed = car['Speed'].values
+    if st.checkbox("Minisector resolution"):
+        field = load_field_laps(year, race, session_type)
+        if len(field['Laps']):
+            fine = minisector_timeline(tl, field, load_minisectors(year, race, session_type))
+            axis, gaps = fine['Axis'], fine['GapToLeader']
 
-    avg_speed = np.mean(speed)
-    consistency = np.std(speed)
+    fig = go.Figure()
+    for i, drv in enumerate(tl['Drivers']):
+        fig.add_trace(go.Scattergl(x=axis, y=gaps[i], mode='lines', name=drv))
+    fig.update_layout(
+        title="Gap to Leader",
+        plot_bgcolor="#0b0f14",
+        paper_bgcolor="#0b0f14",
+        font=dict(color="white"),
+        xaxis_title="Lap",
+        yaxis=dict(title="Gap (s)", autorange='reversed'),
+        height=550,
+    )
+    st.plotly_chart(fig, use_container_width=True)
+    if tl['Filled'].any():
+        st.caption(f"{int(tl['Filled'].sum())} missing lap times interpolated from the "
+                   "neighbouring laps")
+
+    st.plotly_chart(replay_figure(tl), use_container_width=True)
+
+    # Classification at the flag (last lap each car completed)
+    done = np.sum(~np.isnan(tl['Cumulative']), axis=1)
+    last = np.maximum(done - 1, 0)
+    rows = np.arange(len(tl['Drivers']))
+    st.dataframe({
+        "Driver": tl['Drivers'].tolist(),
+        "Laps": done.tolist(),
+        "Gap to Leader (s)": np.round(tl['GapToLeader'][rows, last], 3).tolist(),
+        "Interval (s)": np.round(tl['Interval'][rows, last], 3).tolist(),
+    }, width='stretch')
+
+# -------------------------------------------------------
+# Season — materialized leaderboards (python season.py <years>)
+# -------------------------------------------------------
+def season_view():
+    aggs = load_season(file_mtime(SEASON_PATH))
+    if not aggs['sessions']:
+        st.info("Season aggregates not built yet — run `python season.py 2021 2025`.")
+        return
+
+    metric = st.selectbox("Leaderboard", list(METRICS), format_func=lambda m: METRICS[m][0])
+    board = leaderboard(aggs, year, metric)
+    if not board['Driver']:
+        st.info(f"No {year} sessions ingested for this metric.")
+    else:
+        st.dataframe({
+            "Driver": board['Driver'],
+            METRICS[metric][0]: np.round(board['Value'], 3).tolist(),
+            "Sessions": board['Sessions'],
+        }, width='stretch')
+
+    col1, col2 = st.columns(2)
+
+    col1.markdown(f"**{driver1} — {year} season**")
+    mine = driver_summary(aggs, year, driver1)
+    col1.dataframe({
+        "Metric": [METRICS[m][0] for m in mine],
+        "Value": [round(v, 3) for v in mine.values()],
+    }, width='stretch')
+
+    col2.markdown(f"**{race} — all ingested years**")
+    table = circuit_table(aggs, race)
+    col2.dataframe({
+        "Driver": list(table),
+        METRICS[metric][0]: [round(row.get(metric, np.nan), 3) for row in table.values()],
+    }, width='stretch')
+
+# -------------------------------------------------------
+# Lap Finder — filter the lap feature table across seasons
+# -------------------------------------------------------
+def lap_finder():
+    table = load_lap_table(file_mtime(TABLE_PATH))
+    if table['rows'] == 0:
+        st.info("Lap feature table not built yet — run `python laptable.py 2021 2025`.")
+        return
+
+    cols = table['columns']
+    c1, c2, c3 = st.columns(3)
+    years = c1.multiselect("Years", sorted(set(cols['Year'].tolist())))
+    sessions = c2.multiselect("Sessions", sorted(set(cols['Session'].tolist())))
+    drivers = c3.multiselect("Drivers", sorted(set(cols['Driver'].tolist())), key="finder_drivers")
+
+    # Slider ranges are the exact bounds of the table, and a slider left
+    # at its bounds filters nothing, so no lap is dropped at the edges
+    speed_lo = float(np.nanmin(cols['TopSpeed']))
+    speed_hi = max(float(np.nanmax(cols['TopSpeed'])), speed_lo + 1.0)
+    max_zones = max(int(np.max(cols['BrakeCount'])), 1)
+
+    c1, c2, c3 = st.columns(3)
+    top = c1.slider("Top speed (km/h)", speed_lo, speed_hi, (speed_lo, speed_hi))
+    brakes = c2.slider("Max braking zones", 0, max_zones, max_zones)
+    full = c3.slider("Min full-throttle fraction", 0.0, 1.0, 0.0)
+
+    filters = {}
+    if top != (speed_lo, speed_hi):
+        filters['TopSpeed'] = top
+    if brakes < max_zones:
+        filters['BrakeCount'] = (None, brakes)
+    if full > 0:
+        filters['FullThrottle'] = (full, None)
+    if years:
+        filters['Year'] = years
+    if sessions:
+        filters['Session'] = sessions
+    if drivers:
+        filters['Driver'] = drivers
+
+    start = time.perf_counter()
+    rows = query(table, **filters)
+    took = elapsed_ms(start)
+
+    st.caption(f"{len(rows['Key'])} of {table['rows']} laps — query {took:.1f} ms")
+
+    order = np.argsort(rows['LapTime'])[:500]
+    st.dataframe({
+        "Year": rows['Year'][order].tolist(),
+        "Event": rows['Event'][order].tolist(),
+        "Session": rows['Session'][order].tolist(),
+        "Driver": rows['Driver'][order].tolist(),
+        "Lap": rows['LapNumber'][order].tolist(),
+        "Lap Time": [format_lap_time(t) for t in rows['LapTime'][order]],
+        "Top Speed": np.round(rows['TopSpeed'][order], 1).tolist(),
+        "Braking Zones": rows['BrakeCount'][order].tolist(),
+        "Full Throttle": np.round(rows['FullThrottle'][order], 2).tolist(),
+        "Braking Style": rows['BrakingStyle'][order].tolist(),
+    }, width='stretch')
+
+def plot_strategy_predictor():
+    avg_speed, consistency, (strategy, color, reason) = strategy_prediction(tel1)
 
     fig, ax = plt.subplots(figsize=(12,5), facecolor='#0b0f14')
     ax.axis('off')
@@ -346,16 +812,6 @@ def plot_strategy_predictor():
     ax.text(0.02, 0.48, f"Speed Consistency Index: {consistency:.1f}",
             fontsize=14, color='#00F5D4')
 
-    # Strategy logic
-    if avg_speed > 250 and consistency < 20:
-        strategy = "Hard → Medium (Long Stint)"
-        color = '#00FF88'
-        reason = "Driver maintains high speed with low variance. Tyre wear is stable."
-    else:
-        strategy = "Medium → Soft (Aggressive)"
-        color = '#FF4D6D'
-        reason = "High speed variance indicates aggressive driving. Softer tyres faster."
-
     ax.text(0.02, 0.30, f"Recommended Strategy: {strategy}",
             fontsize=18, color=color, weight='bold')
 
@@ -364,286 +820,84 @@ def plot_strategy_predictor():
 
     st.pyplot(fig, width='stretch')
 
-def plot_anomaly_detection():
-    tel = lap1.get_telemetry()
+def scan_mask(scan, kind):
+    # Samples of driver1's lap that fall inside any flagged segment of
+    # driver1 (over all of their laps), on the shared distance grid
+    segs = segments_for(scan, driver1)
+    segs = {k: v[segs['Kind'] == kind] for k, v in segs.items()}
+
+    pos = tel['Distance'] * (scan['Grid'][-1] / tel['Distance'][-1])
+    mask = np.zeros(len(pos), dtype=bool)
+    for start, end in zip(segs['Start'], segs['End']):
+        mask |= (pos >= start) & (pos <= end)
+
+    return mask, segs
+
 
-    speed = tel['Speed'].values
-    throttle = tel['Throttle'].values
+def scan_table(scan, kind):
+    counts = summary(scan)
+    drivers = sorted(counts, key=lambda d: -counts[d][kind])
+    return {
+        "Driver": drivers,
+        "Segments": [counts[d][kind] for d in drivers],
+    }
 
-    anomalies = np.where(
-        (speed < np.mean(speed) - 2*np.std(speed)) &
-        (throttle > 85)
-    )[0]
+
+def plot_anomaly_detection():
+    scan = load_session_scan(year, race, session_type)
+    if len(scan['Grid']) == 0:
+        st.info("No timed laps with telemetry in this session.")
+        return
+    anomalies, segs = scan_mask(scan, 'slow')
 
     fig, ax = plt.subplots(figsize=(10,7), facecolor='#0b0f14')
 
     ax.scatter(tel['X'], tel['Y'], color='#1f2a36', s=6)
-    ax.scatter(tel['X'].values[anomalies],
-               tel['Y'].values[anomalies],
+    ax.scatter(tel['X'][anomalies],
+               tel['Y'][anomalies],
                color='#FF3B3B', s=40)
 
     dark(ax, "Driver Performance Anomaly Detection")
     ax.axis('off')
 
     ax.text(0.02, 0.95,
-            f"Detected {len(anomalies)} anomalous slow zones",
+            f"{driver1}: {len(segs['Start'])} slow zones across "
+            f"{len(np.unique(segs['LapNumber']))} laps (vs field median)",
             transform=ax.transAxes,
             color='#FF3B3B', fontsize=13, weight='bold')
 
     st.pyplot(fig, width='stretch')
+    st.dataframe(scan_table(scan, 'slow'), width='stretch')
 
 def plot_risk_predictor():
-    tel = lap1.get_telemetry()
-
-    brake = tel['Brake'].values
-    speed = tel['Speed'].values
-
-    risk = np.where((brake == 1) & (speed > 230))[0]
+    scan = load_session_scan(year, race, session_type)
+    if len(scan['Grid']) == 0:
+        st.info("No timed laps with telemetry in this session.")
+        return
+    risk, segs = scan_mask(scan, 'risk')
 
     fig, ax = plt.subplots(figsize=(10,7), facecolor='#0b0f14')
 
     ax.scatter(tel['X'], tel['Y'], color='#1f2a36', s=6)
-    ax.scatter(tel['X'].values[risk],
-               tel['Y'].values[risk],
+    ax.scatter(tel['X'][risk],
+               tel['Y'][risk],
                color='#FFA500', s=35)
 
     dark(ax, "Crash / Safety Risk Predictor")
     ax.axis('off')
 
     ax.text(0.02, 0.95,
-            f"{len(risk)} High-Risk Braking Zones Detected",
+            f"{len(segs['Start'])} High-Risk Braking Zones Detected for {driver1}",
             transform=ax.transAxes,
             color='#FFA500', fontsize=13, weight='bold')
 
     st.pyplot(fig, width='stretch')
+    st.dataframe(scan_table(scan, 'risk'), width='stretch')
 
-def telemetry_insights(l1, l2, d1, d2):
-    st.markdown("##  Lap Intelligence Insights")
-
-    t1 = l1.get_car_data().add_distance()
-    t2 = l2.get_car_data().add_distance()
-
-    d = t1['Distance'].values
-    t1s = t1['Time'].dt.total_seconds().values
-    t2_interp = np.interp(d, t2['Distance'], t2['Time'].dt.total_seconds())
-    delta = t2_interp - t1s
-
-    # Where biggest gain happens
-    gain_index = np.argmin(delta)
-    gain_distance = d[gain_index]
-
-    # Sector split
-    total = d[-1]
-    s1 = total/3
-    s2 = 2*total/3
-
-    def sector(time_array):
-        return np.mean(time_array)
-
-    s1_delta = np.mean(delta[d < s1])
-    s2_delta = np.mean(delta[(d >= s1) & (d < s2)])
-    s3_delta = np.mean(delta[d >= s2])
-
-    # Speed aggression
-    speed_std_1 = np.std(t1['Speed'])
-    speed_std_2 = np.std(t2['Speed'])
-
-    # Brake comparison
-    brake1 = np.sum(l1.get_telemetry()['Brake'])
-    brake2 = np.sum(l2.get_telemetry()['Brake'])
-
-    # Output insights
-    if s2_delta < s1_delta and s2_delta < s3_delta:
-        best_sector = "Sector 2 (technical corners)"
-    elif s1_delta < s3_delta:
-        best_sector = "Sector 1 (high speed)"
-    else:
-        best_sector = "Sector 3 (corner exits)"
-
-    st.success(f"Biggest time gain for **{d1}** occurs around **{int(gain_distance)} meters**")
-
-    st.info(f"**{d1}** is strongest in **{best_sector}**")
-
-    if speed_std_1 > speed_std_2:
-        st.warning(f"**{d1}** is driving more aggressively than **{d2}** (higher speed variance)")
-    else:
-        st.warning(f"**{d2}** is driving more aggressively than **{d1}**")
-
-    if brake1 < brake2:
-        st.write(f"🟢 **{d1} brakes later** than {d2}")
-    else:
-        st.write(f"🟢 **{d2} brakes later** than {d1}")
-
-def corner_by_corner_analysis(l1, l2, d1, d2):
-    st.markdown("## 🏁 Corner-by-Corner Analysis")
-
-    tel1 = l1.get_telemetry().add_distance()
-    tel2 = l2.get_telemetry().add_distance()
-
-    brake = tel1['Brake'].values
-    distance = tel1['Distance'].values
-
-    # Detect braking start points (corner entries)
-    corners = []
-    for i in range(1, len(brake)):
-        if brake[i] == 1 and brake[i-1] == 0:
-            corners.append(distance[i])
-
-    # Remove very close detections (noise)
-    filtered = []
-    last = -100
-    for c in corners:
-        if c - last > 80:  # minimum spacing between corners
-            filtered.append(c)
-            last = c
-
-    # Compute time delta
-    t1 = tel1['Time'].dt.total_seconds().values
-    t2_interp = np.interp(
-        distance,
-        tel2['Distance'].values,
-        tel2['Time'].dt.total_seconds().values
-    )
-    delta = t2_interp - t1
-
-    # Analyze each corner
-    for idx, c in enumerate(filtered[:12], start=1):  # limit to 12 corners for readability
-        window = (distance > c - 40) & (distance < c + 40)
-        corner_delta = np.mean(delta[window])
-
-        if corner_delta < 0:
-            st.success(f"Turn {idx}: **{d1} gains {abs(corner_delta):.3f}s**")
-        else:
-            st.error(f"Turn {idx}: **{d2} gains {abs(corner_delta):.3f}s**")
-
-def race_engineer_summary(l1, l2, d1, d2):
-    st.markdown("##  Race Engineer Summary")
-
-    tel1 = l1.get_telemetry().add_distance()
-    tel2 = l2.get_telemetry().add_distance()
-
-    brake = tel1['Brake'].values
-    distance = tel1['Distance'].values
-
-    # Detect corners
-    corners = []
-    for i in range(1, len(brake)):
-        if brake[i] == 1 and brake[i-1] == 0:
-            corners.append(distance[i])
-
-    # Filter noise
-    filtered = []
-    last = -100
-    for c in corners:
-        if c - last > 80:
-            filtered.append(c)
-            last = c
-
-    t1 = tel1['Time'].dt.total_seconds().values
-    t2_interp = np.interp(
-        distance,
-        tel2['Distance'].values,
-        tel2['Time'].dt.total_seconds().values
-    )
-    delta = t2_interp - t1
-
-    gains_d1 = 0
-    gains_d2 = 0
-
-    for c in filtered[:12]:
-        window = (distance > c - 40) & (distance < c + 40)
-        corner_delta = np.mean(delta[window])
-
-        if corner_delta < 0:
-            gains_d1 += 1
-        else:
-            gains_d2 += 1
-
-    if gains_d1 > gains_d2:
-        st.success(
-            f"{d1} is stronger in technical corner sections and gains time in more turns than {d2}."
-        )
-    else:
-        st.error(
-            f"{d2} is stronger in corner exits and braking zones, gaining advantage over {d1}."
-        )
-
-    st.info(
-        "This summary is generated automatically from braking patterns and time delta across every corner."
-    )
-
-def corner_type_analysis(l1, l2, d1, d2):
-    st.markdown("##  Corner Type Performance")
-
-    tel1 = l1.get_telemetry().add_distance()
-    tel2 = l2.get_telemetry().add_distance()
-
-    brake = tel1['Brake'].values
-    speed = tel1['Speed'].values
-    distance = tel1['Distance'].values
-
-    # Detect corner start from braking
-    corners = []
-    for i in range(1, len(brake)):
-        if brake[i] == 1 and brake[i-1] == 0:
-            corners.append((distance[i], speed[i]))
-
-    # Filter close duplicates
-    filtered = []
-    last = -100
-    for d, s in corners:
-        if d - last > 80:
-            filtered.append((d, s))
-            last = d
-
-    # Delta calculation
-    t1 = tel1['Time'].dt.total_seconds().values
-    t2_interp = np.interp(
-        distance,
-        tel2['Distance'].values,
-        tel2['Time'].dt.total_seconds().values
-    )
-    delta = t2_interp - t1
-
-    slow_gain = 0
-    medium_gain = 0
-    fast_gain = 0
-
-    for d, s in filtered[:15]:
-        window = (distance > d - 40) & (distance < d + 40)
-        corner_delta = np.mean(delta[window])
-
-        # Classify corner by speed at braking
-        if s < 120:
-            if corner_delta < 0:
-                slow_gain += 1
-        elif 120 <= s < 220:
-            if corner_delta < 0:
-                medium_gain += 1
-        else:
-            if corner_delta < 0:
-                fast_gain += 1
-
-    st.write(f"**Slow corners gained by {d1}:** {slow_gain}")
-    st.write(f"**Medium speed corners gained by {d1}:** {medium_gain}")
-    st.write(f"**High speed corners gained by {d1}:** {fast_gain}")
-
-    # Smart sentence
-    if slow_gain > medium_gain and slow_gain > fast_gain:
-        st.success(f"{d1} is significantly stronger in slow technical hairpins.")
-    elif fast_gain > slow_gain and fast_gain > medium_gain:
-        st.success(f"{d1} gains major time in high-speed sweepers and flowing sections.")
-    else:
-        st.success(f"{d1} shows balanced performance across corner types.")
-
-
-
-def lap_replay_animation(lap):
-    tel = lap.get_telemetry()
-
-    x = tel['X'].values
-    y = tel['Y'].values
-    speed = tel['Speed'].values
+def lap_replay_animation(tel):
+    x = tel['X']
+    y = tel['Y']
+    speed = tel['Speed']
 
     norm_speed = (speed - speed.min()) / (speed.max() - speed.min())
 
@@ -717,12 +971,31 @@ def lap_replay_animation(lap):
 
     st.plotly_chart(fig, use_container_width=True)
 
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet
+def _report_styles():
+    # Report library is only needed when a report is requested
+    from reportlab.lib.styles import getSampleStyleSheet
+    return getSampleStyleSheet()
+
+
+def _gain_distance(tel1, delta):
+    return int(tel1['Distance'][np.argmin(delta)])
+
+
+def generate_pdf_report(tel1, tel2, d1, d2, year, race, session_type):
+    # The reportlab import runs alongside the lap delta
+    graph = Graph("report", timeout=60)
+    graph.add('styles', _report_styles)
+    graph.add('delta', time_delta, tel1, tel2)
+    graph.add('gain', _gain_distance, tel1, deps=('delta',))
+    results = graph.run()
+    for result in results.values():
+        if isinstance(result, Exception):
+            raise result
+
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
 
-def generate_pdf_report(l1, l2, d1, d2, year, race, session_type):
     doc = SimpleDocTemplate("LapVis_Report.pdf")
-    styles = getSampleStyleSheet()
+    styles = results['styles']
     elements = []
 
     elements.append(Paragraph(f"LapVis Race Engineer Report", styles['Title']))
@@ -734,20 +1007,8 @@ def generate_pdf_report(l1, l2, d1, d2, year, race, session_type):
         f"Drivers Compared: {d1} vs {d2}", styles['Normal']))
     elements.append(Spacer(1, 12))
 
-    # Compute delta
-    tel1 = l1.get_car_data().add_distance()
-    tel2 = l2.get_car_data().add_distance()
-
-    d = tel1['Distance'].values
-    t1 = tel1['Time'].dt.total_seconds().values
-    t2_interp = np.interp(d, tel2['Distance'], tel2['Time'].dt.total_seconds())
-    delta = t2_interp - t1
-
-    gain_index = np.argmin(delta)
-    gain_distance = int(d[gain_index])
-
     elements.append(Paragraph(
-        f"Biggest time gain for {d1} occurs around {gain_distance} meters.",
+        f"Biggest time gain for {d1} occurs around {results['gain']} meters.",
         styles['Normal']))
     elements.append(Spacer(1, 12))
 
@@ -758,62 +1019,44 @@ def generate_pdf_report(l1, l2, d1, d2, year, race, session_type):
     doc.build(elements)
 
 if st.button("📄 Generate Race Engineer PDF Report"):
-    generate_pdf_report(lap1, lap2, driver1, driver2, year, race, session_type)
+    generate_pdf_report(tel1, tel2, driver1, driver2, year, race, session_type)
     st.success("PDF Report generated as LapVis_Report.pdf")
 
 # -------------------------------------------------------
-# 🧠 Auto Race Engineer Commentary
+# Data export (Arrow IPC / Parquet)
 # -------------------------------------------------------
-def generate_engineer_insights(l1, l2, d1, d2):
-    t1 = l1.get_car_data().add_distance()
-    t2 = l2.get_car_data().add_distance()
-
-    d = t1['Distance'].values
-    s1 = t1['Speed'].values
-    s2_interp = np.interp(d, t2['Distance'], t2['Speed'].values)
-
-    # True delta
-    t1s = t1['Time'].dt.total_seconds().values
-    t2_interp = np.interp(d, t2['Distance'], t2['Time'].dt.total_seconds())
-    delta = t2_interp - t1s
-
-    # Where biggest gain happens
-    max_gain_idx = np.argmin(delta)
-    gain_point = int(d[max_gain_idx])
-
-    # Straight line performance
-    straight_mask = s1 > np.percentile(s1, 85)
-    straight_adv = np.mean(s1[straight_mask] - s2_interp[straight_mask])
-
-    # Braking zones
-    brake_mask = s1 < np.percentile(s1, 30)
-    brake_adv = np.mean(s1[brake_mask] - s2_interp[brake_mask])
-
-    st.markdown("##  Lap Intelligence Insights")
-
-    if delta[-1] < 0:
-        st.success(f"{d1} is faster overall than {d2} on this lap.")
-    else:
-        st.error(f"{d2} is faster overall than {d1} on this lap.")
-
-    st.info(f"Biggest time gain occurs around **{gain_point} meters** of the track.")
-
-    if straight_adv > 0:
-        st.write(f"• {d1} has superior straight-line speed compared to {d2}.")
-    else:
-        st.write(f"• {d2} has superior straight-line speed compared to {d1}.")
-
-    if brake_adv < 0:
-        st.write(f"• {d2} brakes later into heavy braking zones.")
-    else:
-        st.write(f"• {d1} brakes later into heavy braking zones.")
-
-    st.write("• Time differences are mainly created on corner exits rather than entries.")
+st.sidebar.header("Export")
+export_format = st.sidebar.radio("Format", list(FORMATS), horizontal=True)
+ext, mime = FORMATS[export_format]
+export_meta = {"year": year, "race": race, "session": session_type}
+export_name = f"{year}_{race}_{session_type}".replace(" ", "_")
+
+# Files are only built when a button is clicked
+st.sidebar.download_button(
+    "⬇ Lap comparison",
+    data=lambda: to_bytes(to_arrow(comparison_columns(tel1, tel2, driver1, driver2),
+                                   {**export_meta, "drivers": f"{driver1},{driver2}"}), ext),
+    file_name=f"{export_name}_{driver1}_vs_{driver2}.{ext}",
+    mime=mime,
+)
+st.sidebar.download_button(
+    f"⬇ {driver1} lap telemetry",
+    data=lambda: to_bytes(to_arrow(tel1, {**export_meta, "driver": driver1}), ext),
+    file_name=f"{export_name}_{driver1}.{ext}",
+    mime=mime,
+)
+st.sidebar.download_button(
+    "⬇ Whole session (all laps)",
+    data=lambda: to_bytes(to_arrow(session_columns(load_field_laps(year, race, session_type)),
+                                   export_meta), ext),
+    file_name=f"{export_name}_all_laps.{ext}",
+    mime=mime,
+)
 
 # -------------------------------------------------------
 # Tabs
 # -------------------------------------------------------
-tab1, tab2, tab3, tab4, tab5, tab6, tab7, tab8, tab9, tab10, tab11 = st.tabs([
+tab1, tab2, tab3, tab4, tab5, tab6, tab7, tab8, tab9, tab10, tab11, tab12, tab13, tab14, tab15, tab16, tab17 = st.tabs([
     "Speed Map",
     "Throttle Map",
     "Brake Map",
@@ -825,6 +1068,12 @@ tab1, tab2, tab3, tab4, tab5, tab6, tab7, tab8, tab9, tab10, tab11 = st.tabs([
     "Anomaly Detection",
     "Crash Risk Predictor",
     "Lap Replay ",
+    "Minisectors",
+    "Consistency",
+    "Year-over-Year",
+    "Lap Finder",
+    "Race Timeline",
+    "Season",
 ])
 
 with tab1:
@@ -858,11 +1107,29 @@ with tab10:
     plot_risk_predictor()
 
 with tab11:
-    lap_replay_animation(lap1)
+    lap_replay_animation(tel1)
+
+with tab12:
+    plot_minisectors()
+
+with tab13:
+    plot_consistency()
 
-telemetry_insights(lap1, lap2, driver1, driver2)
-corner_by_corner_analysis(lap1, lap2, driver1, driver2)
-race_engineer_summary(lap1, lap2, driver1, driver2)
-corner_type_analysis(lap1, lap2, driver1, driver2)
-generate_engineer_insights(lap1, lap2, driver1, driver2)
+with tab14:
+    plot_cross_session()
+
+with tab15:
+    lap_finder()
+
+with tab16:
+    plot_race_timeline()
+
+with tab17:
+    season_view()
+
+# -------------------------------------------------------
+# Insight panels (insights.py) — each message names its st.* call
+# -------------------------------------------------------
+for level, text in page['insights']:
+    getattr(st, level)(text)
 
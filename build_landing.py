@@ -0,0 +1,532 @@
+# ============================================================
+# LapVis — Landing Asset Pipeline
+# f1/scene.gltf -> landing/assets/{placeholder,car}.glb
+# ============================================================
+#
+# Run locally (Pillow + NumPy, no network):
+#     python build_landing.py
+#     python build_landing.py --measure    # + first-frame timings (Playwright)
+#
+#   placeholder.glb  one box per car part, a few KB — drawn on the first
+#                    frame while the real car streams in
+#   car.glb          binary glTF with quantized geometry
+#                    (KHR_mesh_quantization) and downscaled, recompressed
+#                    textures embedded
+#   report.json      real byte sizes of the source scene and the built
+#                    assets, transfer-time *estimates* for one assumed
+#                    connection and, with --measure, measured timings
+#
+# --measure serves the repo over HTTP and loads the landing page in
+# headless Chromium on that connection, once with the unprocessed scene
+# (index.html?assets=source, "before") and once with the built assets
+# ("after"). The page records window.lapvisTimings (firstFrame, then
+# sourceFrame or placeholderFrame / fullFrame; ms since navigation).
+
+import argparse
+import functools
+import http.server
+import io
+import json
+import os
+import struct
+import threading
+
+import numpy as np
+
+SOURCE = "f1/scene.gltf"
+OUT_DIR = "landing/assets"
+
+# Longest texture edge per material slot
+TEXTURE_SIZE = {'baseColor': 1024, 'normal': 1024, 'metallicRoughness': 512,
+                'occlusion': 512, 'emissive': 512}
+JPEG_QUALITY = {'baseColor': 85, 'normal': 92, 'metallicRoughness': 85,
+                'occlusion': 85, 'emissive': 85}
+
+# Assumed connection for the transfer-time estimates (and --measure)
+BANDWIDTH_MBPS = 10.0
+RTT_MS = 60.0
+
+# Page versions measured by --measure: URL and the timing that ends a load
+PAGES = {
+    'before': ("landing/index.html?assets=source", 'sourceFrame'),
+    'after': ("landing/index.html", 'fullFrame'),
+}
+
+FLOAT, BYTE, UNSIGNED_BYTE, SHORT, UNSIGNED_SHORT, UNSIGNED_INT = \
+    5126, 5120, 5121, 5122, 5123, 5125
+DTYPES = {FLOAT: np.float32, BYTE: np.int8, UNSIGNED_BYTE: np.uint8,
+          SHORT: np.int16, UNSIGNED_SHORT: np.uint16, UNSIGNED_INT: np.uint32}
+WIDTH = {'SCALAR': 1, 'VEC2': 2, 'VEC3': 3, 'VEC4': 4, 'MAT4': 16}
+ARRAY_BUFFER, ELEMENT_ARRAY_BUFFER = 34962, 34963
+
+
+# --------------------------------------------------------
+# glTF reading
+# --------------------------------------------------------
+def read_accessor(gltf, buffers, index):
+    """Accessor as a (count, components) array, honouring byteStride."""
+    acc = gltf['accessors'][index]
+    view = gltf['bufferViews'][acc['bufferView']]
+    dtype = np.dtype(DTYPES[acc['componentType']])
+    width = WIDTH[acc['type']]
+
+    data = buffers[view['buffer']]
+    start = view.get('byteOffset', 0) + acc.get('byteOffset', 0)
+    stride = view.get('byteStride', dtype.itemsize * width)
+
+    raw = np.ndarray((acc['count'], width), dtype=dtype, buffer=data,
+                     offset=start, strides=(stride, dtype.itemsize))
+    return np.array(raw)
+
+
+def node_matrix(node):
+    if 'matrix' in node:
+        return np.array(node['matrix'], dtype=float).reshape(4, 4).T
+
+    t = np.eye(4)
+    t[:3, 3] = node.get('translation', (0, 0, 0))
+    x, y, z, w = node.get('rotation', (0, 0, 0, 1))
+    r = np.eye(4)
+    r[:3, :3] = [[1 - 2 * (y * y + z * z), 2 * (x * y - z * w), 2 * (x * z + y * w)],
+                 [2 * (x * y + z * w), 1 - 2 * (x * x + z * z), 2 * (y * z - x * w)],
+                 [2 * (x * z - y * w), 2 * (y * z + x * w), 1 - 2 * (x * x + y * y)]]
+    s = np.diag(list(node.get('scale', (1, 1, 1))) + [1])
+    return t @ r @ s
+
+
+def world_matrices(gltf):
+    """{node index: world matrix} for every node reachable from the scene."""
+    out = {}
+
+    def walk(i, parent):
+        node = gltf['nodes'][i]
+        out[i] = parent @ node_matrix(node)
+        for child in node.get('children', []):
+            walk(child, out[i])
+
+    for root in gltf['scenes'][gltf.get('scene', 0)]['nodes']:
+        walk(root, np.eye(4))
+    return out
+
+
+def texture_slots(gltf):
+    """{image index: material slot name} (first use wins)."""
+    slots = {}
+    for mat in gltf.get('materials', []):
+        pbr = mat.get('pbrMetallicRoughness', {})
+        infos = [('baseColor', pbr.get('baseColorTexture')),
+                 ('metallicRoughness', pbr.get('metallicRoughnessTexture')),
+                 ('normal', mat.get('normalTexture')),
+                 ('occlusion', mat.get('occlusionTexture')),
+                 ('emissive', mat.get('emissiveTexture'))]
+        for slot, info in infos:
+            if info is not None:
+                image = gltf['textures'][info['index']]['source']
+                slots.setdefault(image, slot)
+    return slots
+
+
+def uv_sets_used(material):
+    """Number of TEXCOORD_n sets a material samples."""
+    pbr = material.get('pbrMetallicRoughness', {})
+    infos = [pbr.get('baseColorTexture'), pbr.get('metallicRoughnessTexture'),
+             material.get('normalTexture'), material.get('occlusionTexture'),
+             material.get('emissiveTexture')]
+    return max([info.get('texCoord', 0) + 1 for info in infos if info] or [0])
+
+
+# --------------------------------------------------------
+# GLB writing
+# --------------------------------------------------------
+class GLBWriter:
+    """Accumulates bufferViews / accessors in one binary chunk."""
+
+    def __init__(self, gltf):
+        self.gltf = gltf
+        gltf['buffers'] = [{'byteLength': 0}]
+        gltf['bufferViews'] = []
+        gltf['accessors'] = []
+        self.chunks = []
+        self.size = 0
+
+    def view(self, data, target=None, stride=None):
+        pad = (-self.size) % 4
+        if pad:
+            self.chunks.append(b'\0' * pad)
+            self.size += pad
+        view = {'buffer': 0, 'byteOffset': self.size, 'byteLength': len(data)}
+        if target:
+            view['target'] = target
+        if stride:
+            view['byteStride'] = stride
+        self.chunks.append(data)
+        self.size += len(data)
+        self.gltf['bufferViews'].append(view)
+        return len(self.gltf['bufferViews']) - 1
+
+    def accessor(self, values, type_, target=ARRAY_BUFFER, normalized=False,
+                 minmax=False):
+        """values: (count, components) array already in its storage dtype."""
+        values = np.ascontiguousarray(values)
+        width = values.shape[1]
+
+        # Vertex attribute elements must start on 4-byte boundaries
+        stride = None
+        if target == ARRAY_BUFFER and (values.itemsize * width) % 4:
+            pad = 4 // values.itemsize - width % (4 // values.itemsize)
+            values = np.hstack([values, np.zeros((len(values), pad), values.dtype)])
+            stride = values.itemsize * values.shape[1]
+
+        acc = {
+            'bufferView': self.view(values.tobytes(), target, stride),
+            'componentType': {v: k for k, v in DTYPES.items()}[values.dtype.type],
+            'count': len(values),
+            'type': type_,
+        }
+        if normalized:
+            acc['normalized'] = True
+        if minmax:
+            acc['min'] = values[:, :width].min(axis=0).tolist()
+            acc['max'] = values[:, :width].max(axis=0).tolist()
+        self.gltf['accessors'].append(acc)
+        return len(self.gltf['accessors']) - 1
+
+    def save(self, path):
+        self.gltf['buffers'][0]['byteLength'] = self.size
+        body = json.dumps(self.gltf, separators=(',', ':')).encode()
+        body += b' ' * ((-len(body)) % 4)
+        binary = b''.join(self.chunks)
+        binary += b'\0' * ((-len(binary)) % 4)
+
+        with open(path, 'wb') as f:
+            f.write(struct.pack('<4sII', b'glTF', 2, 12 + 8 + len(body) + 8 + len(binary)))
+            f.write(struct.pack('<I4s', len(body), b'JSON') + body)
+            f.write(struct.pack('<I4s', len(binary), b'BIN\0') + binary)
+        return os.path.getsize(path)
+
+
+# --------------------------------------------------------
+# Textures
+# --------------------------------------------------------
+# Flat stand-ins for textures missing from the source tree
+NEUTRAL = {'normal': (128, 128, 255), 'metallicRoughness': (255, 255, 0)}
+
+
+def recompress(path, slot):
+    """Downscale to the slot's size and re-encode: (bytes, mime type)."""
+    from PIL import Image
+
+    if os.path.exists(path):
+        img = Image.open(path)
+        img.thumbnail((TEXTURE_SIZE[slot],) * 2, Image.LANCZOS)
+    else:
+        print(f"warning: {path} not found — using a flat {slot} texture")
+        img = Image.new('RGB', (4, 4), NEUTRAL.get(slot, (255, 255, 255)))
+
+    has_alpha = img.mode in ('RGBA', 'LA') and img.getchannel('A').getextrema()[0] < 255
+    out = io.BytesIO()
+    if has_alpha:
+        img.save(out, 'PNG', optimize=True)
+        return out.getvalue(), 'image/png'
+
+    img.convert('RGB').save(out, 'JPEG', quality=JPEG_QUALITY[slot], optimize=True)
+    return out.getvalue(), 'image/jpeg'
+
+
+# --------------------------------------------------------
+# Geometry quantization (KHR_mesh_quantization)
+# --------------------------------------------------------
+def _snorm(values, bits):
+    top = 2 ** (bits - 1) - 1
+    return np.round(np.clip(values, -1, 1) * top).astype(np.int8 if bits == 8 else np.int16)
+
+
+def quantize_mesh(src, buffers, mesh, writer):
+    """
+    Rewrite a mesh's primitives with quantized attributes.
+    Returns (translation, scale) that the mesh's node must apply to undo
+    the position normalisation.
+    """
+    positions = [read_accessor(src, buffers, p['attributes']['POSITION'])
+                 for p in mesh['primitives']]
+    lo = np.min([p.min(axis=0) for p in positions], axis=0)
+    hi = np.max([p.max(axis=0) for p in positions], axis=0)
+    centre = (lo + hi) / 2
+    half = float(max(np.max(hi - lo) / 2, 1e-9))
+
+    for prim, pos in zip(mesh['primitives'], positions):
+        attrs = prim['attributes']
+        uv_sets = uv_sets_used(src['materials'][prim['material']]) if 'material' in prim else 0
+        out = {'POSITION': writer.accessor(_snorm((pos - centre) / half, 16), 'VEC3',
+                                           normalized=True, minmax=True)}
+
+        if 'NORMAL' in attrs:
+            normal = read_accessor(src, buffers, attrs['NORMAL'])
+            out['NORMAL'] = writer.accessor(_snorm(normal, 8), 'VEC3', normalized=True)
+        if 'TANGENT' in attrs and uv_sets:
+            tangent = read_accessor(src, buffers, attrs['TANGENT'])
+            out['TANGENT'] = writer.accessor(_snorm(tangent, 8), 'VEC4', normalized=True)
+
+        # Only the UV sets a material actually samples
+        for n in range(uv_sets):
+            uv = read_accessor(src, buffers, attrs[f'TEXCOORD_{n}'])
+            if uv.min() >= 0 and uv.max() <= 1:
+                uv = np.round(uv * 65535).astype(np.uint16)
+                out[f'TEXCOORD_{n}'] = writer.accessor(uv, 'VEC2', normalized=True)
+            else:
+                out[f'TEXCOORD_{n}'] = writer.accessor(uv, 'VEC2')
+
+        prim['attributes'] = out
+        if 'indices' in prim:
+            idx = read_accessor(src, buffers, prim['indices'])
+            idx = idx.astype(np.uint16 if len(pos) < 65536 else np.uint32)
+            prim['indices'] = writer.accessor(idx, 'SCALAR', ELEMENT_ARRAY_BUFFER)
+
+    return centre.tolist(), half
+
+
+def build_car(src, buffers, base_dir, path):
+    """Quantized geometry + recompressed textures in one GLB."""
+    gltf = json.loads(json.dumps(src))
+    writer = GLBWriter(gltf)
+
+    slots = texture_slots(gltf)
+    for i, image in enumerate(gltf.get('images', [])):
+        data, mime = recompress(os.path.join(base_dir, image['uri']), slots.get(i, 'baseColor'))
+        gltf['images'][i] = {'bufferView': writer.view(data), 'mimeType': mime}
+
+    # Positions are stored normalised per mesh; a child node per mesh
+    # instance carries the inverse translation/scale
+    restore = {m: quantize_mesh(src, buffers, mesh, writer)
+               for m, mesh in enumerate(gltf['meshes'])}
+
+    for node in list(gltf['nodes']):
+        if 'mesh' not in node:
+            continue
+        mesh = node.pop('mesh')
+        centre, half = restore[mesh]
+        gltf['nodes'].append({'mesh': mesh, 'translation': centre, 'scale': [half] * 3})
+        node.setdefault('children', []).append(len(gltf['nodes']) - 1)
+
+    gltf['extensionsUsed'] = ['KHR_mesh_quantization']
+    gltf['extensionsRequired'] = ['KHR_mesh_quantization']
+    return writer.save(path)
+
+
+# --------------------------------------------------------
+# Placeholder: one oriented box per primitive, no textures
+# --------------------------------------------------------
+BOX_CORNERS = np.array([[x, y, z] for x in (0, 1) for y in (0, 1) for z in (0, 1)], dtype=float)
+BOX_FACES = np.array([[0, 1, 3], [0, 3, 2], [4, 6, 7], [4, 7, 5], [0, 4, 5], [0, 5, 1],
+                      [2, 3, 7], [2, 7, 6], [0, 2, 6], [0, 6, 4], [1, 5, 7], [1, 7, 3]])
+
+
+def build_placeholder(gltf, path):
+    """
+    Needs only the glTF JSON: every primitive's POSITION min/max gives a
+    box, moved into world space and merged into a single mesh.
+    """
+    boxes, faces = [], []
+    for i, world in world_matrices(gltf).items():
+        node = gltf['nodes'][i]
+        if 'mesh' not in node:
+            continue
+        for prim in gltf['meshes'][node['mesh']]['primitives']:
+            acc = gltf['accessors'][prim['attributes']['POSITION']]
+            lo, hi = np.array(acc['min']), np.array(acc['max'])
+            corners = lo + BOX_CORNERS * (hi - lo)
+            world_corners = (np.c_[corners, np.ones(8)] @ world.T)[:, :3]
+            faces.append(BOX_FACES + 8 * len(boxes))
+            boxes.append(world_corners)
+
+    out = {
+        'asset': {'version': '2.0', 'generator': 'LapVis build_landing.py'},
+        'scene': 0,
+        'scenes': [{'nodes': [0]}],
+        'nodes': [{'mesh': 0, 'name': 'placeholder'}],
+        'materials': [{'pbrMetallicRoughness': {'baseColorFactor': [0.0, 0.9, 1.0, 1.0],
+                                                'metallicFactor': 0.0}}],
+    }
+    writer = GLBWriter(out)
+    position = writer.accessor(np.vstack(boxes).astype(np.float32), 'VEC3', minmax=True)
+    indices = writer.accessor(np.vstack(faces).astype(np.uint16).reshape(-1, 1), 'SCALAR',
+                              ELEMENT_ARRAY_BUFFER)
+    out['meshes'] = [{'primitives': [{'attributes': {'POSITION': position},
+                                      'indices': indices, 'material': 0}]}]
+    return writer.save(path)
+
+
+# --------------------------------------------------------
+# Measurement
+# --------------------------------------------------------
+def transfer_ms(nbytes, requests=1):
+    """Estimated download time on BANDWIDTH_MBPS with RTT_MS per request."""
+    return nbytes * 8 / (BANDWIDTH_MBPS * 1e6) * 1000 + requests * RTT_MS
+
+
+def source_files(gltf, source):
+    """(bytes on disk, files, missing file paths) of the unprocessed scene."""
+    base_dir = os.path.dirname(source)
+    files = [source]
+    files += [os.path.join(base_dir, b['uri']) for b in gltf['buffers']]
+    files += [os.path.join(base_dir, im['uri']) for im in gltf.get('images', [])]
+
+    present = [f for f in files if os.path.exists(f)]
+    missing = [f for f in files if not os.path.exists(f)]
+    return sum(os.path.getsize(f) for f in present), len(files), missing
+
+
+def build(source=SOURCE, out_dir=OUT_DIR):
+    base_dir = os.path.dirname(source)
+    with open(source) as f:
+        gltf = json.load(f)
+    os.makedirs(out_dir, exist_ok=True)
+
+    source_size, files, missing = source_files(gltf, source)
+    placeholder = build_placeholder(gltf, os.path.join(out_dir, 'placeholder.glb'))
+    report = {
+        # Byte sizes are real (files on disk); the source scene was never
+        # loaded by the page, it is only the input of this pipeline
+        'source': {'bytes': source_size, 'files': files, 'missing': missing},
+        'assets': {'placeholder_bytes': placeholder, 'car_bytes': None},
+        'estimated_transfer_ms': {
+            'assumes': {'bandwidth_mbps': BANDWIDTH_MBPS, 'rtt_ms': RTT_MS},
+            'placeholder': transfer_ms(placeholder),
+        },
+        # window.lapvisTimings of both page versions (build --measure)
+        'measured': None,
+    }
+
+    bin_paths = [os.path.join(base_dir, b['uri']) for b in gltf['buffers']]
+    if all(os.path.exists(p) for p in bin_paths):
+        buffers = [open(p, 'rb').read() for p in bin_paths]
+        car = build_car(gltf, buffers, base_dir, os.path.join(out_dir, 'car.glb'))
+        report['assets']['car_bytes'] = car
+        report['estimated_transfer_ms']['car'] = transfer_ms(car)
+    else:
+        print(f"warning: {', '.join(bin_paths)} not found — car.glb skipped, "
+              "the page keeps the placeholder")
+
+    return report
+
+
+def write_report(report, out_dir=OUT_DIR):
+    with open(os.path.join(out_dir, 'report.json'), 'w') as f:
+        json.dump(report, f, indent=2)
+
+
+# --------------------------------------------------------
+# First-frame measurement (headless Chromium via Playwright)
+# --------------------------------------------------------
+class _QuietHandler(http.server.SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+def serve(root="."):
+    """HTTP server for root on a free port, in a daemon thread."""
+    handler = functools.partial(_QuietHandler, directory=root)
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}/"
+
+
+def _page_timings(browser, url, done, timeout_ms):
+    # One cold load on the assumed connection; incomplete if `done` never fires
+    from playwright.sync_api import TimeoutError as PlaywrightTimeout
+
+    page = browser.new_page()
+    try:
+        cdp = page.context.new_cdp_session(page)
+        cdp.send('Network.enable')
+        cdp.send('Network.setCacheDisabled', {'cacheDisabled': True})
+        cdp.send('Network.emulateNetworkConditions', {
+            'offline': False,
+            'latency': RTT_MS,
+            'downloadThroughput': BANDWIDTH_MBPS * 1e6 / 8,
+            'uploadThroughput': BANDWIDTH_MBPS * 1e6 / 8,
+        })
+        page.goto(url)
+        try:
+            page.wait_for_function(f"(window.lapvisTimings || {{}}).{done} !== undefined",
+                                   timeout=timeout_ms)
+        except PlaywrightTimeout:
+            pass
+        return page.evaluate("window.lapvisTimings || {}")
+    finally:
+        page.close()
+
+
+def measure(runs=3, timeout_s=180):
+    """
+    {'before' | 'after': median window.lapvisTimings over `runs` cold loads,
+    plus 'complete' (runs that reached their last frame)}.
+    """
+    try:
+        from playwright.sync_api import sync_playwright
+    except ImportError:
+        raise SystemExit("--measure needs Playwright: "
+                         "pip install playwright && playwright install chromium")
+
+    pages = dict(PAGES)
+    if not os.path.exists(os.path.join(OUT_DIR, 'car.glb')):
+        print("warning: car.glb not built — 'after' ends at the placeholder frame")
+        pages['after'] = (PAGES['after'][0], 'placeholderFrame')
+
+    server, base = serve()
+    out = {'assumes': {'bandwidth_mbps': BANDWIDTH_MBPS, 'rtt_ms': RTT_MS}, 'runs': runs}
+    try:
+        with sync_playwright() as p:
+            # Software WebGL, so headless machines without a GPU still draw
+            browser = p.chromium.launch(args=["--use-angle=swiftshader", "--enable-unsafe-swiftshader"])
+            for version, (path, done) in pages.items():
+                samples = [_page_timings(browser, base + path, done, timeout_s * 1000)
+                           for _ in range(runs)]
+                keys = sorted(set().union(*samples))
+                out[version] = {key: float(np.median([s[key] for s in samples if key in s]))
+                                for key in keys}
+                out[version]['complete'] = sum(done in s for s in samples)
+            browser.close()
+    finally:
+        server.shutdown()
+    return out
+
+
+def print_report(report):
+    src, assets, est = report['source'], report['assets'], report['estimated_transfer_ms']
+    missing = f", {len(src['missing'])} missing" if src['missing'] else ""
+    print(f"  source scene     {src['bytes'] / 1e6:7.2f} MB on disk ({src['files']} files{missing})")
+    print(f"  placeholder.glb  {assets['placeholder_bytes'] / 1e3:7.1f} KB"
+          f"   est. {est['placeholder']:6.0f} ms")
+    if assets['car_bytes'] is not None:
+        print(f"  car.glb          {assets['car_bytes'] / 1e6:7.2f} MB"
+              f"   est. {est['car']:6.0f} ms")
+    print(f"Estimates assume {est['assumes']['bandwidth_mbps']:.0f} Mbit/s and "
+          f"{est['assumes']['rtt_ms']:.0f} ms RTT")
+
+    measured = report['measured']
+    if measured is None:
+        print("Not measured — run python build_landing.py --measure")
+        return
+    print(f"Measured (median of {measured['runs']} cold loads, ms since navigation):")
+    for version in PAGES:
+        t = measured[version]
+        frames = "  ".join(f"{key} {t[key]:7.0f}" for key in
+                           ('firstFrame', 'sourceFrame', 'placeholderFrame', 'fullFrame') if key in t)
+        print(f"  {version:<7} {frames}  ({t['complete']}/{measured['runs']} complete)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="LapVis landing asset pipeline")
+    parser.add_argument('source', nargs='?', default=SOURCE)
+    parser.add_argument('out_dir', nargs='?', default=OUT_DIR)
+    parser.add_argument('--measure', action='store_true',
+                        help="also record first-frame timings before/after (Playwright)")
+    parser.add_argument('--runs', type=int, default=3)
+    args = parser.parse_args()
+
+    report = build(args.source, args.out_dir)
+    if args.measure:
+        report['measured'] = measure(args.runs)
+    write_report(report, args.out_dir)
+    print_report(report)
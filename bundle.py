@@ -0,0 +1,362 @@
+# ============================================================
+# LapVis — Static Session Bundle
+# Every dashboard view for chosen driver pairs, no Python per viewer
+# ============================================================
+#
+# Build (loads the session once, views run as a dependency graph):
+#     python bundle.py 2024 "Monaco Grand Prix" Q VER:LEC NOR:PIA
+#
+# Output (landing/bundles/<name>/):
+#     manifest.json   Plotly figures, tables and insight messages
+#     buffers.bin     every numeric array once, float32
+#
+# Figures reference arrays by name ({"$buf": "VER/Speed"}), so a
+# driver's channels are stored once however many views and pairs use
+# them; landing/bundle.html resolves the references to Float32Array views
+# of the one binary and hands them straight to Plotly.
+
+import json
+import os
+import sys
+import threading
+
+import numpy as np
+
+import perf
+from alignment import session_lap_arrays, time_delta
+from consistency import consistency_envelope
+from insights import all_panels, strategy_prediction
+from minisectors import analyse_minisectors, minisector_of
+from racetimeline import race_timeline
+from scanning import scan_session, segments_for, summary
+from scheduler import Graph, summarize
+from telemetry import lap_telemetry
+
+BUNDLE_DIR = "landing/bundles"
+
+# Dashboard tabs in page order -> the scope a view is computed for
+TABS = (
+    ("Speed Map", 'driver'),
+    ("Throttle Map", 'driver'),
+    ("Brake Map", 'driver'),
+    ("True Lap Delta", 'pair'),
+    ("Racing Line Overlay", 'pair'),
+    ("Speed Trace", 'pair'),
+    ("Time Loss Map", 'pair'),
+    ("Race Strategy Predictor", 'driver'),
+    ("Anomaly Detection", 'driver'),
+    ("Crash Risk Predictor", 'driver'),
+    ("Lap Replay", 'driver'),
+    ("Minisectors", 'driver'),
+    ("Consistency", 'driver'),
+    ("Race Timeline", 'session'),
+    ("Insights", 'pair'),
+)
+
+# Need other sessions / open-ended queries — dashboard only
+INTERACTIVE_ONLY = ("Year-over-Year", "Lap Finder", "Season")
+
+COLORS = ('#00FFFF', '#FF69B4')
+
+LAYOUT = {
+    'plot_bgcolor': "#0b0f14",
+    'paper_bgcolor': "#0b0f14",
+    'font': {'color': "white"},
+}
+MAP_AXES = {'xaxis': {'visible': False}, 'yaxis': {'visible': False, 'scaleanchor': 'x'}}
+
+
+class Buffers:
+    """Named float32 arrays, each stored once (thread-safe)."""
+
+    def __init__(self):
+        self._arrays = {}
+        self._lock = threading.Lock()
+
+    def ref(self, name, values):
+        with self._lock:
+            if name not in self._arrays:
+                self._arrays[name] = np.ascontiguousarray(values, dtype='<f4')
+        return {'$buf': name}
+
+    def write(self, path):
+        """Concatenate into one file; returns {name: [offset, length]}."""
+        index, offset = {}, 0
+        with open(path, 'wb') as f:
+            for name, values in self._arrays.items():
+                f.write(values.tobytes())
+                index[name] = [offset, len(values)]
+                offset += values.nbytes
+        return index
+
+
+def view(figures=(), tables=(), messages=()):
+    return {'figures': list(figures), 'tables': list(tables), 'messages': list(messages)}
+
+
+def figure(data, title, **layout):
+    return {'data': data, 'layout': {**LAYOUT, 'title': title, **layout}}
+
+
+# --------------------------------------------------------
+# Views of one driver (their fastest lap)
+# --------------------------------------------------------
+def _scan_mask(scan, tel, driver, kind):
+    segs = segments_for(scan, driver)
+    segs = {k: v[segs['Kind'] == kind] for k, v in segs.items()}
+
+    pos = tel['Distance'] * (scan['Grid'][-1] / tel['Distance'][-1])
+    mask = np.zeros(len(pos), dtype=bool)
+    for start, end in zip(segs['Start'], segs['End']):
+        mask |= (pos >= start) & (pos <= end)
+    return mask, segs
+
+
+def _scan_table(scan, kind):
+    counts = summary(scan)
+    drivers = sorted(counts, key=lambda d: -counts[d][kind])
+    return {"Driver": drivers, "Segments": [counts[d][kind] for d in drivers]}
+
+
+def _finite(values):
+    # JSON has no NaN: missing values become null
+    return [float(v) if np.isfinite(v) else None for v in values]
+
+
+def _format_lap_time(seconds):
+    if not np.isfinite(seconds):
+        return "—"
+    return f"{int(seconds // 60)}:{seconds % 60:06.3f}"
+
+
+def _band_figure(buf, name, grid, bands, title, unit, color):
+    low, mid, high = (buf.ref(f"{name}/{q}", b) for q, b in zip(('p10', 'p50', 'p90'), bands))
+    x = buf.ref(f"{name}/Grid", grid)
+    return figure([
+        {'type': 'scatter', 'x': x, 'y': high, 'mode': 'lines', 'line': {'width': 0},
+         'showlegend': False, 'hoverinfo': 'skip'},
+        {'type': 'scatter', 'x': x, 'y': low, 'mode': 'lines', 'line': {'width': 0},
+         'fill': 'tonexty', 'fillcolor': color + '33', 'name': "p10–p90"},
+        {'type': 'scatter', 'x': x, 'y': mid, 'mode': 'lines',
+         'line': {'color': color, 'width': 2}, 'name': "p50"},
+    ], title, xaxis={'title': "Distance (m)"}, yaxis={'title': unit}, height=320)
+
+
+def driver_views(buf, code, tel, field, scan, ms):
+    ch = {c: buf.ref(f"{code}/{c}", tel[c]) for c in ('X', 'Y', 'Speed', 'Throttle', 'Brake')}
+    views = {}
+
+    for tab, channel, scale in (("Speed Map", 'Speed', 'Viridis'),
+                                ("Throttle Map", 'Throttle', 'Plasma'),
+                                ("Brake Map", 'Brake', 'RdBu')):
+        views[tab] = view([figure([
+            {'type': 'scattergl', 'x': ch['X'], 'y': ch['Y'], 'mode': 'markers',
+             'marker': {'color': ch[channel], 'colorscale': scale, 'size': 4}},
+        ], f"{code} {tab}", height=600, **MAP_AXES)])
+
+    avg_speed, consistency, (strategy, _, reason) = strategy_prediction(tel)
+    views["Race Strategy Predictor"] = view(messages=[
+        ('markdown', "## AI Race Strategy Predictor"),
+        ('write', f"Average Speed: {avg_speed:.1f} km/h"),
+        ('write', f"Speed Consistency Index: {consistency:.1f}"),
+        ('success', f"**Recommended Strategy: {strategy}**"),
+        ('write', reason),
+    ])
+
+    for tab, kind, color, caption in (
+            ("Anomaly Detection", 'slow', '#FF3B3B', "{n} slow zones across {laps} laps (vs field median)"),
+            ("Crash Risk Predictor", 'risk', '#FFA500', "{n} high-risk braking zones")):
+        mask, segs = _scan_mask(scan, tel, code, kind)
+        views[tab] = view([figure([
+            {'type': 'scattergl', 'x': ch['X'], 'y': ch['Y'], 'mode': 'markers',
+             'marker': {'color': '#1f2a36', 'size': 4}, 'showlegend': False},
+            {'type': 'scattergl', 'x': buf.ref(f"{code}/{kind}/X", tel['X'][mask]),
+             'y': buf.ref(f"{code}/{kind}/Y", tel['Y'][mask]), 'mode': 'markers',
+             'marker': {'color': color, 'size': 9}, 'name': kind},
+        ], f"{code}: " + caption.format(n=len(segs['Start']), laps=len(np.unique(segs['LapNumber']))),
+            height=600, **MAP_AXES)], tables=[_scan_table(scan, kind)])
+
+    # Frames are built in the browser from views of the same two buffers
+    replay = figure([
+        {'type': 'scatter', 'x': ch['X'], 'y': ch['Y'], 'mode': 'lines',
+         'line': {'color': 'white', 'width': 3}, 'opacity': 0.15},
+    ], "Lap Replay Animation", height=600, **MAP_AXES)
+    replay['replay'] = {'x': ch['X'], 'y': ch['Y'], 'step': 8}
+    views["Lap Replay"] = view([replay])
+
+    owner = ms['Owner'][minisector_of(tel['Distance'], ms)]
+    order = np.argsort(ms['IdealLap'])
+    views["Minisectors"] = view([figure([
+        {'type': 'scattergl', 'mode': 'markers', 'name': ms['Drivers'][i], 'marker': {'size': 5},
+         'x': buf.ref(f"{code}/Minisectors/{ms['Drivers'][i]}/X", tel['X'][owner == i]),
+         'y': buf.ref(f"{code}/Minisectors/{ms['Drivers'][i]}/Y", tel['Y'][owner == i])}
+        for i in np.unique(owner)
+    ], f"Fastest Driver per Minisector ({len(ms['Edges']) - 1})", height=600, **MAP_AXES)],
+        tables=[{
+            "Driver": ms['Drivers'][order].tolist(),
+            "Best Lap": [_format_lap_time(t) for t in ms['BestLap'][order]],
+            "Ideal Lap": [_format_lap_time(t) for t in ms['IdealLap'][order]],
+            "Left on Table (s)": _finite(np.round(ms['BestLap'] - ms['IdealLap'], 3)[order]),
+        }],
+        messages=[('info', f"Field theoretical best lap: **{_format_lap_time(ms['FieldIdealLap'])}**")])
+
+    env = consistency_envelope(field, code)
+    if env is None:
+        views["Consistency"] = view(messages=[('warning', f"No timed laps for {code}.")])
+    else:
+        views["Consistency"] = view([
+            _band_figure(buf, f"{code}/SpeedBand", env['Grid'], env['Speed'],
+                         "Speed Envelope", "Speed (km/h)", '#00FFFF'),
+            _band_figure(buf, f"{code}/ThrottleBand", env['Grid'], env['Throttle'],
+                         "Throttle Envelope", "Throttle (%)", '#00F5D4'),
+        ], messages=[('write', f"{code}: {env['Laps']} laps — bands are p10 / p50 / p90")])
+
+    return views
+
+
+# --------------------------------------------------------
+# Views of one driver pair
+# --------------------------------------------------------
+def pair_views(buf, d1, d2, tel1, tel2):
+    ref = {code: {c: buf.ref(f"{code}/{c}", tel[c]) for c in ('Distance', 'X', 'Y', 'Speed')}
+           for code, tel in ((d1, tel1), (d2, tel2))}
+    delta = buf.ref(f"{d1}-{d2}/Delta", time_delta(tel1, tel2))
+
+    return {
+        "True Lap Delta": view([figure([
+            {'type': 'scatter', 'x': ref[d1]['Distance'], 'y': delta, 'mode': 'lines',
+             'line': {'color': '#00F5D4', 'width': 2.5}},
+        ], f"Lap Delta — {d1} vs {d2}", xaxis={'title': "Distance (m)"},
+            yaxis={'title': "Time Delta (s)"})]),
+        "Racing Line Overlay": view([figure([
+            {'type': 'scattergl', 'x': ref[d]['X'], 'y': ref[d]['Y'], 'mode': 'lines',
+             'line': {'color': c, 'width': 2}, 'name': d} for d, c in zip((d1, d2), COLORS)
+        ], "Racing Line Overlay", height=600, **MAP_AXES)]),
+        "Speed Trace": view([figure([
+            {'type': 'scattergl', 'x': ref[d]['Distance'], 'y': ref[d]['Speed'], 'mode': 'lines',
+             'line': {'color': c}, 'name': d} for d, c in zip((d1, d2), COLORS)
+        ], "Speed Trace Comparison", xaxis={'title': "Distance (m)"},
+            yaxis={'title': "Speed (km/h)"})]),
+        "Time Loss Map": view([figure([
+            {'type': 'scattergl', 'x': ref[d1]['X'], 'y': ref[d1]['Y'], 'mode': 'markers',
+             'marker': {'color': delta, 'colorscale': 'RdYlGn', 'reversescale': True, 'size': 5}},
+        ], "Time Loss Map (Green = Gain, Red = Loss)", height=600, **MAP_AXES)]),
+        "Insights": view(messages=all_panels(tel1, tel2, d1, d2)),
+    }
+
+
+# --------------------------------------------------------
+# Session-wide views
+# --------------------------------------------------------
+def session_views(buf, session_type, timeline):
+    if timeline is None:
+        return {"Race Timeline": view(messages=[
+            ('info', "The race timeline is available for race and sprint sessions.")])}
+
+    laps = buf.ref("timeline/Laps", timeline['Laps'])
+    return {"Race Timeline": view([figure([
+        {'type': 'scattergl', 'x': laps, 'mode': 'lines', 'name': drv,
+         'y': buf.ref(f"timeline/{drv}/Gap", timeline['GapToLeader'][i])}
+        for i, drv in enumerate(timeline['Drivers'])
+    ], "Gap to Leader", xaxis={'title': "Lap"},
+        yaxis={'title': "Gap (s)", 'autorange': 'reversed'}, height=550)])}
+
+
+# --------------------------------------------------------
+# Build
+# --------------------------------------------------------
+def bundle_name(year, race, session_type):
+    return f"{year}_{race}_{session_type}".replace(" ", "_")
+
+
+def _update_index(out_dir, name, meta):
+    path = os.path.join(out_dir, "index.json")
+    index = {}
+    if os.path.exists(path):
+        with open(path) as f:
+            index = json.load(f)
+    index[name] = meta
+    with open(path, 'w') as f:
+        json.dump(index, f, indent=1)
+
+
+def build_bundle(session, year, race, session_type, pairs, out_dir=BUNDLE_DIR, workers=8):
+    """
+    Precompute every static view for the driver pairs and write the bundle.
+    Returns the bundle directory.
+    """
+    drivers = sorted({d for pair in pairs for d in pair})
+    buf = Buffers()
+
+    def fastest(code):
+        return lap_telemetry(session.laps.pick_drivers(code).pick_fastest())
+
+    def timeline():
+        return race_timeline(session) if session_type in ('R', 'S') else None
+
+    # session -> field laps -> scan / minisectors -> per-driver views;
+    # fastest laps -> per-pair views; race timeline on its own
+    graph = Graph("bundle", workers=workers)
+    graph.add('field', session_lap_arrays, session)
+    graph.add('timeline', timeline)
+    graph.add('scan', scan_session, deps=('field',))
+    graph.add('minisectors', analyse_minisectors, deps=('field',))
+    for code in drivers:
+        graph.add(f"tel/{code}", fastest, code)
+        graph.add(f"driver/{code}", driver_views, buf, code,
+                  deps=(f"tel/{code}", 'field', 'scan', 'minisectors'))
+    for d1, d2 in pairs:
+        graph.add(f"pair/{d1}-{d2}", pair_views, buf, d1, d2, deps=(f"tel/{d1}", f"tel/{d2}"))
+    graph.add('session', session_views, buf, session_type, deps=('timeline',))
+
+    results = graph.run()
+    for node, result in results.items():
+        if isinstance(result, Exception):
+            raise RuntimeError(f"bundle step {node} failed") from result
+
+    views = {
+        'drivers': {code: results[f"driver/{code}"] for code in drivers},
+        'pairs': {f"{d1}-{d2}": results[f"pair/{d1}-{d2}"] for d1, d2 in pairs},
+        'session': results['session'],
+    }
+
+    name = bundle_name(year, race, session_type)
+    path = os.path.join(out_dir, name)
+    os.makedirs(path, exist_ok=True)
+
+    meta = {'year': int(year), 'race': race, 'session': session_type,
+            'pairs': [list(p) for p in pairs]}
+    manifest = {
+        **meta,
+        'tabs': [list(t) for t in TABS],
+        'interactive_only': list(INTERACTIVE_ONLY),
+        'views': views,
+        'buffers': buf.write(os.path.join(path, "buffers.bin")),
+    }
+    with open(os.path.join(path, "manifest.json"), 'w') as f:
+        json.dump(manifest, f, separators=(',', ':'))
+
+    _update_index(out_dir, name, meta)
+    return path
+
+
+if __name__ == "__main__":
+    import fastf1
+
+    if len(sys.argv) < 5:
+        sys.exit('usage: python bundle.py YEAR "RACE" SESSION D1:D2 [D1:D2 ...]')
+
+    year, race, session_type = int(sys.argv[1]), sys.argv[2], sys.argv[3]
+    pairs = [tuple(p.split(':')) for p in sys.argv[4:]]
+
+    fastf1.Cache.enable_cache("fastf1_cache")
+    s = fastf1.get_session(year, race, session_type)
+    s.load()
+
+    path = build_bundle(s, year, race, session_type, pairs)
+    size = sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+    print(f"{path}: {size / 1e6:.2f} MB — open landing/bundle.html")
+
+    g = summarize(perf.graph_timings()['bundle'])
+    print(f"built in {g['wall_ms']:.0f} ms (steps {g['steps_ms']:.0f} ms, "
+          f"critical path {g['critical_ms']:.0f} ms: {' → '.join(g['critical_path'])})")
@@ -0,0 +1,101 @@
+# ============================================================
+# LapVis — Session Catalog
+# Precomputed events / sessions / drivers for the sidebar
+# ============================================================
+#
+# Build (needs network the first time, then FastF1's cache):
+#     python catalog.py 2021 2025
+#
+# The dashboard reads session_catalog.json so the sidebar renders
+# instantly and offline; years missing from the file fall back to FastF1.
+
+import json
+import os
+import sys
+
+CATALOG_PATH = "session_catalog.json"
+
+# FastF1 schedule names -> session identifiers used by the dashboard
+SESSION_IDS = {
+    'Practice 1': 'FP1',
+    'Practice 2': 'FP2',
+    'Practice 3': 'FP3',
+    'Qualifying': 'Q',
+    'Race': 'R',
+    'Sprint': 'S',
+}
+
+
+def load_catalog(path=CATALOG_PATH):
+    """
+    {year: {event: {session: [drivers]}}} — empty if not built yet.
+    Years are stored as strings in JSON and converted back to int here.
+    """
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        raw = json.load(f)
+    return {int(year): events for year, events in raw.items()}
+
+
+def events(catalog, year):
+    return list(catalog.get(year, {}))
+
+
+def sessions(catalog, year, event):
+    return list(catalog.get(year, {}).get(event, {}))
+
+
+def drivers(catalog, year, event, session_type):
+    return catalog.get(year, {}).get(event, {}).get(session_type, [])
+
+
+# --------------------------------------------------------
+# Catalog build
+# --------------------------------------------------------
+def build_year(year):
+    import fastf1
+
+    schedule = fastf1.get_event_schedule(year, include_testing=False)
+    year_catalog = {}
+
+    for _, event in schedule.iterrows():
+        name = event['EventName']
+        year_catalog[name] = {}
+
+        for i in range(1, 6):
+            session_id = SESSION_IDS.get(event.get(f'Session{i}'))
+            if session_id is None:
+                continue
+            try:
+                s = fastf1.get_session(year, name, session_id)
+                s.load(laps=True, telemetry=False, weather=False, messages=False)
+                year_catalog[name][session_id] = sorted(s.laps['Driver'].unique())
+            except Exception as e:
+                # Session not held / not yet available — leave it out
+                print(f"  skipped {year} {name} {session_id}: {e}")
+
+        print(f"{year} {name}: {list(year_catalog[name])}")
+
+    return year_catalog
+
+
+def build_catalog(years, path=CATALOG_PATH, cache_dir="fastf1_cache"):
+    import fastf1
+
+    os.makedirs(cache_dir, exist_ok=True)
+    fastf1.Cache.enable_cache(cache_dir)
+
+    catalog = load_catalog(path)
+    for year in years:
+        catalog[year] = build_year(year)
+
+    with open(path, "w") as f:
+        json.dump({str(y): catalog[y] for y in sorted(catalog)}, f, indent=1)
+
+    return catalog
+
+
+if __name__ == "__main__":
+    years = [int(a) for a in sys.argv[1:3]] or [2021, 2025]
+    build_catalog(range(years[0], years[-1] + 1))
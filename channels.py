@@ -0,0 +1,112 @@
+# ============================================================
+# LapVis v2 — Telemetry Engine
+# Derived Channels: acceleration, g-forces, curvature, inputs
+# ============================================================
+#
+# Computed once per lap, right after the merge, and stored with the
+# lap's cached telemetry. Views and the style fingerprint read these
+# channels instead of differentiating Speed/Brake themselves.
+
+import numpy as np
+
+from kernels import gapped_onsets
+
+G = 9.81
+
+DERIVED_CHANNELS = ('Accel', 'LonG', 'LatG', 'Curvature', 'ThrottleRate',
+                    'BrakeOnset', 'Coasting')
+
+
+def smooth(values, window=5):
+    """
+    Centred moving average (edge-padded, same length as the input).
+    """
+    if window <= 1 or len(values) < window:
+        return np.asarray(values, dtype=float)
+    pad = window // 2
+    padded = np.pad(np.asarray(values, dtype=float), (pad, window - 1 - pad), mode='edge')
+    return np.convolve(padded, np.ones(window) / window, mode='valid')
+
+
+def time_gradient(values, t):
+    """
+    d(values)/dt on uneven sampling. Samples sharing a timestamp would give
+    infinite slopes, so time is made strictly increasing first.
+    """
+    t = np.maximum.accumulate(np.asarray(t, dtype=float))
+    t = t + np.arange(len(t)) * 1e-6
+    return np.gradient(np.asarray(values, dtype=float), t)
+
+
+def curvature(x, y, distance):
+    """
+    Signed path curvature (1/m) from GPS X/Y (FastF1 units: 1/10 m).
+    """
+    s = np.maximum.accumulate(distance) + np.arange(len(distance)) * 1e-6
+    dx = np.gradient(smooth(x / 10.0, 7), s)
+    dy = np.gradient(smooth(y / 10.0, 7), s)
+    ddx = np.gradient(dx, s)
+    ddy = np.gradient(dy, s)
+    norm = np.maximum((dx ** 2 + dy ** 2) ** 1.5, 1e-9)
+    return smooth((dx * ddy - dy * ddx) / norm, 5)
+
+
+def add_derived_channels(tel):
+    """
+    Add derived channels to a telemetry dict (in place) and return it.
+
+    Accel         longitudinal acceleration (m/s^2)
+    LonG / LatG   longitudinal / lateral acceleration in g
+    Curvature     signed path curvature (1/m)
+    ThrottleRate  throttle application rate (%/s)
+    BrakeOnset    True on the first sample of every braking zone
+    Coasting      neither on throttle nor on the brake
+    """
+    t = tel['Time']
+    v = tel['Speed'] / 3.6
+    brake = np.asarray(tel['Brake']).astype(bool)
+    throttle = np.asarray(tel['Throttle'], dtype=float)
+
+    tel['Accel'] = smooth(time_gradient(smooth(v, 3), t), 5)
+    tel['LonG'] = tel['Accel'] / G
+
+    tel['Curvature'] = curvature(tel['X'], tel['Y'], tel['Distance'])
+    tel['LatG'] = v ** 2 * tel['Curvature'] / G
+
+    tel['ThrottleRate'] = smooth(time_gradient(throttle, t), 3)
+
+    # Onsets are compared with the previous sample, so a lap that starts
+    # under braking has no onset at sample 0
+    tel['BrakeOnset'] = np.concatenate(([False], brake[1:] & ~brake[:-1]))
+    tel['Coasting'] = (throttle < 10) & ~brake
+
+    return tel
+
+
+def ensure_derived(tel):
+    """
+    Telemetry as a dict of arrays with the derived channels present.
+    Accepts a cached telemetry dict or a FastF1 Telemetry DataFrame.
+    """
+    if all(ch in tel for ch in DERIVED_CHANNELS):
+        return tel
+
+    arrays = {}
+    for ch in ('Time', 'Distance', 'Speed', 'Throttle', 'Brake', 'X', 'Y'):
+        values = tel[ch]
+        if hasattr(values, 'dt'):
+            values = values.dt.total_seconds()
+        arrays[ch] = np.asarray(values)
+
+    return add_derived_channels(arrays)
+
+
+# --------------------------------------------------------
+# Corner entries from brake onsets
+# --------------------------------------------------------
+def corner_entries(tel, min_gap=80):
+    """
+    Sample indices of braking-zone starts, at least `min_gap` metres apart
+    (closer onsets are noise within one braking zone).
+    """
+    return gapped_onsets(tel['Distance'], np.flatnonzero(tel['BrakeOnset']), min_gap)
@@ -0,0 +1,108 @@
+# ============================================================
+# LapVis v2 — Intelligence Layer
+# Module 5: Cross-Session Comparison (year-over-year)
+# ============================================================
+#
+# Laps from different sessions integrate distance slightly differently
+# and their GPS frames can be shifted/rotated between seasons. Laps are
+# first matched by fraction of lap, then the GPS frame is fitted onto the
+# reference lap and every sample is projected onto the reference line,
+# so deltas are taken at the same physical place on track.
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from alignment import distance_grid, time_delta
+
+
+def load_parallel(keys, loader, workers=5, initializer=None):
+    """
+    Call loader(*key) for every key concurrently.
+    Returns {key: result or the exception raised}.
+    """
+    def run(key):
+        if initializer is not None:
+            initializer()
+        try:
+            return loader(*key)
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(keys)))) as pool:
+        return dict(zip(keys, pool.map(run, keys)))
+
+
+def _on_grid(tel, grid, channels):
+    frac = tel['Distance'] / tel['Distance'][-1] * grid[-1]
+    return [np.interp(grid, frac, tel[ch]) for ch in channels]
+
+
+def fit_frame(ref_xy, other_xy):
+    """
+    Rigid transform (rotation R, translation t) minimising
+    |R @ other + t - ref| over corresponding points (Kabsch).
+    """
+    ref_c = ref_xy.mean(axis=0)
+    other_c = other_xy.mean(axis=0)
+
+    h = (other_xy - other_c).T @ (ref_xy - ref_c)
+    u, _, vt = np.linalg.svd(h)
+    d = np.sign(np.linalg.det(vt.T @ u.T))
+    rot = vt.T @ np.diag([1.0, d]) @ u.T
+
+    return rot, ref_c - rot @ other_c
+
+
+def align_to_reference(ref, other, step=5.0, window=200.0):
+    """
+    Re-express `other`'s Distance in `ref`'s distance frame.
+
+    Returns a copy of `other` with X/Y moved into ref's GPS frame and
+    Distance replaced by the distance of the nearest point on ref's line
+    (searched within `window` m of the fraction-of-lap estimate).
+    """
+    grid = distance_grid(ref['Distance'][-1], step)
+    ref_x, ref_y = _on_grid(ref, grid, ('X', 'Y'))
+    oth_x, oth_y = _on_grid(other, grid, ('X', 'Y'))
+
+    rot, shift = fit_frame(np.column_stack((ref_x, ref_y)),
+                           np.column_stack((oth_x, oth_y)))
+    xy = np.column_stack((other['X'], other['Y'])) @ rot.T + shift
+
+    # Candidate reference points around each sample's fraction-of-lap position
+    guess = np.searchsorted(grid, other['Distance'] / other['Distance'][-1] * grid[-1])
+    w = int(window / step)
+    cand = (guess[:, None] + np.arange(-w, w + 1)[None, :]).clip(0, len(grid) - 1)
+
+    dist2 = (ref_x[cand] - xy[:, :1]) ** 2 + (ref_y[cand] - xy[:, 1:]) ** 2
+    nearest = cand[np.arange(len(cand)), np.argmin(dist2, axis=1)]
+
+    # Refine to the foot of the perpendicular on the segment leaving the
+    # nearest point (or the one arriving at it, if the sample is behind)
+    j = nearest.clip(0, len(grid) - 2)
+    seg_x, seg_y = ref_x[j + 1] - ref_x[j], ref_y[j + 1] - ref_y[j]
+    u = ((xy[:, 0] - ref_x[j]) * seg_x + (xy[:, 1] - ref_y[j]) * seg_y) \
+        / np.maximum(seg_x ** 2 + seg_y ** 2, 1e-9)
+    u = np.where(j > 0, u.clip(-1, 1), u.clip(0, 1))
+    distance = grid[j] + u * (grid[1] - grid[0])
+
+    aligned = dict(other)
+    aligned['X'] = xy[:, 0]
+    aligned['Y'] = xy[:, 1]
+    aligned['Distance'] = np.maximum.accumulate(distance.clip(0, grid[-1]))
+    return aligned
+
+
+def compare(ref, other, step=5.0):
+    """
+    Spatially aligned comparison of two laps from any two sessions.
+    Returns ref distance, time delta (other - ref) and both speed traces.
+    """
+    aligned = align_to_reference(ref, other, step)
+    return {
+        'Distance': ref['Distance'],
+        'Delta': time_delta(ref, aligned),
+        'SpeedRef': ref['Speed'],
+        'SpeedOther': np.interp(ref['Distance'], aligned['Distance'], aligned['Speed']),
+    }
@@ -0,0 +1,90 @@
+# ============================================================
+# LapVis v2 — Intelligence Layer
+# Module 4: Multi-lap Consistency Envelope
+# ============================================================
+#
+# All of a driver's laps (a stint, or every Q run) stacked on one
+# distance grid and reduced to p10 / p50 / p90 bands.
+
+import warnings
+
+import numpy as np
+
+from alignment import distance_grid, percentile_bands, reference_length, stack_laps
+from kernels import gapped_onsets
+
+BANDS = (10, 50, 90)
+
+
+def select_laps(field, driver, stints=None):
+    """
+    Row indices of a driver's laps in the field, optionally only some stints.
+    """
+    mask = field['Driver'] == driver
+    if stints:
+        mask &= np.isin(field['Stint'], stints)
+    return np.flatnonzero(mask)
+
+
+def onset_distances(lap, length):
+    """
+    Brake-onset distances of one lap, scaled onto a grid of `length` m.
+    """
+    d = lap['Distance'] * (length / lap['Distance'][-1])
+    return d[lap['BrakeOnset'] > 0.5]
+
+
+def match_onsets(laps, corners, length, window=100.0):
+    """
+    (laps, corners) matrix of each lap's brake-onset distance for every
+    reference corner; NaN where the lap has no onset within `window` m.
+    """
+    out = np.full((len(laps), len(corners)), np.nan)
+
+    for row, lap in enumerate(laps):
+        # Sentinels so every corner has a left and right neighbour
+        onsets = np.concatenate(([-np.inf], onset_distances(lap, length), [np.inf]))
+        idx = np.searchsorted(onsets, corners)
+        left, right = onsets[idx - 1], onsets[idx]
+
+        nearest = np.where(corners - left < right - corners, left, right)
+        out[row] = np.where(np.abs(nearest - corners) <= window, nearest, np.nan)
+
+    return out
+
+
+def consistency_envelope(field, driver, stints=None, step=5.0, min_gap=80.0):
+    """
+    Percentile bands of Speed / Throttle along the lap and of brake-onset
+    distance per corner, over all selected laps of one driver.
+    """
+    rows = select_laps(field, driver, stints)
+    laps = [field['Laps'][i] for i in rows]
+    if len(laps) == 0:
+        return None
+
+    grid = distance_grid(reference_length(laps), step)
+    stacks = stack_laps(laps, grid, ('Speed', 'Throttle'))
+
+    # Reference corners = onsets of the driver's fastest selected lap,
+    # each at least min_gap past the last kept one (the same greedy rule
+    # as channels.corner_entries)
+    best = laps[int(np.argmin(field['LapTime'][rows]))]
+    d = best['Distance'] * (grid[-1] / best['Distance'][-1])
+    corners = d[gapped_onsets(d, np.flatnonzero(best['BrakeOnset'] > 0.5), min_gap)]
+
+    onset_matrix = match_onsets(laps, corners, grid[-1])
+    with warnings.catch_warnings():
+        # Corners no lap braked for give all-NaN columns -> NaN bands
+        warnings.simplefilter('ignore', RuntimeWarning)
+        onset_bands = np.nanpercentile(onset_matrix, BANDS, axis=0)
+
+    return {
+        'Grid': grid,
+        'Laps': len(laps),
+        'LapNumbers': field['LapNumber'][rows],
+        'Speed': percentile_bands(stacks['Speed'], BANDS),
+        'Throttle': percentile_bands(stacks['Throttle'], BANDS),
+        'Corners': corners,
+        'BrakeOnset': onset_bands,
+    }
@@ -0,0 +1,64 @@
+# ============================================================
+# LapVis — Zoom-Aware Downsampling
+# Constant-size trace payloads at any zoom level
+# ============================================================
+#
+# A chart asks for the samples of a distance window:
+#   - full lap (overview)  -> LTTB-downsampled to POINTS per series
+#   - zoomed-in window     -> the full-resolution samples of that window,
+#                             still capped at POINTS per series
+# so what is sent to the browser depends on the chart, not on how long the
+# lap is or how densely it was sampled.
+
+import numpy as np
+
+from kernels import lttb
+
+# Per series. A native merged lap has ~600-1000 samples (more once
+# resampled to 10 Hz); 400 LTTB points keep every braking zone's shape at
+# full-lap zoom on a ~1000 px wide chart, and a zoomed-in window of a few
+# hundred metres is back at full resolution.
+POINTS = 400
+
+
+def window_slice(x, lo, hi):
+    """
+    Slice of sorted x covering [lo, hi], plus one neighbour each side so
+    lines run to the chart edges.
+    """
+    start = max(np.searchsorted(x, lo, side='left') - 1, 0)
+    stop = min(np.searchsorted(x, hi, side='right') + 1, len(x))
+    return slice(start, stop)
+
+
+def visible(x, y, lo, hi, points=POINTS):
+    """(x, y) of the window [lo, hi], at most `points` samples."""
+    part = window_slice(x, lo, hi)
+    xs, ys = x[part], y[part]
+    keep = lttb(xs, ys, points)
+    return xs[keep], ys[keep]
+
+
+def visible_series(arrays, x_key, y_keys, lo, hi, points=POINTS):
+    """
+    {channel: (x, y)} of several channels sharing one distance axis,
+    each downsampled on its own shape.
+    """
+    x = arrays[x_key]
+    return {key: visible(x, arrays[key], lo, hi, points) for key in y_keys}
+
+
+if __name__ == "__main__":
+    import time
+
+    rng = np.random.default_rng(0)
+    for samples in (700, 7_000, 70_000):
+        x = np.linspace(0, 5000, samples)
+        y = 200 + 100 * np.sin(x / 300) + rng.normal(0, 2, samples)
+
+        t = time.perf_counter()
+        overview = visible(x, y, 0, 5000)
+        zoomed = visible(x, y, 1200, 1500)
+        ms = (time.perf_counter() - t) * 1000
+        print(f"{samples:>6} samples: overview {len(overview[0])}, "
+              f"zoom 300 m {len(zoomed[0])} points  ({ms:.1f} ms)")
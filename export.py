@@ -0,0 +1,142 @@
+# ============================================================
+# LapVis — Export
+# Arrow IPC / Parquet straight from the cached NumPy buffers
+# ============================================================
+#
+# Numeric channels are wrapped as Arrow arrays without copying; Arrow
+# IPC files are written uncompressed so notebooks can memory-map them:
+#
+#     import pyarrow as pa
+#     table = pa.ipc.open_file(pa.memory_map("lap.arrow")).read_all()
+
+import numpy as np
+
+from alignment import FIELD_CHANNELS, time_delta
+from telemetry import CAR_DISCRETE, _forward_fill
+
+COMPARISON_CHANNELS = ('Speed', 'Throttle', 'Brake', 'nGear', 'X', 'Y')
+
+FORMATS = {
+    'Arrow IPC': ('arrow', 'application/vnd.apache.arrow.file'),
+    'Parquet': ('parquet', 'application/vnd.apache.parquet'),
+}
+
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Export needs pyarrow: pip install pyarrow") from e
+    return pa, pq
+
+
+# --------------------------------------------------------
+# Column sets
+# --------------------------------------------------------
+def comparison_columns(tel1, tel2, d1, d2):
+    """
+    The aligned comparison as columns on driver1's distance axis:
+    Distance, Delta and every channel of both drivers. Driver2's discrete
+    channels (Brake, nGear) are forward-filled, not interpolated, so they
+    keep their own values.
+    """
+    d = tel1['Distance']
+    columns = {'Distance': d, 'Delta': time_delta(tel1, tel2)}
+
+    for ch in COMPARISON_CHANNELS:
+        columns[f'{d1}_{ch}'] = tel1[ch]
+        if ch in CAR_DISCRETE:
+            columns[f'{d2}_{ch}'] = _forward_fill(tel2['Distance'], tel2[ch], d)
+        else:
+            columns[f'{d2}_{ch}'] = np.interp(d, tel2['Distance'], tel2[ch])
+
+    return columns
+
+
+def session_columns(field):
+    """
+    Every lap of a session in one long table (Driver/LapNumber per row).
+    A session without usable laps gives the same columns, empty.
+    """
+    laps = field['Laps']
+    if not laps:
+        columns = {'Driver': np.array([], dtype=str), 'LapNumber': np.array([], dtype=int)}
+        columns.update({ch: np.array([], dtype=float) for ch in FIELD_CHANNELS})
+        return columns
+
+    sizes = np.array([len(lap['Distance']) for lap in laps])
+
+    columns = {
+        'Driver': np.repeat(field['Driver'], sizes),
+        'LapNumber': np.repeat(field['LapNumber'], sizes),
+    }
+    for ch in laps[0]:
+        columns[ch] = np.concatenate([lap[ch] for lap in laps])
+
+    return columns
+
+
+# --------------------------------------------------------
+# Arrow conversion + writers
+# --------------------------------------------------------
+def _arrow_array(pa, values):
+    values = np.asarray(values)
+
+    if values.dtype.kind in 'iuf' and values.flags.c_contiguous:
+        # Zero-copy: Arrow references the NumPy buffer directly
+        return pa.Array.from_buffers(pa.from_numpy_dtype(values.dtype), len(values),
+                                     [None, pa.py_buffer(values)])
+
+    return pa.array(values)
+
+
+def to_arrow(columns, metadata=None):
+    pa, _ = _pyarrow()
+
+    table = pa.table({name: _arrow_array(pa, v) for name, v in columns.items()})
+    if metadata:
+        table = table.replace_schema_metadata(
+            {k: str(v) for k, v in metadata.items()})
+    return table
+
+
+def write(table, sink, fmt='arrow'):
+    """
+    Write an Arrow table to a path or file-like object.
+    'arrow' -> uncompressed IPC file (memory-mappable), 'parquet' -> Parquet.
+    """
+    pa, pq = _pyarrow()
+
+    if fmt == 'parquet':
+        pq.write_table(table, sink)
+        return
+
+    with pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+
+
+def to_bytes(table, fmt='arrow'):
+    pa, _ = _pyarrow()
+
+    sink = pa.BufferOutputStream()
+    write(table, sink, fmt)
+    return sink.getvalue().to_pybytes()
+
+
+def read(path):
+    """
+    Memory-map an Arrow IPC file, or read a Parquet file.
+    """
+    pa, pq = _pyarrow()
+
+    if str(path).endswith('.parquet'):
+        return pq.read_table(path, memory_map=True)
+    return pa.ipc.open_file(pa.memory_map(str(path))).read_all()
+
+
+def export_session(field, path, fmt='arrow', metadata=None):
+    """
+    Bulk export of every lap of a session to one file.
+    """
+    write(to_arrow(session_columns(field), metadata), str(path), fmt)
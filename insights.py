@@ -0,0 +1,226 @@
+# ============================================================
+# LapVis — Insight Panels
+# Text insights of a two-driver comparison
+# ============================================================
+#
+# Every panel returns a list of (level, markdown) messages, where level is
+# the Streamlit call that renders it ('markdown', 'success', 'info',
+# 'warning', 'error', 'write'). The dashboard renders them with st.*; the
+# static export writes them to the bundle as they are.
+#
+# The lap delta and the corner segmentation are shared by the panels:
+# insight_graph() computes them once and feeds every panel. The panels
+# take milliseconds, so all_panels() runs the graph inline — a pool
+# round-trip per rerun would cost more than it saves.
+
+import numpy as np
+
+from alignment import time_delta
+from channels import corner_entries
+from scheduler import Graph
+
+CORNER_LIMIT = 15       # corners analysed (the first 12 for the per-turn panels)
+
+
+def corner_deltas(tel1, delta, limit=CORNER_LIMIT):
+    """
+    Driver1's corner entries and the mean delta in a +/-40 m window
+    around each of them.
+    """
+    distance = tel1['Distance']
+    entries = corner_entries(tel1)[:limit]
+
+    deltas = [np.mean(delta[(distance > c - 40) & (distance < c + 40)])
+              for c in distance[entries]]
+    return entries, np.array(deltas)
+
+
+def telemetry_insights(t1, t2, d1, d2, delta, corners):
+    d = t1['Distance']
+
+    # Where biggest gain happens
+    gain_distance = d[np.argmin(delta)]
+
+    # Sector split
+    s1 = d[-1] / 3
+    s2 = 2 * d[-1] / 3
+
+    s1_delta = np.mean(delta[d < s1])
+    s2_delta = np.mean(delta[(d >= s1) & (d < s2)])
+    s3_delta = np.mean(delta[d >= s2])
+
+    if s2_delta < s1_delta and s2_delta < s3_delta:
+        best_sector = "Sector 2 (technical corners)"
+    elif s1_delta < s3_delta:
+        best_sector = "Sector 1 (high speed)"
+    else:
+        best_sector = "Sector 3 (corner exits)"
+
+    out = [
+        ('markdown', "##  Lap Intelligence Insights"),
+        ('success', f"Biggest time gain for **{d1}** occurs around **{int(gain_distance)} meters**"),
+        ('info', f"**{d1}** is strongest in **{best_sector}**"),
+    ]
+
+    # Speed aggression
+    if np.std(t1['Speed']) > np.std(t2['Speed']):
+        out.append(('warning', f"**{d1}** is driving more aggressively than **{d2}** (higher speed variance)"))
+    else:
+        out.append(('warning', f"**{d2}** is driving more aggressively than **{d1}**"))
+
+    # Brake comparison
+    if np.sum(t1['Brake']) < np.sum(t2['Brake']):
+        out.append(('write', f"🟢 **{d1} brakes later** than {d2}"))
+    else:
+        out.append(('write', f"🟢 **{d2} brakes later** than {d1}"))
+
+    return out
+
+
+def corner_by_corner(tel1, tel2, d1, d2, delta, corners):
+    out = [('markdown', "## 🏁 Corner-by-Corner Analysis")]
+
+    # Limit to 12 corners for readability
+    deltas = corners[1][:12]
+    for idx, corner_delta in enumerate(deltas, start=1):
+        if corner_delta < 0:
+            out.append(('success', f"Turn {idx}: **{d1} gains {abs(corner_delta):.3f}s**"))
+        else:
+            out.append(('error', f"Turn {idx}: **{d2} gains {abs(corner_delta):.3f}s**"))
+
+    return out
+
+
+def race_engineer_summary(tel1, tel2, d1, d2, delta, corners):
+    deltas = corners[1][:12]
+    gains_d1 = int(np.sum(deltas < 0))
+    gains_d2 = len(deltas) - gains_d1
+
+    if gains_d1 > gains_d2:
+        verdict = ('success', f"{d1} is stronger in technical corner sections and gains "
+                              f"time in more turns than {d2}.")
+    else:
+        verdict = ('error', f"{d2} is stronger in corner exits and braking zones, "
+                            f"gaining advantage over {d1}.")
+
+    return [
+        ('markdown', "##  Race Engineer Summary"),
+        verdict,
+        ('info', "This summary is generated automatically from braking patterns "
+                 "and time delta across every corner."),
+    ]
+
+
+def corner_type_performance(tel1, tel2, d1, d2, delta, corners):
+    entries, deltas = corners
+
+    # Classify corner by speed at braking
+    entry_speed = tel1['Speed'][entries]
+    gained = deltas < 0
+    slow_gain = int(np.sum(gained & (entry_speed < 120)))
+    medium_gain = int(np.sum(gained & (entry_speed >= 120) & (entry_speed < 220)))
+    fast_gain = int(np.sum(gained & (entry_speed >= 220)))
+
+    out = [
+        ('markdown', "##  Corner Type Performance"),
+        ('write', f"**Slow corners gained by {d1}:** {slow_gain}"),
+        ('write', f"**Medium speed corners gained by {d1}:** {medium_gain}"),
+        ('write', f"**High speed corners gained by {d1}:** {fast_gain}"),
+    ]
+
+    if slow_gain > medium_gain and slow_gain > fast_gain:
+        out.append(('success', f"{d1} is significantly stronger in slow technical hairpins."))
+    elif fast_gain > slow_gain and fast_gain > medium_gain:
+        out.append(('success', f"{d1} gains major time in high-speed sweepers and flowing sections."))
+    else:
+        out.append(('success', f"{d1} shows balanced performance across corner types."))
+
+    return out
+
+
+def engineer_commentary(t1, t2, d1, d2, delta, corners):
+    d = t1['Distance']
+    s1 = t1['Speed']
+    s2_interp = np.interp(d, t2['Distance'], t2['Speed'])
+
+    gain_point = int(d[np.argmin(delta)])
+
+    # Straight line performance
+    straight_mask = s1 > np.percentile(s1, 85)
+    straight_adv = np.mean(s1[straight_mask] - s2_interp[straight_mask])
+
+    # Braking zones
+    brake_mask = s1 < np.percentile(s1, 30)
+    brake_adv = np.mean(s1[brake_mask] - s2_interp[brake_mask])
+
+    out = [('markdown', "##  Lap Intelligence Insights")]
+
+    if delta[-1] < 0:
+        out.append(('success', f"{d1} is faster overall than {d2} on this lap."))
+    else:
+        out.append(('error', f"{d2} is faster overall than {d1} on this lap."))
+
+    out.append(('info', f"Biggest time gain occurs around **{gain_point} meters** of the track."))
+
+    if straight_adv > 0:
+        out.append(('write', f"• {d1} has superior straight-line speed compared to {d2}."))
+    else:
+        out.append(('write', f"• {d2} has superior straight-line speed compared to {d1}."))
+
+    if brake_adv < 0:
+        out.append(('write', f"• {d2} brakes later into heavy braking zones."))
+    else:
+        out.append(('write', f"• {d1} brakes later into heavy braking zones."))
+
+    out.append(('write', "• Time differences are mainly created on corner exits rather than entries."))
+    return out
+
+
+PANELS = (telemetry_insights, corner_by_corner, race_engineer_summary,
+          corner_type_performance, engineer_commentary)
+
+
+def insight_graph(tel1, tel2, d1, d2, graph=None):
+    """
+    Add the insight steps to a graph (a new one by default):
+    delta -> corners -> every panel. Panel nodes are named after the
+    panel functions.
+    """
+    graph = graph or Graph("insights", workers=0)
+    graph.add('delta', time_delta, tel1, tel2)
+    graph.add('corners', corner_deltas, tel1, deps=('delta',))
+    for panel in PANELS:
+        graph.add(panel.__name__, panel, tel1, tel2, d1, d2, deps=('delta', 'corners'))
+    return graph
+
+
+def all_panels(tel1, tel2, d1, d2, initializer=None):
+    """Every insight panel of the dashboard, in page order."""
+    results = insight_graph(tel1, tel2, d1, d2).run(initializer)
+
+    out = []
+    for panel in PANELS:
+        msgs = results[panel.__name__]
+        if isinstance(msgs, Exception):
+            out.append(('warning', f"{panel.__name__.replace('_', ' ').capitalize()} unavailable: {msgs}"))
+        else:
+            out.extend(msgs)
+    return out
+
+
+# --------------------------------------------------------
+# Strategy predictor
+# --------------------------------------------------------
+def strategy_prediction(tel):
+    """
+    Average speed, speed consistency and the recommended tyre strategy
+    (strategy, colour, reason) for one lap.
+    """
+    avg_speed = float(np.mean(tel['Speed']))
+    consistency = float(np.std(tel['Speed']))
+
+    if avg_speed > 250 and consistency < 20:
+        return avg_speed, consistency, ("Hard → Medium (Long Stint)", '#00FF88',
+                                        "Driver maintains high speed with low variance. Tyre wear is stable.")
+    return avg_speed, consistency, ("Medium → Soft (Aggressive)", '#FF4D6D',
+                                    "High speed variance indicates aggressive driving. Softer tyres faster.")
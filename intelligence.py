@@ -5,17 +5,22 @@
 
 import numpy as np
 
+from channels import ensure_derived
+from kernels import window_means
+
 
 def build_driver_style(tel):
     """
     Analyze telemetry and build a Driver Style Profile.
-    Works on a single fastest lap telemetry.
+    Works on a single fastest lap telemetry (cached telemetry dict with
+    derived channels, or a FastF1 Telemetry DataFrame).
     """
 
-    speed = tel['Speed'].values
-    throttle = tel['Throttle'].values
-    brake = tel['Brake'].values
-    distance = tel['Distance'].values
+    tel = ensure_derived(tel)
+
+    speed = np.asarray(tel['Speed'], dtype=float)
+    brake = np.asarray(tel['Brake'], dtype=float)
+    distance = np.asarray(tel['Distance'], dtype=float)
 
     # --------------------------------------------------------
     # 1. Braking Style (Late vs Early)
@@ -36,9 +41,10 @@ def build_driver_style(tel):
     # --------------------------------------------------------
     # 2. Throttle Aggression
     # --------------------------------------------------------
-    throttle_gradient = np.mean(np.abs(np.gradient(throttle)))
+    # Mean throttle application rate in %/s (time-correct, not per sample)
+    throttle_rate = np.mean(np.abs(tel['ThrottleRate']))
 
-    if throttle_gradient > 8:
+    if throttle_rate > 70:
         throttle_style = "Aggressive Throttle Application"
     else:
         throttle_style = "Progressive Throttle Application"
@@ -46,9 +52,13 @@ def build_driver_style(tel):
     # --------------------------------------------------------
     # 3. Driving Smoothness (car control)
     # --------------------------------------------------------
-    smoothness = np.std(np.gradient(speed))
+    # Spread of longitudinal acceleration in m/s^2. A clean F1 lap already
+    # spreads widely: ~15% of it at -30..-45 m/s^2 under braking and most
+    # of the rest at 0..+15 on traction, which puts its std at ~12-16.
+    # Only jerky inputs (pumping the brake, lifts, snaps) push it past 18.
+    smoothness = np.std(tel['Accel'])
 
-    if smoothness > 12:
+    if smoothness > 18:
         smoothness_style = "Unstable / Aggressive Inputs"
     else:
         smoothness_style = "Smooth / Controlled Inputs"
@@ -57,13 +67,8 @@ def build_driver_style(tel):
     # 4. Corner Priority (Entry vs Exit)
     # --------------------------------------------------------
     # Compare average speed before braking vs after braking
-    pre_brake_speeds = []
-    post_brake_speeds = []
-
-    for i in brake_points:
-        if i > 20 and i < len(speed) - 20:
-            pre_brake_speeds.append(np.mean(speed[i-20:i]))
-            post_brake_speeds.append(np.mean(speed[i:i+20]))
+    inner = brake_points[(brake_points > 20) & (brake_points < len(speed) - 20)]
+    pre_brake_speeds, post_brake_speeds = window_means(speed, inner, 20)
 
     if len(pre_brake_speeds) > 0:
         if np.mean(post_brake_speeds) > np.mean(pre_brake_speeds):
@@ -0,0 +1,315 @@
+# ============================================================
+# LapVis — Numeric Kernels
+# Pure-NumPy reference + optional Numba JIT backend
+# ============================================================
+#
+# The hot loops of the corner / style / batch-resampling / downsampling
+# code live here
+# behind one small API. The backend is picked at runtime:
+#
+#     LAPVIS_KERNELS=auto    numba when installed, else numpy (default)
+#     LAPVIS_KERNELS=numpy   always the reference implementation
+#     LAPVIS_KERNELS=numba   numba, falling back to numpy if missing
+#
+# Parity checks and benchmarks for every available backend:
+#     python kernels.py
+
+import os
+import threading
+import time
+
+import numpy as np
+
+BACKENDS = ('numpy', 'numba')
+
+
+# --------------------------------------------------------
+# NumPy reference implementations
+# --------------------------------------------------------
+def _gapped_onsets_numpy(distance, onsets, min_gap):
+    # Greedy: keep an onset only if it is > min_gap past the last kept one.
+    # Sequential by nature, but only runs over the onsets (tens per lap)
+    keep = np.zeros(len(onsets), dtype=bool)
+    last = -np.inf
+    for k, d in enumerate(distance[onsets].tolist()):
+        if d - last > min_gap:
+            keep[k] = True
+            last = d
+    return onsets[keep]
+
+
+def _window_means_numpy(values, index, width):
+    # Mean of values[i - width:i] and values[i:i + width] for every i,
+    # from one cumulative sum instead of a slice + mean per point
+    csum = np.concatenate(([0.0], np.cumsum(values, dtype=float)))
+    before = (csum[index] - csum[index - width]) / width
+    after = (csum[index + width] - csum[index]) / width
+    return before, after
+
+
+def _batch_interp_numpy(grid, xs, ys):
+    out = np.empty((len(xs), len(grid)))
+    for row, (x, y) in enumerate(zip(xs, ys)):
+        out[row] = np.interp(grid, x, y)
+    return out
+
+
+def _lttb_numpy(x, y, n):
+    # Largest-Triangle-Three-Buckets: first and last points, then per
+    # bucket the point spanning the largest triangle with the previously
+    # kept point and the mean of the next bucket
+    edges = np.linspace(1, len(x) - 1, n - 1).astype(int)
+    keep = np.empty(n, dtype=np.int64)
+    keep[0], keep[-1] = 0, len(x) - 1
+    a = 0
+    for b in range(n - 2):
+        lo, hi = edges[b], edges[b + 1]
+        nxt_hi = edges[b + 2] if b + 2 < n - 1 else len(x)
+        cx, cy = x[hi:nxt_hi].mean(), y[hi:nxt_hi].mean()
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(np.argmax(area))
+        keep[b + 1] = a
+    return keep
+
+
+NUMPY_KERNELS = {
+    'gapped_onsets': _gapped_onsets_numpy,
+    'window_means': _window_means_numpy,
+    'batch_interp': _batch_interp_numpy,
+    'lttb': _lttb_numpy,
+}
+
+
+# --------------------------------------------------------
+# Numba backend (compiled on first use)
+# --------------------------------------------------------
+def _numba_kernels():
+    import numba
+
+    # TBB (numba's first choice) hangs interpreter exit when its pool is
+    # first started off the main thread — every Streamlit script and
+    # analysis-graph worker is. An explicit NUMBA_THREADING_LAYER wins.
+    if "NUMBA_THREADING_LAYER" not in os.environ:
+        numba.config.THREADING_LAYER_PRIORITY = ['omp', 'workqueue', 'tbb']
+
+    @numba.njit(cache=True)
+    def gapped_onsets(distance, onsets, min_gap):
+        keep = np.zeros(len(onsets), dtype=np.bool_)
+        last = -np.inf
+        for k in range(len(onsets)):
+            d = distance[onsets[k]]
+            if d - last > min_gap:
+                keep[k] = True
+                last = d
+        return onsets[keep]
+
+    @numba.njit(cache=True)
+    def window_means(values, index, width):
+        before = np.empty(len(index))
+        after = np.empty(len(index))
+        for k in range(len(index)):
+            i = index[k]
+            a = 0.0
+            b = 0.0
+            for j in range(width):
+                a += values[i - width + j]
+                b += values[i + j]
+            before[k] = a / width
+            after[k] = b / width
+        return before, after
+
+    @numba.njit(parallel=True, cache=True)
+    def _interp_packed(grid, x, y, offsets):
+        out = np.empty((len(offsets) - 1, len(grid)))
+        for row in numba.prange(len(offsets) - 1):
+            lo, hi = offsets[row], offsets[row + 1]
+            out[row] = np.interp(grid, x[lo:hi], y[lo:hi])
+        return out
+
+    @numba.njit(cache=True)
+    def lttb(x, y, n, edges):
+        keep = np.empty(n, dtype=np.int64)
+        keep[0] = 0
+        keep[n - 1] = len(x) - 1
+        a = 0
+        for b in range(n - 2):
+            lo, hi = edges[b], edges[b + 1]
+            nxt_hi = edges[b + 2] if b + 2 < n - 1 else len(x)
+            cx = x[hi:nxt_hi].mean()
+            cy = y[hi:nxt_hi].mean()
+            best, best_area = lo, -1.0
+            for i in range(lo, hi):
+                area = abs((x[a] - cx) * (y[i] - y[a]) - (x[a] - x[i]) * (cy - y[a]))
+                if area > best_area:
+                    best, best_area = i, area
+            a = best
+            keep[b + 1] = a
+        return keep
+
+    # The workqueue layer must not be entered from two threads at once, and
+    # the analysis graph / scan pools call this concurrently. prange already
+    # uses every core, so serialize.
+    parallel_lock = threading.Lock()
+
+    def batch_interp(grid, xs, ys):
+        # Laps have different lengths: pack them flat with offsets
+        offsets = np.concatenate(([0], np.cumsum([len(x) for x in xs])))
+        args = (np.asarray(grid, dtype=float), np.concatenate(xs).astype(float),
+                np.concatenate(ys).astype(float), offsets)
+        with parallel_lock:
+            return _interp_packed(*args)
+
+    return {
+        'gapped_onsets': lambda d, o, g: gapped_onsets(np.asarray(d, dtype=float),
+                                                       np.asarray(o, dtype=np.int64), float(g)),
+        'window_means': lambda v, i, w: window_means(np.asarray(v, dtype=float),
+                                                     np.asarray(i, dtype=np.int64), int(w)),
+        'batch_interp': batch_interp,
+        'lttb': lambda x, y, n: lttb(np.asarray(x, dtype=float), np.asarray(y, dtype=float), int(n),
+                                     np.linspace(1, len(x) - 1, n - 1).astype(np.int64)),
+    }
+
+
+_LOADED = {'numpy': NUMPY_KERNELS}
+_ACTIVE = None
+
+
+def load_backend(name):
+    """Kernel table of a backend, or None if it cannot be loaded here."""
+    if name not in _LOADED:
+        try:
+            _LOADED[name] = _numba_kernels() if name == 'numba' else None
+        except ImportError:
+            _LOADED[name] = None
+    return _LOADED[name]
+
+
+def available_backends():
+    return [name for name in BACKENDS if load_backend(name) is not None]
+
+
+def use(name='auto'):
+    """
+    Select the backend ('auto', 'numpy', 'numba'); falls back to numpy
+    when the requested one is not installed. Returns the backend in use.
+    """
+    global _ACTIVE
+    if name == 'auto':
+        name = 'numba' if load_backend('numba') is not None else 'numpy'
+    _ACTIVE = name if load_backend(name) is not None else 'numpy'
+    return _ACTIVE
+
+
+def backend():
+    if _ACTIVE is None:
+        use(os.environ.get("LAPVIS_KERNELS", "auto"))
+    return _ACTIVE
+
+
+def _kernel(name):
+    return _LOADED[backend()][name]
+
+
+# --------------------------------------------------------
+# Public kernels
+# --------------------------------------------------------
+def gapped_onsets(distance, onsets, min_gap):
+    """
+    Onset indices at least `min_gap` metres after the previous kept one.
+    """
+    onsets = np.asarray(onsets, dtype=int)
+    if len(onsets) == 0:
+        return onsets
+    return _kernel('gapped_onsets')(distance, onsets, min_gap)
+
+
+def window_means(values, index, width):
+    """
+    (before, after): mean of the `width` samples before and from each
+    index. Indices must satisfy width <= i <= len(values) - width.
+    """
+    index = np.asarray(index, dtype=int)
+    if len(index) == 0:
+        return np.empty(0), np.empty(0)
+    return _kernel('window_means')(values, index, width)
+
+
+def batch_interp(grid, xs, ys):
+    """
+    np.interp(grid, xs[i], ys[i]) for every i, shape (len(xs), len(grid)).
+    """
+    if len(xs) == 0:
+        return np.empty((0, len(grid)))
+    return _kernel('batch_interp')(grid, xs, ys)
+
+
+def lttb(x, y, n):
+    """
+    Indices of n samples of (x, y) that keep its visual shape
+    (Largest-Triangle-Three-Buckets); every index when len(x) <= n.
+    """
+    if len(x) <= n or n < 3:
+        return np.arange(len(x))
+    return _kernel('lttb')(x, y, n)
+
+
+# --------------------------------------------------------
+# Parity + benchmark
+# --------------------------------------------------------
+def _synthetic_laps(n=70, samples=700, seed=0):
+    rng = np.random.default_rng(seed)
+    laps = []
+    for _ in range(n):
+        size = samples + int(rng.integers(-50, 50))
+        distance = np.cumsum(rng.uniform(5, 10, size))
+        speed = 200 + 100 * np.sin(distance / 400) + rng.normal(0, 3, size)
+        onset = np.flatnonzero(np.diff(np.sin(distance / 400) < -0.3, prepend=False))
+        laps.append({'Distance': distance, 'Speed': speed, 'Onsets': onset})
+    return laps
+
+
+def _run(kernels, laps, grid):
+    onsets = [kernels['gapped_onsets'](lap['Distance'], lap['Onsets'], 80.0) for lap in laps]
+    means = []
+    for lap in laps:
+        idx = np.arange(20, len(lap['Speed']) - 20)
+        means.append(kernels['window_means'](lap['Speed'], idx, 20))
+    stack = kernels['batch_interp'](grid, [lap['Distance'] for lap in laps],
+                                    [lap['Speed'] for lap in laps])
+    picks = [kernels['lttb'](lap['Distance'], lap['Speed'], 150) for lap in laps]
+    return onsets, means, stack, picks
+
+
+def check_parity(name, laps, grid):
+    ref = _run(NUMPY_KERNELS, laps, grid)
+    out = _run(load_backend(name), laps, grid)
+
+    onsets_ok = all(np.array_equal(a, b) for a, b in zip(ref[0], out[0]))
+    means_ok = all(np.allclose(a, b) and np.allclose(c, d)
+                   for (a, c), (b, d) in zip(ref[1], out[1]))
+    stack_ok = np.allclose(ref[2], out[2])
+    picks_ok = all(np.array_equal(a, b) for a, b in zip(ref[3], out[3]))
+    return onsets_ok and means_ok and stack_ok and picks_ok
+
+
+def benchmark(name, laps, grid, repeat=5):
+    kernels = load_backend(name)
+    _run(kernels, laps, grid)           # warm-up (JIT compile)
+    t = time.perf_counter()
+    for _ in range(repeat):
+        _run(kernels, laps, grid)
+    return (time.perf_counter() - t) / repeat * 1000
+
+
+if __name__ == "__main__":
+    laps = _synthetic_laps()
+    grid = np.linspace(0, min(lap['Distance'][-1] for lap in laps), 1000)
+
+    print(f"{len(laps)} laps, grid {len(grid)} points")
+    for name in BACKENDS:
+        if load_backend(name) is None:
+            print(f"  {name:<6} not installed — falls back to numpy")
+            continue
+        ok = check_parity(name, laps, grid)
+        print(f"  {name:<6} parity {'OK' if ok else 'MISMATCH'}   "
+              f"{benchmark(name, laps, grid):8.2f} ms")
@@ -0,0 +1,167 @@
+/* =========================================================
+   LAPVIS SESSION BUNDLE VIEWER
+   Renders a bundle written by bundle.py: manifest.json holds the
+   Plotly figures / tables / messages, buffers.bin every array once
+========================================================= */
+
+const ROOT = "bundles/";
+
+const state = { manifest: null, buffers: null, pair: null, tab: null };
+
+const $ = (id) => document.getElementById(id);
+
+
+
+/* =========================================================
+   LOADING
+========================================================= */
+
+async function loadBundle(name) {
+  $("status").textContent = "loading…";
+  const t0 = performance.now();
+
+  const [manifest, bytes] = await Promise.all([
+    fetch(`${ROOT}${name}/manifest.json`).then((r) => r.json()),
+    fetch(`${ROOT}${name}/buffers.bin`).then((r) => r.arrayBuffer()),
+  ]);
+
+  // One Float32Array view per named buffer — no copies
+  state.buffers = {};
+  for (const [key, [offset, length]] of Object.entries(manifest.buffers)) {
+    state.buffers[key] = new Float32Array(bytes, offset, length);
+  }
+  state.manifest = manifest;
+
+  const pairs = manifest.pairs.map((p) => p.join("-"));
+  $("pair").innerHTML = pairs.map((p) => `<option>${p}</option>`).join("");
+  state.pair = pairs[0];
+  state.tab = state.tab || manifest.tabs[0][0];
+
+  renderTabs();
+  renderView();
+
+  $("status").textContent =
+    `${manifest.year} ${manifest.race} ${manifest.session} — ` +
+    `${(bytes.byteLength / 1e6).toFixed(2)} MB in ${Math.round(performance.now() - t0)} ms`;
+}
+
+// Replace {"$buf": name} references with the shared typed arrays
+function resolve(value) {
+  if (Array.isArray(value)) return value.map(resolve);
+  if (value && typeof value === "object") {
+    if ("$buf" in value) return state.buffers[value.$buf];
+    const out = {};
+    for (const [k, v] of Object.entries(value)) out[k] = resolve(v);
+    return out;
+  }
+  return value;
+}
+
+
+
+/* =========================================================
+   RENDERING
+========================================================= */
+
+function renderTabs() {
+  const tabs = state.manifest.tabs.map(([name]) => name);
+  $("tabs").innerHTML =
+    tabs.map((t) => `<button class="${t === state.tab ? "active" : ""}">${t}</button>`).join("") +
+    state.manifest.interactive_only.map((t) => `<button disabled title="Dashboard only">${t}</button>`).join("");
+
+  $("tabs").querySelectorAll("button:not([disabled])").forEach((btn) => {
+    btn.onclick = () => {
+      state.tab = btn.textContent;
+      renderTabs();
+      renderView();
+    };
+  });
+}
+
+function currentView() {
+  const { views, tabs } = state.manifest;
+  const scope = Object.fromEntries(tabs)[state.tab];
+  const [d1, d2] = state.pair.split("-");
+
+  if (scope === "driver") return [views.drivers[d1][state.tab], views.drivers[d2][state.tab]];
+  if (scope === "pair") return [views.pairs[state.pair][state.tab]];
+  return [views.session[state.tab]];
+}
+
+function renderView() {
+  const root = $("view");
+  root.querySelectorAll(".js-plotly-plot").forEach((el) => Plotly.purge(el));
+  root.innerHTML = "";
+
+  for (const view of currentView()) {
+    for (const fig of view.figures) {
+      const el = document.createElement("div");
+      root.appendChild(el);
+      const resolved = resolve(fig);
+      if (fig.replay) addReplay(resolved);
+      Plotly.newPlot(el, resolved.data, resolved.layout, { responsive: true });
+      if (fig.replay) Plotly.addFrames(el, resolved.frames);
+    }
+    view.tables.forEach((t) => root.appendChild(table(t)));
+    view.messages.forEach(([level, text]) => root.appendChild(message(level, text)));
+  }
+}
+
+// Lap replay: frames are growing subarrays of the lap's X / Y buffers
+function addReplay(fig) {
+  const { x, y, step } = fig.replay;
+  fig.data.push({ type: "scatter", x: [], y: [], mode: "lines", line: { color: "#00FFFF", width: 4 } });
+  fig.frames = [];
+  for (let i = step; i < x.length; i += step) {
+    fig.frames.push({ data: [{ x: x.subarray(0, i), y: y.subarray(0, i) }], traces: [1] });
+  }
+  fig.layout.updatemenus = [{
+    type: "buttons",
+    buttons: [{ label: "Play", method: "animate",
+                args: [null, { frame: { duration: 30, redraw: true }, fromcurrent: true }] }],
+  }];
+}
+
+function table(columns) {
+  const heads = Object.keys(columns);
+  const rows = columns[heads[0]].map((_, i) =>
+    "<tr>" + heads.map((h) => `<td>${columns[h][i] ?? "—"}</td>`).join("") + "</tr>");
+  const el = document.createElement("table");
+  el.innerHTML = "<tr>" + heads.map((h) => `<th>${h}</th>`).join("") + "</tr>" + rows.join("");
+  return el;
+}
+
+// Just enough markdown for the insight messages: headings and bold
+function message(level, text) {
+  const heading = text.match(/^(#+)\s*(.*)$/);
+  const el = document.createElement(heading ? `h${heading[1].length}` : "div");
+  const body = heading ? heading[2] : text;
+  el.innerHTML = body.replace(/\*\*(.+?)\*\*/g, "<b>$1</b>");
+  if (!heading) el.className = `msg ${level}`;
+  return el;
+}
+
+
+
+/* =========================================================
+   BUNDLE / PAIR PICKERS
+========================================================= */
+
+$("pair").onchange = (e) => {
+  state.pair = e.target.value;
+  renderView();
+};
+
+$("bundle").onchange = (e) => loadBundle(e.target.value);
+
+fetch(`${ROOT}index.json`)
+  .then((r) => r.json())
+  .then((index) => {
+    const names = Object.keys(index);
+    $("bundle").innerHTML = names.map((n) => `<option>${n}</option>`).join("");
+    if (names.length) loadBundle(names[0]);
+  })
+  .catch(() => ($("status").textContent = location.protocol === "file:"
+    // fetch() cannot read files next to a page opened from disk
+    ? "bundles need HTTP — run python -m http.server 8000 and open localhost:8000/landing/bundle.html"
+    : "no bundles — run python bundle.py"));
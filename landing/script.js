@@ -3,6 +3,12 @@
    Creates the cinematic animated background grid
 ========================================================= */
 
+import * as THREE from "three";
+import { GLTFLoader } from "three/addons/loaders/GLTFLoader.js";
+
+// Load timings (ms since navigation) — compare before/after asset builds
+const timings = (window.lapvisTimings = {});
+
 // Create scene and camera
 const scene = new THREE.Scene();
 const camera = new THREE.PerspectiveCamera(
@@ -132,6 +138,81 @@ scene.add(plane);
 
 
 
+/* =========================================================
+   F1 CAR — PROGRESSIVE LOADING
+   placeholder.glb (a few KB of boxes) is drawn as soon as it
+   arrives, car.glb (quantized geometry + compressed textures)
+   replaces it when it has streamed in.
+   Both are built by:  python build_landing.py
+   ?assets=source loads the unprocessed f1/scene.gltf instead —
+   the "before" of  python build_landing.py --measure
+========================================================= */
+
+scene.add(new THREE.HemisphereLight(0xffffff, 0x05080c, 2));
+const sun = new THREE.DirectionalLight(0xffffff, 2);
+sun.position.set(5, 10, 7);
+scene.add(sun);
+
+const car = new THREE.Group();
+car.position.set(0, -1.2, 0);
+scene.add(car);
+
+let carStage = null;
+const loader = new GLTFLoader();
+
+function fitCar(model) {
+  // Centre the model and scale it to ~6 units long
+  const box = new THREE.Box3().setFromObject(model);
+  const size = box.getSize(new THREE.Vector3());
+  const centre = box.getCenter(new THREE.Vector3());
+  const scale = 6 / Math.max(size.x, size.y, size.z);
+
+  model.position.sub(centre.multiplyScalar(scale));
+  model.scale.setScalar(scale);
+  return model;
+}
+
+function showCar(model, stage) {
+  car.clear();
+  car.add(fitCar(model));
+  carStage = stage;
+  timings[`${stage}Loaded`] = performance.now();
+}
+
+function loadBuilt() {
+  loader.load(
+    "assets/placeholder.glb",
+    (gltf) => {
+      // Telemetry-style wireframe until the real car arrives
+      gltf.scene.traverse((o) => {
+        if (o.isMesh) {
+          o.material = new THREE.MeshBasicMaterial({
+            color: 0x00ffff, wireframe: true, transparent: true, opacity: 0.35
+          });
+        }
+      });
+      if (carStage !== "full") showCar(gltf.scene, "placeholder");
+    },
+    undefined,
+    () => {}
+  );
+
+  loader.load(
+    "assets/car.glb",
+    (gltf) => showCar(gltf.scene, "full"),
+    undefined,
+    () => {}
+  );
+}
+
+if (new URLSearchParams(location.search).get("assets") === "source") {
+  loader.load("../f1/scene.gltf", (gltf) => showCar(gltf.scene, "source"), undefined, () => {});
+} else {
+  loadBuilt();
+}
+
+
+
 /* =========================================================
    ANIMATION LOOP
 ========================================================= */
@@ -139,6 +220,8 @@ scene.add(plane);
 function animate(t) {
   requestAnimationFrame(animate);
 
+  car.rotation.y = t * 0.0002;
+
   // Animate shader uniforms
   plane.material.uniforms.uTime.value = t * 0.001;
   plane.material.uniforms.uScan.value = (t * 0.0002) % 1;
@@ -148,9 +231,16 @@ function animate(t) {
   camera.lookAt(0, 0, 0);
 
   renderer.render(scene, camera);
+
+  // First frame, and first frame showing each stage of the car
+  if (timings.firstFrame === undefined) timings.firstFrame = performance.now();
+  if (carStage && timings[`${carStage}Frame`] === undefined) {
+    timings[`${carStage}Frame`] = performance.now();
+    console.log("LapVis landing timings (ms)", timings);
+  }
 }
 
-animate();
+requestAnimationFrame(animate);
 
 
 
@@ -168,16 +258,6 @@ window.onresize = () => {
 
 /* =========================================================
    CONNECT TO LAPVIS STREAMLIT DASHBOARD
-========================================================= */
-
-document.addEventListener("DOMContentLoaded", () => {
-  const btn = document.getElementById("enterBtn");
-
-  btn.addEventListener("click", () => {
-    btn.innerText = "Loading Telemetry...";
-
-    setTimeout(() => {
-      window.location.href = "http://localhost:8501";
-    }, 1200);
-  });
-});
\ No newline at end of file
+   The Enter Dashboard button is wired by a classic script in
+   index.html, so it also works where this module cannot load
+========================================================= */
\ No newline at end of file
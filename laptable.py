@@ -0,0 +1,249 @@
+# ============================================================
+# LapVis v2 — Lap Feature Table
+# One row per lap, column-oriented, indexed for fast filtering
+# ============================================================
+#
+# Build / extend (loads each session once, then FastF1's cache):
+#     python laptable.py 2023 2024
+#
+# Query:
+#     table = load_table()
+#     query(table, Year=2024, Session='Q', TopSpeed=(330, None),
+#           BrakeCount=(None, 7))
+
+import logging
+import os
+import sys
+
+import numpy as np
+
+from channels import corner_entries
+from intelligence import build_driver_style
+from telemetry import MissingTelemetry, driver_arrays, lap_telemetry
+
+log = logging.getLogger(__name__)
+
+TABLE_PATH = "lap_features.npz"
+
+STYLE_COLUMNS = {
+    'Braking Style': 'BrakingStyle',
+    'Throttle Style': 'ThrottleStyle',
+    'Driving Smoothness': 'Smoothness',
+    'Corner Priority': 'CornerPriority',
+}
+
+COLUMNS = ('Key', 'Year', 'Event', 'Session', 'Driver', 'LapNumber',
+           'LapTime', 'Sector1', 'Sector2', 'Sector3',
+           'TopSpeed', 'MinSpeed', 'BrakeCount', 'FullThrottle') \
+    + tuple(STYLE_COLUMNS.values())
+
+# Columns that get a sorted index
+INDEXED = ('Key', 'Year', 'Event', 'Session', 'Driver',
+           'LapTime', 'TopSpeed', 'BrakeCount', 'FullThrottle')
+
+
+def session_key(year, event, session_type):
+    return f"{year}|{event}|{session_type}"
+
+
+# --------------------------------------------------------
+# Features of one lap
+# --------------------------------------------------------
+def lap_features(tel):
+    """
+    Telemetry features of one lap (telemetry dict with derived channels).
+    """
+    dt = np.diff(tel['Time'], append=tel['Time'][-1])
+    full = np.sum(dt[tel['Throttle'] >= 98]) / max(tel['Time'][-1], 1e-9)
+
+    features = {
+        'TopSpeed': float(np.max(tel['Speed'])),
+        'MinSpeed': float(np.min(tel['Speed'])),
+        'BrakeCount': int(len(corner_entries(tel))),
+        'FullThrottle': float(full),
+    }
+    style = build_driver_style(tel)
+    for label, column in STYLE_COLUMNS.items():
+        features[column] = style[label]
+
+    return features
+
+
+def _seconds(value):
+    # NaT (missing sector time) compares unequal to itself
+    return value.total_seconds() if value == value else np.nan
+
+
+def session_rows(session, year, event, session_type):
+    """
+    Feature rows for every timed lap of a loaded session.
+    """
+    laps = session.laps.pick_wo_box()
+    laps = laps[laps['LapTime'].notna()]
+    key = session_key(year, event, session_type)
+
+    rows = {c: [] for c in COLUMNS}
+    raw, skipped = {}, []
+    for _, lap in laps.iterlaps():
+        drv = lap['DriverNumber']
+        try:
+            if drv not in raw:
+                raw[drv] = driver_arrays(session, drv)
+            tel = lap_telemetry(lap, raw[drv])
+        except MissingTelemetry as e:
+            skipped.append(f"{lap['Driver']} lap {int(lap['LapNumber'])}: {e}")
+            continue
+        if len(tel['Distance']) < 2:
+            skipped.append(f"{lap['Driver']} lap {int(lap['LapNumber'])}: under 2 samples")
+            continue
+        features = lap_features(tel)
+
+        row = {
+            'Key': key,
+            'Year': int(year),
+            'Event': event,
+            'Session': session_type,
+            'Driver': lap['Driver'],
+            'LapNumber': int(lap['LapNumber']),
+            'LapTime': _seconds(lap['LapTime']),
+            'Sector1': _seconds(lap['Sector1Time']),
+            'Sector2': _seconds(lap['Sector2Time']),
+            'Sector3': _seconds(lap['Sector3Time']),
+            **features,
+        }
+        for c in COLUMNS:
+            rows[c].append(row[c])
+
+    if skipped:
+        log.warning("%s: skipped %d laps without telemetry: %s",
+                    key, len(skipped), "; ".join(skipped))
+    return {c: np.array(v) for c, v in rows.items()}
+
+
+# --------------------------------------------------------
+# Table: columns + sorted indexes
+# --------------------------------------------------------
+def empty_table():
+    return build_indexes({c: np.array([]) for c in COLUMNS})
+
+
+def build_indexes(columns):
+    """
+    Attach a sorted index (order, sorted values) to every INDEXED column.
+    """
+    indexes = {}
+    for c in INDEXED:
+        order = np.argsort(columns[c], kind='stable')
+        indexes[c] = (order, columns[c][order])
+    return {'columns': columns, 'indexes': indexes, 'rows': len(columns['Key'])}
+
+
+def add_session(table, rows):
+    """
+    Insert a session's rows, replacing any rows of the same session key.
+    """
+    if table['rows'] == 0:
+        return build_indexes(rows)
+    if len(rows['Key']) == 0:
+        return table
+
+    columns = table['columns']
+    keep = columns['Key'] != rows['Key'][0]
+    return build_indexes({c: np.concatenate((columns[c][keep], rows[c])) for c in COLUMNS})
+
+
+def load_table(path=TABLE_PATH):
+    if not os.path.exists(path):
+        return empty_table()
+    with np.load(path) as data:
+        return build_indexes({c: data[c] for c in COLUMNS})
+
+
+def save_table(table, path=TABLE_PATH):
+    np.savez(path, **table['columns'])
+
+
+# --------------------------------------------------------
+# Query API
+# --------------------------------------------------------
+def _index_rows(table, column, value):
+    order, values = table['indexes'][column]
+
+    if isinstance(value, tuple):
+        lo, hi = value
+        left = 0 if lo is None else np.searchsorted(values, lo, side='left')
+        right = len(values) if hi is None else np.searchsorted(values, hi, side='right')
+        return order[left:right]
+
+    if isinstance(value, (list, set)):
+        return np.concatenate([_index_rows(table, column, v) for v in value]) \
+            if value else np.array([], dtype=int)
+
+    left = np.searchsorted(values, value, side='left')
+    right = np.searchsorted(values, value, side='right')
+    return order[left:right]
+
+
+def query(table, **filters):
+    """
+    Rows matching every filter, as a dict of columns.
+
+    value        -> equality           Year=2024
+    [a, b, ...]  -> any of             Driver=['VER', 'LEC']
+    (lo, hi)     -> inclusive range    TopSpeed=(330, None)
+    """
+    mask = np.ones(table['rows'], dtype=bool)
+
+    for column, value in filters.items():
+        if column in table['indexes']:
+            hit = np.zeros(table['rows'], dtype=bool)
+            hit[_index_rows(table, column, value)] = True
+        else:
+            data = table['columns'][column]
+            if isinstance(value, tuple):
+                lo, hi = value
+                hit = np.ones(table['rows'], dtype=bool)
+                if lo is not None:
+                    hit &= data >= lo
+                if hi is not None:
+                    hit &= data <= hi
+            elif isinstance(value, (list, set)):
+                hit = np.isin(data, list(value))
+            else:
+                hit = data == value
+        mask &= hit
+
+    rows = np.flatnonzero(mask)
+    return {c: v[rows] for c, v in table['columns'].items()}
+
+
+# --------------------------------------------------------
+# Build from FastF1
+# --------------------------------------------------------
+def ingest_year(table, year, sessions=('Q', 'R')):
+    import fastf1
+
+    schedule = fastf1.get_event_schedule(year, include_testing=False)
+    for event in schedule['EventName']:
+        for session_type in sessions:
+            try:
+                s = fastf1.get_session(year, event, session_type)
+                s.load(weather=False, messages=False)
+            except Exception as e:
+                print(f"  skipped {year} {event} {session_type}: {e}")
+                continue
+            table = add_session(table, session_rows(s, year, event, session_type))
+            print(f"{year} {event} {session_type}: {table['rows']} laps in table")
+    return table
+
+
+if __name__ == "__main__":
+    import fastf1
+
+    fastf1.Cache.enable_cache("fastf1_cache")
+    years = [int(a) for a in sys.argv[1:3]] or [2024, 2024]
+
+    table = load_table()
+    for year in range(years[0], years[-1] + 1):
+        table = ingest_year(table, year)
+        save_table(table)
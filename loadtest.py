@@ -0,0 +1,244 @@
+# ============================================================
+# LapVis — Concurrent-user Load Test
+# N simulated users driving app.py headlessly through AppTest
+# ============================================================
+#
+# Record a fixture cache once (needs network):
+#     python loadtest.py --record --cache fixtures/fastf1_cache
+#
+# Then run fully offline against it:
+#     python loadtest.py --cache fixtures/fastf1_cache --users 8 --rounds 10
+#
+# Every scenario runs in its own interpreter so peak RSS and cache hit
+# rates are per scenario. Inside a scenario all users share one process,
+# i.e. one st.cache_data — the same as one dashboard replica.
+#
+# Tabs are rendered client-side (every tab body runs on every rerun), so
+# "switching tabs" is simulated by the widgets that live inside the tabs.
+
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import threading
+import time
+
+import numpy as np
+
+FIXTURE_CACHE = "fixtures/fastf1_cache"
+
+# Sessions the fixture cache holds — users only navigate between these
+FIXTURE_SESSIONS = [
+    (2023, 'Monaco Grand Prix', 'Q'),
+    (2024, 'Monaco Grand Prix', 'Q'),
+    (2024, 'Bahrain Grand Prix', 'Q'),
+    (2024, 'Bahrain Grand Prix', 'R'),
+]
+
+PERCENTILES = (50, 95, 99)
+
+
+# --------------------------------------------------------
+# Simulated user actions (each one or more timed reruns)
+# --------------------------------------------------------
+def _widget(widgets, label):
+    for w in widgets:
+        if w.label == label:
+            return w
+    raise LookupError(f"no widget labelled {label!r}")
+
+
+def _set(at, kind, label, value):
+    widget = _widget(getattr(at, kind), label)
+    if widget.value == value:
+        return None
+    widget.set_value(value)
+    return _timed_run(at)
+
+
+def _timed_run(at):
+    t = time.perf_counter()
+    at.run()
+    ms = (time.perf_counter() - t) * 1000
+    return ms, bool(at.exception)
+
+
+def _select_session(at, session):
+    # Year, race and session are dependent selectboxes: setting all three
+    # through their keys lands on a fixture session in a single rerun,
+    # instead of rerunning on sessions the fixture cache does not hold
+    for key, value in zip(('year', 'race', 'session'), session):
+        at.session_state[key] = value
+
+
+# Actions yield one result per rerun, so the reruns that completed are
+# kept even when a later step of the same action fails
+def switch_session(at, rng):
+    _select_session(at, rng.choice(FIXTURE_SESSIONS))
+    yield _timed_run(at)
+
+
+def switch_drivers(at, rng):
+    options = list(_widget(at.selectbox, 'Driver 1').options)
+    d1, d2 = rng.sample(options, 2)
+    yield _set(at, 'selectbox', 'Driver 1', d1)
+    yield _set(at, 'selectbox', 'Driver 2', d2)
+
+
+def switch_tabs(at, rng):
+    yield _set(at, 'slider', 'Minisectors', rng.choice(range(10, 105, 5)))
+    # Lap Finder widgets exist only once a lap table is built; their
+    # range is the table's own
+    zones = [w for w in at.slider if w.label == 'Max braking zones']
+    if zones:
+        yield _set(at, 'slider', 'Max braking zones', rng.randint(zones[0].min, zones[0].max))
+
+
+ACTIONS = {
+    'session': switch_session,
+    'drivers': switch_drivers,
+    'tabs': switch_tabs,
+}
+
+SCENARIOS = {
+    'drivers': ('drivers',),
+    'sessions': ('session',),
+    'tabs': ('tabs',),
+    'mixed': ('session', 'drivers', 'drivers', 'tabs'),
+}
+
+
+# --------------------------------------------------------
+# One scenario (runs in a child interpreter)
+# --------------------------------------------------------
+def _peak_rss_mb():
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+
+def simulate_user(seed, actions, rounds, timeout, samples):
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(seed)
+    at = AppTest.from_file("app.py", default_timeout=timeout)
+
+    # The landing selection (2021, first event) is not in the fixture cache
+    _select_session(at, rng.choice(FIXTURE_SESSIONS))
+    samples.append(('first load', *_timed_run(at)))
+    for _ in range(rounds):
+        name = rng.choice(actions)
+        try:
+            for result in ACTIONS[name](at, rng):
+                if result is not None:
+                    samples.append((name, *result))
+        except Exception:
+            # A widget missing after a failed rerun counts as an error
+            samples.append((name, float('nan'), True))
+
+
+def run_scenario(name, users, rounds, timeout=600, seed=0):
+    import perf
+    from scheduler import summarize
+
+    perf.reset_cache_stats()
+    samples = []
+    threads = [threading.Thread(target=simulate_user,
+                                args=(seed + i, SCENARIOS[name], rounds, timeout, samples))
+               for i in range(users)]
+
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - start
+
+    # Failed reruns are counted as errors, not as latencies
+    reruns = np.array([ms for action, ms, err in samples
+                       if action != 'first load' and not err])
+    first = np.array([ms for action, ms, err in samples
+                      if action == 'first load' and not err])
+
+    return {
+        'scenario': name,
+        'users': users,
+        'reruns': len(reruns),
+        'errors': sum(err for _, _, err in samples),
+        'wall_s': wall,
+        'first_load_ms': dict(zip(map(str, PERCENTILES), np.percentile(first, PERCENTILES).tolist()))
+        if len(first) else {},
+        'rerun_ms': dict(zip(map(str, PERCENTILES), np.percentile(reruns, PERCENTILES).tolist()))
+        if len(reruns) else {},
+        'peak_rss_mb': _peak_rss_mb(),
+        'cache': perf.cache_hit_rates(),
+        'graphs': {g: summarize(stats) for g, stats in perf.graph_timings().items()},
+    }
+
+
+# --------------------------------------------------------
+# Driver: one child process per scenario
+# --------------------------------------------------------
+def run_isolated(name, args):
+    env = dict(os.environ, LAPVIS_CACHE_DIR=args.cache, LAPVIS_OFFLINE="1")
+    cmd = [sys.executable, __file__, '--child', name,
+           '--users', str(args.users), '--rounds', str(args.rounds),
+           '--timeout', str(args.timeout), '--seed', str(args.seed)]
+    out = subprocess.run(cmd, env=env, capture_output=True, text=True)
+    if out.returncode != 0:
+        raise RuntimeError(f"scenario {name} failed:\n{out.stderr[-2000:]}")
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def record(cache):
+    """Populate the fixture cache with every FIXTURE_SESSIONS session."""
+    import fastf1
+
+    os.makedirs(cache, exist_ok=True)
+    fastf1.Cache.enable_cache(cache)
+    for year, race, session_type in FIXTURE_SESSIONS:
+        print(f"recording {year} {race} {session_type}")
+        fastf1.get_event_schedule(year)
+        fastf1.get_session(year, race, session_type).load()
+
+
+def report(results):
+    print(f"{'scenario':<10} {'users':>5} {'reruns':>6} {'err':>4} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'RSS MB':>8}  cache hit rates")
+    for r in results:
+        ms = r['rerun_ms'] or dict.fromkeys(map(str, PERCENTILES), float('nan'))
+        hits = ", ".join(f"{fn} {c['hit_rate']:.0%}" for fn, c in sorted(r['cache'].items()))
+        print(f"{r['scenario']:<10} {r['users']:>5} {r['reruns']:>6} {r['errors']:>4} "
+              f"{ms['50']:8.0f} {ms['95']:8.0f} {ms['99']:8.0f} {r['peak_rss_mb']:8.0f}  {hits}")
+        for g, s in sorted(r.get('graphs', {}).items()):
+            print(f"{'':<10} graph {g}: wall {s['wall_ms']:.0f} ms, steps {s['steps_ms']:.0f} ms, "
+                  f"critical path {s['critical_ms']:.0f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="LapVis concurrent-user load test")
+    parser.add_argument('--users', type=int, default=4)
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--scenario', nargs='*', default=list(SCENARIOS))
+    parser.add_argument('--cache', default=FIXTURE_CACHE)
+    parser.add_argument('--timeout', type=float, default=600)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help="also write the results to this file")
+    parser.add_argument('--record', action='store_true')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.record:
+        record(args.cache)
+    elif args.child:
+        print(json.dumps(run_scenario(args.child, args.users, args.rounds,
+                                      args.timeout, args.seed)))
+    else:
+        results = [run_isolated(name, args) for name in args.scenario]
+        report(results)
+        if args.json:
+            with open(args.json, 'w') as f:
+                json.dump(results, f, indent=2)
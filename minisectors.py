@@ -0,0 +1,86 @@
+# ============================================================
+# LapVis v2 — Intelligence Layer
+# Module 2: Minisectors & Theoretical Best Lap
+# ============================================================
+
+import numpy as np
+
+from alignment import distance_grid, reference_length, stack_lap_times
+
+
+def minisector_edges(grid, n):
+    """
+    Grid indices of the n + 1 boundaries of n equal-length minisectors.
+    """
+    bounds = np.linspace(0.0, grid[-1], n + 1)
+    return np.searchsorted(grid, bounds).clip(0, len(grid) - 1)
+
+
+def minisector_times(time_stack, edges):
+    """
+    Time spent in every minisector for every lap, shape (laps, n).
+    One vectorized pass over the (laps, grid) elapsed-time matrix.
+    """
+    return np.diff(time_stack[:, edges], axis=1)
+
+
+def best_per_driver(times, drivers):
+    """
+    Each driver's best time in every minisector across all of their laps.
+    Returns (codes, best) where best has shape (drivers, n).
+    """
+    codes, inverse = np.unique(drivers, return_inverse=True)
+    order = np.argsort(inverse, kind='stable')
+    starts = np.searchsorted(inverse[order], np.arange(len(codes)))
+
+    clean = np.where(np.isnan(times), np.inf, times)
+    best = np.minimum.reduceat(clean[order], starts, axis=0)
+
+    return codes, best
+
+
+def analyse_minisectors(field, n=25, step=5.0):
+    """
+    Full-field minisector analysis of a session.
+
+    field -> output of alignment.session_lap_arrays()
+    n     -> number of minisectors
+    step  -> shared distance grid resolution (m)
+    """
+    laps = field['Laps']
+    grid = distance_grid(reference_length(laps), step)
+    edges = minisector_edges(grid, n)
+
+    time_stack = stack_lap_times(laps, grid, field['LapTime'])
+    times = minisector_times(time_stack, edges)
+
+    codes, best = best_per_driver(times, field['Driver'])
+
+    # Theoretical best lap = sum of a driver's best minisectors
+    ideal = best.sum(axis=1)
+
+    # Actual best lap of every driver, for the "time left on the table"
+    _, fastest = best_per_driver(field['LapTime'][:, None], field['Driver'])
+
+    return {
+        'Grid': grid,
+        'Edges': edges,
+        'Times': times,
+        'Drivers': codes,
+        'Best': best,
+        'Owner': np.argmin(best, axis=0),
+        'IdealLap': ideal,
+        'BestLap': fastest[:, 0],
+        'FieldIdealLap': best.min(axis=0).sum(),
+    }
+
+
+def minisector_of(distance, analysis):
+    """
+    Minisector index of every sample of a lap (distance scaled onto the grid).
+    """
+    grid = analysis['Grid']
+    scaled = distance * (grid[-1] / distance[-1])
+    bounds = grid[analysis['Edges']]
+    idx = np.searchsorted(bounds, scaled, side='right') - 1
+    return idx.clip(0, len(bounds) - 2)
@@ -0,0 +1,178 @@
+# ============================================================
+# LapVis — Performance Helpers
+# Lazy imports, startup budget, cache and graph timings
+# ============================================================
+
+import ast
+import functools
+import importlib
+import subprocess
+import sys
+import threading
+import time
+
+# Budgets for the dashboard startup path (milliseconds)
+IMPORT_BUDGET_MS = 1500
+FIRST_PAINT_BUDGET_MS = 2000
+
+# Modules app.py imports eagerly vs. only when a view needs them. The
+# startup report measures STARTUP_MODULES plus every module app.py
+# imports at top level (its own modules included), i.e. what a cold
+# start actually waits for before the script body runs.
+STARTUP_MODULES = ['streamlit', 'numpy']
+DEFERRED_MODULES = ['fastf1', 'matplotlib.pyplot', 'plotly.graph_objects',
+                    'reportlab.platypus']
+
+
+class LazyModule:
+    """
+    Stand-in for a module that is only imported on first attribute access.
+    Keeps heavy rendering/report libraries off the startup path.
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+
+def lazy_module(name):
+    return LazyModule(name)
+
+
+def elapsed_ms(start):
+    """Milliseconds since a time.perf_counter() mark."""
+    return (time.perf_counter() - start) * 1000
+
+
+# --------------------------------------------------------
+# Cache hit counters
+# --------------------------------------------------------
+CACHE_STATS = {}        # function name -> {'calls': n, 'misses': n}
+_STATS_LOCK = threading.Lock()
+
+
+def _count(name, field):
+    with _STATS_LOCK:
+        CACHE_STATS.setdefault(name, {'calls': 0, 'misses': 0})[field] += 1
+
+
+def tracked(cache):
+    """
+    Wrap a caching decorator (st.cache_data / st.cache_resource) so every
+    call and every miss (body actually executed) is counted:
+
+        @tracked(st.cache_data)
+        def load_session(...): ...
+    """
+    def decorate(fn):
+        name = fn.__name__
+
+        @functools.wraps(fn)
+        def miss(*args, **kwargs):
+            _count(name, 'misses')
+            return fn(*args, **kwargs)
+
+        cached = cache(miss)
+
+        @functools.wraps(fn)
+        def call(*args, **kwargs):
+            _count(name, 'calls')
+            return cached(*args, **kwargs)
+
+        call.clear = cached.clear
+        return call
+
+    return decorate
+
+
+def cache_hit_rates():
+    """{name: {'calls', 'misses', 'hit_rate'}} for every tracked function."""
+    with _STATS_LOCK:
+        return {name: {**s, 'hit_rate': 1 - s['misses'] / s['calls'] if s['calls'] else 0.0}
+                for name, s in CACHE_STATS.items()}
+
+
+def reset_cache_stats():
+    with _STATS_LOCK:
+        CACHE_STATS.clear()
+
+
+# --------------------------------------------------------
+# Analysis graph timings (scheduler.Graph)
+# --------------------------------------------------------
+GRAPH_STATS = {}        # graph name -> {'Wall': ms, 'Nodes': {node: timing}}
+
+
+def record_graph(name, nodes, wall_ms):
+    with _STATS_LOCK:
+        GRAPH_STATS[name] = {'Wall': wall_ms, 'Nodes': dict(nodes)}
+
+
+def graph_timings():
+    """Last run of every graph: {name: {'Wall', 'Nodes'}}, times in ms."""
+    with _STATS_LOCK:
+        return dict(GRAPH_STATS)
+
+
+# --------------------------------------------------------
+# Import-time measurement (each module in a fresh interpreter)
+# --------------------------------------------------------
+def import_time_ms(module):
+    code = ("import time; t = time.perf_counter(); "
+            f"import {module}; print((time.perf_counter() - t) * 1000)")
+    out = subprocess.run([sys.executable, '-c', code],
+                         capture_output=True, text=True)
+    if out.returncode != 0:
+        return float('nan')
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def app_imports(path="app.py"):
+    """Modules app.py imports at top level (eager imports only)."""
+    with open(path) as f:
+        tree = ast.parse(f.read())
+
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules += [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            modules.append(node.module)
+    return list(dict.fromkeys(modules))
+
+
+def startup_modules():
+    return list(dict.fromkeys(STARTUP_MODULES + app_imports()))
+
+
+def startup_report():
+    """
+    Print the import cost of the startup path and of the deferred modules.
+    Run with:  python perf.py
+    """
+    modules = startup_modules()
+    code = ("import time; t = time.perf_counter(); "
+            f"import {', '.join(modules)}; "
+            "print((time.perf_counter() - t) * 1000)")
+    out = subprocess.run([sys.executable, '-c', code],
+                         capture_output=True, text=True)
+    startup = float(out.stdout.strip().splitlines()[-1])
+
+    print("Deferred modules (paid only when a view needs them):")
+    for module in DEFERRED_MODULES:
+        print(f"  {module:<24} {import_time_ms(module):8.1f} ms")
+
+    status = "OK" if startup <= IMPORT_BUDGET_MS else "OVER BUDGET"
+    print(f"\nStartup imports ({len(modules)} modules, app.py's own included): "
+          f"{startup:.1f} ms (budget {IMPORT_BUDGET_MS} ms) — {status}")
+
+    return startup <= IMPORT_BUDGET_MS
+
+
+if __name__ == "__main__":
+    sys.exit(0 if startup_report() else 1)
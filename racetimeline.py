@@ -0,0 +1,160 @@
+# ============================================================
+# LapVis v2 — Intelligence Layer
+# Module 6: Race Timeline (gaps, intervals, positions)
+# ============================================================
+#
+# Every driver's lap durations go into one (drivers, laps) matrix and a
+# single cumulative sum along the laps axis gives the race clock of every
+# car at every lap line. Gaps, intervals and positions are then column
+# operations on that matrix — no per-driver loops. A lap without any
+# duration in the middle of a car's race is interpolated from its
+# neighbours first (and marked in Filled), so one missing timing does not
+# drop the car from the rest of the timeline.
+
+import numpy as np
+
+
+def _seconds(series):
+    return series.dt.total_seconds().to_numpy(dtype=float)
+
+
+def lap_duration_matrix(session):
+    """
+    (drivers, laps) matrix of lap durations in seconds, NaN after a car
+    stops. Laps without a timed LapTime (lap 1, some pit laps) fall back to
+    lap end minus lap start.
+    """
+    laps = session.laps
+    drivers, row = np.unique(laps['Driver'].to_numpy(dtype=str), return_inverse=True)
+    col = laps['LapNumber'].to_numpy(dtype=float)
+
+    duration = _seconds(laps['LapTime'])
+    fallback = _seconds(laps['Time']) - _seconds(laps['LapStartTime'])
+    duration = np.where(np.isnan(duration), fallback, duration)
+
+    ok = ~np.isnan(col)
+    matrix = np.full((len(drivers), int(np.nanmax(col))), np.nan)
+    matrix[row[ok], col[ok].astype(int) - 1] = duration[ok]
+
+    return drivers, matrix
+
+
+def fill_gaps(duration):
+    """
+    (durations, filled) with every NaN before a car's last recorded lap
+    replaced by linear interpolation between the nearest recorded laps on
+    either side (the next one alone for leading gaps). NaN after the last
+    recorded lap — a retired car — is kept.
+    """
+    laps = duration.shape[1]
+    idx = np.arange(laps)
+    rows = np.arange(len(duration))[:, None]
+    known = ~np.isnan(duration)
+
+    last = laps - 1 - np.argmax(known[:, ::-1], axis=1)
+    filled = ~known & (idx <= last[:, None]) & known.any(axis=1)[:, None]
+
+    prev = np.maximum.accumulate(np.where(known, idx, -1), axis=1)
+    nxt = np.minimum.accumulate(np.where(known, idx, laps)[:, ::-1], axis=1)[:, ::-1]
+    before = duration[rows, prev.clip(0)]
+    after = duration[rows, nxt.clip(max=laps - 1)]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        between = before + (after - before) * (idx - prev) / (nxt - prev)
+
+    out = duration.copy()
+    out[filled] = np.where(prev < 0, after, between)[filled]
+    return out, filled
+
+
+def positions(cumulative):
+    """
+    Running order at every lap line (1 = leader); NaN for cars not running.
+    """
+    clock = np.where(np.isnan(cumulative), np.inf, cumulative)
+    rank = np.argsort(np.argsort(clock, axis=0, kind='stable'), axis=0) + 1.0
+    return np.where(np.isnan(cumulative), np.nan, rank)
+
+
+def intervals(cumulative):
+    """
+    Gap to the car directly ahead at every lap line (leader -> 0).
+    """
+    clock = np.where(np.isnan(cumulative), np.inf, cumulative)
+    order = np.argsort(clock, axis=0, kind='stable')
+    ahead = np.take_along_axis(clock, order, axis=0)
+
+    gaps = np.diff(ahead, axis=0, prepend=ahead[:1])
+    out = np.empty_like(gaps)
+    np.put_along_axis(out, order, gaps, axis=0)
+
+    return np.where(np.isnan(cumulative), np.nan, out)
+
+
+def race_timeline(session):
+    """
+    Race-long timeline of every car.
+
+    Returns Drivers (ordered by final classification), Laps (1..N) and
+    (drivers, laps) matrices: Cumulative race time, GapToLeader, Interval,
+    Position, and Filled (laps whose duration was interpolated).
+    """
+    drivers, duration = lap_duration_matrix(session)
+    duration, filled = fill_gaps(duration)
+
+    # Retired cars: NaN propagates through the sum from their last lap on
+    cumulative = np.cumsum(duration, axis=1)
+    gap = cumulative - np.nanmin(cumulative, axis=0)
+    pos = positions(cumulative)
+
+    # Final order: most laps completed, then race time
+    laps_done = np.sum(~np.isnan(cumulative), axis=1)
+    last = cumulative[np.arange(len(drivers)), np.maximum(laps_done - 1, 0)]
+    order = np.lexsort((last, -laps_done))
+
+    return {
+        'Drivers': drivers[order],
+        'Laps': np.arange(1, duration.shape[1] + 1),
+        'Duration': duration[order],
+        'Cumulative': cumulative[order],
+        'GapToLeader': gap[order],
+        'Interval': intervals(cumulative)[order],
+        'Position': pos[order],
+        'Filled': filled[order],
+    }
+
+
+def minisector_timeline(timeline, field, analysis):
+    """
+    Race clock of every car at every minisector boundary of every lap,
+    shape (drivers, laps * n) plus the matching fractional lap axis.
+
+    Timed laps split by their measured minisector times (field /
+    analysis from minisectors.analyse_minisectors); other laps (lap 1,
+    pit laps) are split evenly.
+    """
+    drivers = timeline['Drivers']
+    duration = timeline['Duration']
+    n = analysis['Times'].shape[1]
+    d, laps = duration.shape
+
+    # Fraction of the lap completed at the end of each minisector
+    frac = np.broadcast_to(np.arange(1, n + 1) / n, (d, laps, n)).copy()
+
+    by_code = np.argsort(drivers)
+    row = by_code[np.searchsorted(drivers, field['Driver'], sorter=by_code).clip(0, d - 1)]
+    known = drivers[row] == field['Driver']
+    split = np.cumsum(analysis['Times'], axis=1)
+    split /= split[:, -1:]
+    frac[row[known], field['LapNumber'][known] - 1] = split[known]
+
+    start = timeline['Cumulative'] - duration
+    clock = start[:, :, None] + frac * duration[:, :, None]
+    clock = clock.reshape(d, laps * n)
+
+    axis = (np.arange(laps)[:, None] + np.arange(1, n + 1)[None, :] / n).ravel()
+    return {
+        'Axis': axis,
+        'Cumulative': clock,
+        'GapToLeader': clock - np.nanmin(clock, axis=0),
+        'Position': positions(clock),
+    }
@@ -0,0 +1,215 @@
+# ============================================================
+# LapVis v2 — Intelligence Layer
+# Module 3: Session-wide Anomaly & Risk Scanning
+# ============================================================
+#
+# Every lap of every driver is compared against a per-distance baseline
+# built from the whole field (median / MAD on the shared distance grid),
+# instead of one lap against its own mean/std.
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from alignment import distance_grid, reference_length, stack_laps
+
+MAD_SCALE = 1.4826      # MAD -> standard deviation for normal data
+
+SLOW_Z = -3.5           # speed this far below the field while on throttle
+SLOW_THROTTLE = 85      # %
+RISK_FIELD_BRAKING = 0.1  # braking where < 10% of the field brakes
+MIN_SEGMENT = 15.0      # m — shorter flagged runs are noise
+
+KINDS = ('slow', 'risk')
+
+
+def rolling_median(values, window):
+    """
+    Median over a centred window along the last axis (edge-padded).
+    """
+    if window <= 1:
+        return values
+    pad = window // 2
+    padded = np.pad(values, [(0, 0)] * (values.ndim - 1) + [(pad, window - 1 - pad)],
+                    mode='edge')
+    return np.median(sliding_window_view(padded, window, axis=-1), axis=-1)
+
+
+def field_baseline(stack, window=5):
+    """
+    Robust per-distance baseline of one channel across all laps.
+    Returns (median, scale) on the grid; scale is MAD-based sigma.
+    """
+    median = np.median(stack, axis=0)
+    mad = np.median(np.abs(stack - median), axis=0)
+
+    median = rolling_median(median, window)
+    scale = rolling_median(MAD_SCALE * mad, window)
+
+    return median, np.maximum(scale, 1.0)
+
+
+def _stack_chunk(args):
+    laps, grid = args
+    return stack_laps(laps, grid, ('Speed', 'Throttle', 'Brake'))
+
+
+def stack_field(laps, grid, workers=4):
+    """
+    stack_laps() split over a thread pool (np.interp releases the GIL).
+    """
+    chunks = [laps[i::workers] for i in range(workers)]
+    order = np.concatenate([np.arange(len(laps))[i::workers] for i in range(workers)])
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        parts = list(pool.map(_stack_chunk, [(c, grid) for c in chunks if c]))
+
+    stacks = {}
+    for ch in parts[0]:
+        merged = np.empty((len(laps), len(grid)))
+        merged[order] = np.vstack([p[ch] for p in parts])
+        stacks[ch] = merged
+
+    return stacks
+
+
+def find_segments(mask, grid, min_length=MIN_SEGMENT):
+    """
+    Contiguous True runs of a (laps, grid) mask, all laps at once.
+    Returns (row, start_idx, end_idx) arrays.
+    """
+    padded = np.pad(mask.astype(np.int8), ((0, 0), (1, 1)))
+    edges = np.diff(padded, axis=1)
+
+    rows, starts = np.nonzero(edges == 1)
+    _, ends = np.nonzero(edges == -1)
+    ends = ends - 1
+
+    keep = (grid[ends] - grid[starts]) >= min_length
+    return rows[keep], starts[keep], ends[keep]
+
+
+def empty_scan():
+    """Scan of a session without usable laps: no grid, no segments."""
+    table = {
+        'Driver': np.array([], dtype=str),
+        'LapNumber': np.array([], dtype=int),
+        'Kind': np.array([], dtype=str),
+        'Start': np.empty(0),
+        'End': np.empty(0),
+        'Severity': np.empty(0),
+    }
+    return {'Grid': np.empty(0), 'Median': np.empty(0), 'Scale': np.empty(0),
+            'Segments': table, 'Index': {}}
+
+
+def scan_session(field, step=5.0, workers=4):
+    """
+    Scan every lap of a session for anomalous segments.
+
+    field -> output of alignment.session_lap_arrays()
+
+    Returns a column-oriented segment table sorted by (Driver, LapNumber,
+    Start), plus the lookup index built by build_index().
+    """
+    laps = field['Laps']
+    if len(laps) == 0:
+        return empty_scan()
+
+    grid = distance_grid(reference_length(laps), step)
+    stacks = stack_field(laps, grid, workers)
+
+    speed = stacks['Speed']
+    median, scale = field_baseline(speed)
+    z = (speed - median) / scale
+
+    field_braking = np.mean(stacks['Brake'] > 0.5, axis=0)
+
+    masks = {
+        # slow on track while the driver is flat out — lost momentum
+        'slow': (z < SLOW_Z) & (stacks['Throttle'] > SLOW_THROTTLE),
+        # braking at speed where (almost) nobody else brakes
+        'risk': (stacks['Brake'] > 0.5)
+                & (field_braking < RISK_FIELD_BRAKING)
+                & (z > 0),
+    }
+
+    # Flattened |z| with a sentinel so every segment end is a valid index
+    abs_z = np.append(np.abs(z).ravel(), 0.0)
+
+    columns = {k: [] for k in ('Driver', 'LapNumber', 'Kind', 'Start', 'End', 'Severity')}
+    for kind, mask in masks.items():
+        rows, s, e = find_segments(mask, grid)
+
+        # Severity = peak |z| inside each segment, one reduceat for all
+        flat = rows * len(grid)
+        bounds = np.column_stack((flat + s, flat + e + 1)).ravel()
+        severity = np.maximum.reduceat(abs_z, bounds)[::2] if len(rows) else np.empty(0)
+
+        columns['Driver'].append(field['Driver'][rows])
+        columns['LapNumber'].append(field['LapNumber'][rows])
+        columns['Kind'].append(np.full(len(rows), kind))
+        columns['Start'].append(grid[s])
+        columns['End'].append(grid[e])
+        columns['Severity'].append(severity)
+
+    table = {k: np.concatenate(v) for k, v in columns.items()}
+    order = np.lexsort((table['Start'], table['LapNumber'], table['Driver']))
+    table = {k: v[order] for k, v in table.items()}
+
+    return {
+        'Grid': grid,
+        'Median': median,
+        'Scale': scale,
+        'Segments': table,
+        'Index': build_index(table),
+    }
+
+
+# --------------------------------------------------------
+# Lookup by driver / lap / distance
+# --------------------------------------------------------
+def build_index(table):
+    """
+    {(driver, lap): (lo, hi)} row ranges into the sorted segment table.
+    """
+    index = {}
+    keys = list(zip(table['Driver'].tolist(), table['LapNumber'].tolist()))
+    for i, key in enumerate(keys):
+        lo, _ = index.get(key, (i, i))
+        index[key] = (lo, i + 1)
+    return index
+
+
+def segments_for(scan, driver, lap=None, distance=None):
+    """
+    Segments of one driver (optionally one lap, optionally covering a
+    distance in metres) as a column-oriented dict.
+    """
+    table = scan['Segments']
+    index = scan['Index']
+
+    if lap is not None:
+        ranges = [index.get((driver, lap), (0, 0))]
+    else:
+        ranges = [r for (drv, _), r in index.items() if drv == driver]
+
+    rows = np.concatenate([np.arange(lo, hi) for lo, hi in ranges]) \
+        if ranges else np.array([], dtype=int)
+
+    if distance is not None:
+        rows = rows[(table['Start'][rows] <= distance) & (table['End'][rows] >= distance)]
+
+    return {k: v[rows] for k, v in table.items()}
+
+
+def summary(scan):
+    """
+    Segment counts per driver and kind: {driver: {kind: count}}.
+    """
+    table = scan['Segments']
+    out = {}
+    for drv, kind in zip(table['Driver'].tolist(), table['Kind'].tolist()):
+        out.setdefault(drv, dict.fromkeys(KINDS, 0))[kind] += 1
+    return out
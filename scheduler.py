@@ -0,0 +1,271 @@
+# ============================================================
+# LapVis — Analysis Scheduler
+# Dependency graph of analysis steps on a worker pool
+# ============================================================
+#
+#     g = Graph("report", timeout=30)
+#     g.add('delta', time_delta, tel1, tel2)
+#     g.add('corners', corner_deltas, tel1, deps=('delta',))
+#     results = g.run()         # {'delta': ..., 'corners': ...}
+#
+# workers=0 runs the same graph inline on the caller's thread.
+#
+# A node runs as soon as all of its dependencies are done, with the
+# dependency results appended after its own arguments, so the wall time
+# approaches the critical path rather than the sum of the steps. Like
+# load_parallel(), a failing node's result is the exception it raised;
+# its dependents are skipped with that exception. Timeouts count from the
+# start of run(), so time spent queued for a worker counts too. Per-node
+# timings go to perf.record_graph() for profiling.
+
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import perf
+
+POOL_WORKERS = 8
+POLL_S = 0.05           # re-check queued nodes for a replaced pool
+
+_POOL = None
+_POOL_LOCK = threading.Lock()
+
+
+def shared_pool():
+    """
+    One long-lived worker pool for every graph, so a rerun does not pay
+    for starting threads. Graphs run from inside a node should be inline
+    (workers=0): a node waiting on the same saturated pool would deadlock.
+    """
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = ThreadPoolExecutor(max_workers=POOL_WORKERS, thread_name_prefix="lapvis-graph")
+        return _POOL
+
+
+def _retire_pool(pool):
+    """
+    Replace the shared pool once a timed-out node is abandoned on one of
+    its workers: that thread may never come back, so the next graph gets
+    a pool with every worker free. Nodes still queued on the old pool are
+    moved to the new one by the graph that queued them.
+    """
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is pool:
+            _POOL = None
+    pool.shutdown(wait=False)
+
+
+class NodeTimeout(TimeoutError):
+    pass
+
+
+class SkippedNode(RuntimeError):
+    pass
+
+
+class Graph:
+    """
+    Named analysis steps and their dependencies. Nodes run on threads of
+    the shared pool (the heavy steps are NumPy / pandas and release the
+    GIL), or one after another on the caller's thread with workers=0 —
+    cheaper for a handful of millisecond steps.
+    """
+
+    def __init__(self, name, workers=POOL_WORKERS, timeout=None):
+        self.name = name
+        self.workers = workers
+        self.timeout = timeout          # default per-node timeout (s from run start)
+        self.nodes = {}                 # name -> (fn, args, deps, timeout)
+        self.timings = {}
+
+    def add(self, name, fn, *args, deps=(), timeout=None):
+        if name in self.nodes:
+            raise ValueError(f"Duplicate node {name!r}")
+        missing = [d for d in deps if d not in self.nodes]
+        if missing:
+            # Nodes are added in dependency order, so the graph is acyclic
+            raise ValueError(f"{name!r} depends on unknown nodes {missing}")
+        self.nodes[name] = (fn, args, tuple(deps), timeout or self.timeout)
+        return name
+
+    def run(self, initializer=None):
+        """
+        Execute the graph. Returns {node: result or the exception raised}.
+        A node's timeout counts from the start of run(), queue time
+        included. A node past its deadline is reported as NodeTimeout: a
+        queued one is cancelled, a running one is abandoned (its thread
+        cannot be killed, whatever it returns later is ignored) and the
+        shared pool is replaced.
+        """
+        t0 = time.perf_counter()
+        self.timings = {}
+        results = (self._run_inline(t0, initializer) if self.workers == 0
+                   else self._run_pool(t0, initializer))
+        perf.record_graph(self.name, self.timings, perf.elapsed_ms(t0))
+        return results
+
+    def _ready(self, waiting, results, t0):
+        # Pop every node whose dependencies are done; failed deps -> skipped
+        ready = []
+        for name, (fn, args, deps, timeout) in list(waiting.items()):
+            failed = [d for d in deps if isinstance(results.get(d), Exception)]
+            if failed:
+                del waiting[name]
+                self._finish(name, SkippedNode(f"{name}: {failed[0]} failed"), results, t0, None)
+            elif all(d in results for d in deps):
+                del waiting[name]
+                ready.append((name, fn, args + tuple(results[d] for d in deps), timeout))
+        return ready
+
+    def _run_inline(self, t0, initializer):
+        results, waiting = {}, dict(self.nodes)
+        if initializer is not None:
+            initializer()
+        while waiting:
+            for name, fn, args, timeout in self._ready(waiting, results, t0):
+                start = time.perf_counter()
+                if timeout and start - t0 >= timeout:
+                    # Nothing to interrupt inline; only a node not yet run can time out
+                    self._finish(name, _timed_out(name, timeout), results, t0, None)
+                    continue
+                try:
+                    result = fn(*args)
+                except Exception as e:
+                    result = e
+                self._finish(name, result, results, t0, start)
+        return results
+
+    def _run_pool(self, t0, initializer):
+        results, running, waiting = {}, {}, dict(self.nodes)
+        started = {}                    # node -> perf_counter at start (set by the worker)
+
+        def call(name, fn, args):
+            started[name] = time.perf_counter()
+            if initializer is not None:
+                initializer()
+            return fn(*args)
+
+        def submit(name, fn, args, timeout):
+            pool = shared_pool()
+            running[pool.submit(call, name, fn, args)] = (name, fn, args, timeout, pool)
+
+        while waiting or running:
+            for name, fn, args, timeout in self._ready(waiting, results, t0):
+                submit(name, fn, args, timeout)
+
+            if not running:
+                continue
+
+            # Nodes still queued on a retired pool move to the current one
+            current = shared_pool()
+            for future, (name, fn, args, timeout, pool) in list(running.items()):
+                if pool is not current and future.cancel():
+                    del running[future]
+                    submit(name, fn, args, timeout)
+
+            now = time.perf_counter()
+            deadlines = [t0 + to for _, _, _, to, _ in running.values() if to]
+            wait_for = max(0.0, min(deadlines) - now) if deadlines else None
+            if any(n not in started for n, *_ in running.values()):
+                wait_for = POLL_S if wait_for is None else min(wait_for, POLL_S)
+            done, _ = wait(running, timeout=wait_for, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                name = running.pop(future)[0]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = e
+                self._finish(name, result, results, t0, started.get(name))
+
+            now = time.perf_counter()
+            for future, (name, _, _, timeout, pool) in list(running.items()):
+                if timeout and now - t0 >= timeout:
+                    del running[future]
+                    if not future.cancel():
+                        # Abandoned: its late result never reaches results/timings,
+                        # and its worker is lost to the pool
+                        _retire_pool(pool)
+                    self._finish(name, _timed_out(name, timeout), results, t0, started.get(name))
+        return results
+
+    def _finish(self, name, result, results, t0, start):
+        results[name] = result
+        end = perf.elapsed_ms(t0)
+        self.timings[name] = {
+            'Start': (start - t0) * 1000 if start is not None else end,
+            'End': end,
+            'Deps': self.nodes[name][2],
+            'Status': ('timeout' if isinstance(result, NodeTimeout) else
+                       'skipped' if isinstance(result, SkippedNode) else
+                       'error' if isinstance(result, Exception) else 'ok'),
+        }
+
+
+def _timed_out(name, timeout):
+    return NodeTimeout(f"{name}: not done {timeout} s after the graph started")
+
+
+def critical_path(timings):
+    """
+    (nodes, ms) of the longest chain of dependent nodes by their
+    measured durations — the floor for the graph's wall time.
+    """
+    length, parent = {}, {}
+    for name, t in sorted(timings.items(), key=lambda kv: kv[1]['End']):
+        own = t['End'] - t['Start']
+        best = max(t['Deps'], key=lambda d: length.get(d, 0.0), default=None)
+        length[name] = own + (length.get(best, 0.0) if best is not None else 0.0)
+        parent[name] = best
+
+    if not length:
+        return [], 0.0
+    node = max(length, key=length.get)
+    total, path = length[node], []
+    while node is not None:
+        path.append(node)
+        node = parent[node]
+    return path[::-1], total
+
+
+def summarize(stats):
+    """
+    {'wall_ms', 'steps_ms', 'critical_ms', 'critical_path'} of one
+    perf.graph_timings() entry.
+    """
+    path, floor = critical_path(stats['Nodes'])
+    return {
+        'wall_ms': stats['Wall'],
+        'steps_ms': sum(t['End'] - t['Start'] for t in stats['Nodes'].values()),
+        'critical_ms': floor,
+        'critical_path': path,
+    }
+
+
+if __name__ == "__main__":
+    # Diamond + independent branches of sleeping steps
+    def step(ms, *_):
+        time.sleep(ms / 1000)
+        return ms
+
+    g = Graph("demo", timeout=1.0)
+    g.add('session', step, 200)
+    g.add('tel1', step, 100, deps=('session',))
+    g.add('tel2', step, 150, deps=('session',))
+    g.add('compare', step, 100, deps=('tel1', 'tel2'))
+    g.add('corners', step, 50, deps=('compare',))
+    for i in range(5):
+        g.add(f'panel{i}', step, 80, deps=('corners',))
+    g.add('stuck', step, 5000, deps=('session',))
+    g.add('after_stuck', step, 10, deps=('stuck',))
+
+    g.run()
+    s = summarize(perf.graph_timings()['demo'])
+
+    for name, t in g.timings.items():
+        print(f"  {name:<12} {t['Start']:7.1f} → {t['End']:7.1f} ms  {t['Status']}")
+    print(f"sum of steps {s['steps_ms']:.0f} ms, wall {s['wall_ms']:.0f} ms, "
+          f"critical path {s['critical_ms']:.0f} ms ({' → '.join(s['critical_path'])})")
@@ -0,0 +1,246 @@
+# ============================================================
+# LapVis v2 — Season Aggregates
+# Materialized per-driver / per-circuit leaderboards
+# ============================================================
+#
+# Every ingested session contributes one row of metrics per driver
+# (fastest lap vs the field). Aggregates keep running sums and counts, so
+# ingesting a session only adds its rows — re-ingesting one first
+# subtracts its previous rows — and nothing is recomputed from scratch.
+#
+# Build / extend (only sessions not yet ingested are loaded):
+#     python season.py 2024
+#
+# Query:
+#     aggs = load_aggregates()
+#     leaderboard(aggs, 2024, 'SlowGain')
+
+import json
+import logging
+import os
+import sys
+import warnings
+
+import numpy as np
+
+from alignment import distance_grid, lap_arrays, reference_length, stack_lap_times, stack_laps
+from consistency import match_onsets
+from kernels import gapped_onsets
+from telemetry import MissingTelemetry
+
+log = logging.getLogger(__name__)
+
+SEASON_PATH = "season_aggregates.json"
+
+# Corner type by field speed at the braking point (as the dashboard's
+# Corner Type Performance panel)
+SLOW_CORNER = 120       # km/h
+FAST_CORNER = 220       # km/h
+CORNER_WINDOW = 40.0    # m either side of the braking point
+
+# metric -> (label, higher is better)
+METRICS = {
+    'SlowGain': ("Slow-corner gain (s / corner)", True),
+    'MediumGain': ("Medium-corner gain (s / corner)", True),
+    'FastGain': ("Fast-corner gain (s / corner)", True),
+    'BrakeLateness': ("Brake point vs field (m, + = later)", True),
+    'PoleDelta': ("Q delta to pole (s)", False),
+}
+
+
+# --------------------------------------------------------
+# Metrics of one session
+# --------------------------------------------------------
+def fastest_laps(session):
+    """Each driver's fastest lap as lap_arrays(), plus codes and lap times."""
+    drivers, times, laps, skipped = [], [], [], []
+    for drv in session.laps['Driver'].unique():
+        lap = session.laps.pick_drivers(drv).pick_fastest()
+        if lap is None or lap['LapTime'] != lap['LapTime']:
+            continue
+        try:
+            tel = lap_arrays(lap)
+        except MissingTelemetry as e:
+            skipped.append(f"{drv}: {e}")
+            continue
+        if len(tel['Distance']) < 2:
+            skipped.append(f"{drv}: under 2 samples")
+            continue
+        drivers.append(drv)
+        times.append(lap['LapTime'].total_seconds())
+        laps.append(tel)
+
+    if skipped:
+        log.warning("skipped fastest laps without telemetry: %s", "; ".join(skipped))
+    return np.array(drivers), np.array(times, dtype=float), laps
+
+
+def session_metrics(drivers, times, laps, qualifying=False, step=5.0):
+    """
+    {driver: {metric: value}} for one session's fastest laps.
+    Gains are field median minus the driver's time through each corner
+    window, averaged per corner type; NaN where a driver has no sample.
+    """
+    grid = distance_grid(reference_length(laps), step)
+    speed = stack_laps(laps, grid, ('Speed',))['Speed']
+    elapsed = stack_lap_times(laps, grid, times)
+
+    # Reference corners: braking zones of the fastest lap in the session
+    ref = laps[int(np.argmin(times))]
+    d = ref['Distance'] * (grid[-1] / ref['Distance'][-1])
+    corners = d[gapped_onsets(d, np.flatnonzero(ref['BrakeOnset'] > 0.5), 80.0)]
+
+    lo = np.searchsorted(grid, corners - CORNER_WINDOW).clip(0, len(grid) - 1)
+    hi = np.searchsorted(grid, corners + CORNER_WINDOW).clip(0, len(grid) - 1)
+    corner_time = elapsed[:, hi] - elapsed[:, lo]
+    gain = np.median(corner_time, axis=0) - corner_time
+
+    entry_speed = np.median(speed[:, np.searchsorted(grid, corners).clip(0, len(grid) - 1)], axis=0)
+    kinds = {
+        'SlowGain': entry_speed < SLOW_CORNER,
+        'MediumGain': (entry_speed >= SLOW_CORNER) & (entry_speed < FAST_CORNER),
+        'FastGain': entry_speed >= FAST_CORNER,
+    }
+
+    onsets = match_onsets(laps, corners, grid[-1])
+    with warnings.catch_warnings():
+        # Corners / drivers with no matched onset are all-NaN -> NaN
+        warnings.simplefilter('ignore', RuntimeWarning)
+        lateness = onsets - np.nanmedian(onsets, axis=0)
+
+    columns = {metric: gain[:, mask].mean(axis=1) if mask.any() else np.full(len(laps), np.nan)
+               for metric, mask in kinds.items()}
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        columns['BrakeLateness'] = np.nanmean(lateness, axis=1) if len(corners) else np.full(len(laps), np.nan)
+    columns['PoleDelta'] = times - times.min() if qualifying else np.full(len(laps), np.nan)
+
+    return {str(drv): {m: float(columns[m][i]) for m in METRICS} for i, drv in enumerate(drivers)}
+
+
+def session_rows(session, session_type):
+    drivers, times, laps = fastest_laps(session)
+    if len(laps) < 2:
+        return {}
+    return session_metrics(drivers, times, laps, qualifying=session_type.startswith('Q'))
+
+
+# --------------------------------------------------------
+# Aggregates: running sums / counts
+# --------------------------------------------------------
+def empty_aggregates():
+    # drivers:  {year: {driver: {metric: [sum, count]}}}
+    # circuits: {event: {driver: {metric: [sum, count]}}}
+    return {'sessions': {}, 'drivers': {}, 'circuits': {}}
+
+
+def _accumulate(bucket, rows, sign):
+    for drv, metrics in rows.items():
+        cells = bucket.setdefault(drv, {})
+        for metric, value in metrics.items():
+            if value != value:          # NaN: no sample for this metric
+                continue
+            total, count = cells.get(metric, (0.0, 0))
+            cells[metric] = [total + sign * value, count + sign]
+
+
+def add_session(aggs, key, year, event, session_type, rows):
+    """
+    Fold a session's rows into the aggregates, replacing any earlier
+    rows of the same session key.
+    """
+    old = aggs['sessions'].get(key)
+    if old is not None:
+        _accumulate(aggs['drivers'].setdefault(str(old['Year']), {}), old['Rows'], -1)
+        _accumulate(aggs['circuits'].setdefault(old['Event'], {}), old['Rows'], -1)
+
+    _accumulate(aggs['drivers'].setdefault(str(year), {}), rows, +1)
+    _accumulate(aggs['circuits'].setdefault(event, {}), rows, +1)
+    aggs['sessions'][key] = {'Year': int(year), 'Event': event,
+                             'Session': session_type, 'Rows': rows}
+    return aggs
+
+
+def load_aggregates(path=SEASON_PATH):
+    if not os.path.exists(path):
+        return empty_aggregates()
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_aggregates(aggs, path=SEASON_PATH):
+    tmp = path + ".tmp"
+    with open(tmp, 'w') as f:
+        json.dump(aggs, f)
+    os.replace(tmp, path)
+
+
+# --------------------------------------------------------
+# Queries
+# --------------------------------------------------------
+def _means(cells):
+    return {m: (total / count if count else np.nan) for m, (total, count) in cells.items()}
+
+
+def leaderboard(aggs, year, metric):
+    """
+    Drivers of a season ranked by a metric, best first:
+    columns Driver, Value, Sessions.
+    """
+    bucket = aggs['drivers'].get(str(year), {})
+    rows = [(drv, cells[metric][0] / cells[metric][1], cells[metric][1])
+            for drv, cells in bucket.items() if cells.get(metric, (0, 0))[1] > 0]
+    rows.sort(key=lambda r: r[1], reverse=METRICS[metric][1])
+    return {
+        'Driver': [r[0] for r in rows],
+        'Value': [r[1] for r in rows],
+        'Sessions': [r[2] for r in rows],
+    }
+
+
+def driver_summary(aggs, year, driver):
+    """{metric: season mean} of one driver."""
+    return _means(aggs['drivers'].get(str(year), {}).get(driver, {}))
+
+
+def circuit_table(aggs, event):
+    """{driver: {metric: mean}} at one circuit over every ingested year."""
+    return {drv: _means(cells) for drv, cells in aggs['circuits'].get(event, {}).items()}
+
+
+# --------------------------------------------------------
+# Build from FastF1
+# --------------------------------------------------------
+def ingest_year(aggs, year, sessions=('Q',), force=False):
+    import fastf1
+
+    from laptable import session_key
+
+    schedule = fastf1.get_event_schedule(year, include_testing=False)
+    for event in schedule['EventName']:
+        for session_type in sessions:
+            key = session_key(year, event, session_type)
+            if key in aggs['sessions'] and not force:
+                continue
+            try:
+                s = fastf1.get_session(year, event, session_type)
+                s.load(weather=False, messages=False)
+            except Exception as e:
+                print(f"  skipped {year} {event} {session_type}: {e}")
+                continue
+            aggs = add_session(aggs, key, year, event, session_type,
+                               session_rows(s, session_type))
+            print(f"{year} {event} {session_type}: {len(aggs['sessions'])} sessions")
+    return aggs
+
+
+if __name__ == "__main__":
+    import fastf1
+
+    fastf1.Cache.enable_cache("fastf1_cache")
+    years = [int(a) for a in sys.argv[1:3]] or [2024, 2024]
+
+    aggs = load_aggregates()
+    for year in range(years[0], years[-1] + 1):
+        aggs = ingest_year(aggs, year)
+        save_aggregates(aggs)
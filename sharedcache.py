@@ -0,0 +1,251 @@
+# ============================================================
+# LapVis — Shared Cache Tier
+# Processed laps / comparisons shared by every dashboard replica
+# ============================================================
+#
+# Point every replica at the same directory (NFS / EFS / a shared volume):
+#
+#     LAPVIS_SHARED_CACHE=/mnt/lapvis-cache streamlit run app.py
+#
+# Entries are written atomically (temp file + rename) and computed under
+# an exclusive file lock, so one session is processed once across the
+# fleet: the first replica computes it, the others block on the lock and
+# then read the result. flock() locks die with their process, so a
+# crashed replica never leaves a stale lock behind.
+#
+# The directory is capped at LAPVIS_SHARED_CACHE_MAX_MB (default 2048):
+# after each write the least recently read entries are deleted until it
+# fits. Unreadable entries (truncated, or pickled by an incompatible
+# version) are logged, deleted and recomputed.
+#
+# Without the variable every loader just computes (st.cache_data still
+# caches per replica). "memory://" selects an in-process stand-in with
+# the same semantics, for single-process runs and load tests.
+
+import contextlib
+import glob
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+import threading
+
+try:
+    import fcntl
+except ImportError:         # Windows: locks only within one process
+    fcntl = None
+
+# Bump when the processing behind any cached entry changes
+CACHE_VERSION = 3
+
+ENV_VAR = "LAPVIS_SHARED_CACHE"
+MAX_MB_VAR = "LAPVIS_SHARED_CACHE_MAX_MB"
+DEFAULT_MAX_MB = 2048
+PRUNE_TO = 0.8          # fraction of the cap left after a prune
+
+log = logging.getLogger(__name__)
+
+
+def cache_key(namespace, *parts):
+    """
+    Stable key for the same inputs on every replica and Python version
+    (no hash() randomisation): '<namespace>-<sha256 of version + parts>'.
+    """
+    raw = "|".join([str(CACHE_VERSION), namespace] + [str(p) for p in parts])
+    return f"{namespace}-{hashlib.sha256(raw.encode()).hexdigest()[:32]}"
+
+
+# --------------------------------------------------------
+# Backends: get / put / lock(key)
+# --------------------------------------------------------
+class FileStore:
+    """
+    One pickle file per key under `root`, plus a '.lock' file per key.
+    Holds at most `max_bytes` of entries (None: unbounded). The directory
+    is only scanned when the size this process tracks (its last scan plus
+    its own writes since) crosses the cap.
+    """
+
+    def __init__(self, root, max_bytes=None):
+        self.root = root
+        self.max_bytes = max_bytes
+        os.makedirs(root, exist_ok=True)
+        self._local = {}
+        self._local_lock = threading.Lock()
+        self._size = None               # tracked bytes of entries; None = not scanned yet
+        self._size_lock = threading.Lock()
+
+    def _path(self, key):
+        return os.path.join(self.root, key + ".pkl")
+
+    def _lock_path(self, key):
+        return os.path.join(self.root, key + ".lock")
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            # Truncated / incompatible pickle: a miss, recomputed and rewritten
+            log.warning("dropping unreadable shared cache entry %s: %r", path, e)
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(path)
+            return None
+
+        # Read time drives eviction (least recently read goes first)
+        with contextlib.suppress(FileNotFoundError):
+            os.utime(path)
+        return value
+
+    def put(self, key, value):
+        fd, tmp = tempfile.mkstemp(dir=self.root, prefix=key, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            size = os.path.getsize(tmp)
+            os.replace(tmp, self._path(key))
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        if self.max_bytes is None:
+            return
+
+        with self._size_lock:
+            if self._size is not None:
+                self._size += size
+            if self._size is None or self._size > self.max_bytes:
+                # Down to the low-water mark, so a full cache is not
+                # rescanned on every write
+                self._size = self.prune(int(self.max_bytes * PRUNE_TO))
+
+    def prune(self, max_bytes):
+        """
+        Delete least recently read entries, and their lock files, until
+        the total fits. Returns the bytes left.
+        """
+        entries = []
+        for path in glob.glob(os.path.join(self.root, "*.pkl")):
+            with contextlib.suppress(FileNotFoundError):
+                st = os.stat(path)
+                entries.append((st.st_mtime, st.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        kept = set()
+        for _, size, path in sorted(entries):
+            if total <= max_bytes:
+                kept.add(path)
+                continue
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(path)
+            total -= size
+
+        # Lock files of evicted entries (and of computations that never
+        # wrote one), unless someone holds them right now
+        for lock in glob.glob(os.path.join(self.root, "*.lock")):
+            if lock[:-len(".lock")] + ".pkl" not in kept:
+                self._drop_lock_file(lock)
+        return total
+
+    @staticmethod
+    def _drop_lock_file(path):
+        if fcntl is None:
+            return
+        try:
+            with open(path, 'a') as f:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                # A process that opened it before the unlink may still lock
+                # the old inode: at worst it computes the value once more
+                os.unlink(path)
+        except (BlockingIOError, FileNotFoundError):
+            pass
+
+    @contextlib.contextmanager
+    def lock(self, key):
+        with self._local_lock:
+            local = self._local.setdefault(key, threading.Lock())
+
+        with local:
+            if fcntl is None:
+                yield
+                return
+            with open(self._lock_path(key), 'a') as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class MemoryStore:
+    """
+    In-process stand-in for a key-value backend (same interface).
+    """
+
+    def __init__(self):
+        self._data = {}
+        self._locks = {}
+        self._guard = threading.Lock()
+
+    def get(self, key):
+        return self._data.get(key)
+
+    def put(self, key, value):
+        self._data[key] = value
+
+    @contextlib.contextmanager
+    def lock(self, key):
+        with self._guard:
+            lock = self._locks.setdefault(key, threading.Lock())
+        with lock:
+            yield
+
+
+def open_store(location):
+    """'memory://' -> MemoryStore, a directory path -> FileStore, '' -> None."""
+    if not location:
+        return None
+    if location == "memory://":
+        return MemoryStore()
+    max_mb = float(os.environ.get(MAX_MB_VAR, DEFAULT_MAX_MB))
+    return FileStore(location, max_bytes=int(max_mb * 1024 * 1024))
+
+
+# --------------------------------------------------------
+# Single-flight lookup
+# --------------------------------------------------------
+def get_or_compute(store, key, compute):
+    """
+    Value for `key`, computing it at most once across everyone sharing
+    the store. A None store just computes.
+    """
+    if store is None:
+        return compute()
+
+    value = store.get(key)
+    if value is not None:
+        return value
+
+    with store.lock(key):
+        # Someone else may have finished while we waited for the lock
+        value = store.get(key)
+        if value is None:
+            value = compute()
+            store.put(key, value)
+    return value
+
+
+_STORE = None
+_STORE_LOCK = threading.Lock()
+
+
+def shared_store():
+    """The process-wide store configured by LAPVIS_SHARED_CACHE."""
+    global _STORE
+    with _STORE_LOCK:
+        if _STORE is None:
+            _STORE = open_store(os.environ.get(ENV_VAR, "")) or False
+    return _STORE or None
@@ -0,0 +1,269 @@
+# ============================================================
+# LapVis v2 — Telemetry Engine
+# Native merge/resample of car + position data (NumPy only)
+# ============================================================
+#
+# Replaces Lap.get_telemetry() on the dashboard hot path. Works on the
+# raw session arrays of a driver: sorted-time merge of car and position
+# samples, linear interpolation for continuous channels and forward-fill
+# for discrete ones, then integrated Distance.
+#
+# Validate + benchmark against FastF1:
+#     python telemetry.py 2023 Monaco Q
+# tests/test_telemetry.py runs the same checks on the load-test fixture
+# cache when it is there.
+
+import sys
+import time
+
+import numpy as np
+
+from channels import add_derived_channels
+
+CAR_CONTINUOUS = ('Speed', 'RPM', 'Throttle')
+CAR_DISCRETE = ('Brake', 'nGear', 'DRS')
+POS_CONTINUOUS = ('X', 'Y', 'Z')
+
+# get_telemetry() channels this engine reproduces. Not produced:
+#   DriverAhead, DistanceToDriverAhead  need every other driver's data and
+#                                       dominate get_telemetry()'s cost
+#   Date, Status, Source                non-numeric bookkeeping (timestamp,
+#                                       on/off track, sample origin); nothing
+#                                       downstream reads them, and every
+#                                       channel here stays a float/int array
+#                                       (resampling, Arrow export, caches)
+CHANNELS = ('Time', 'SessionTime', 'Distance', 'RelativeDistance') \
+    + CAR_CONTINUOUS + CAR_DISCRETE + POS_CONTINUOUS
+
+
+class MissingTelemetry(ValueError):
+    """A driver or lap without the car / position data to merge."""
+
+
+def _seconds(series):
+    return series.dt.total_seconds().values
+
+
+def driver_arrays(session, driver_number):
+    """
+    Raw car + position arrays of one driver for the whole session.
+    SessionTime in seconds; build once per driver and reuse for every lap.
+    """
+    if driver_number not in session.car_data or driver_number not in session.pos_data:
+        raise MissingTelemetry(f"no car/position data for driver {driver_number}")
+    car = session.car_data[driver_number]
+    pos = session.pos_data[driver_number]
+
+    arrays = {
+        'car': {'SessionTime': _seconds(car['SessionTime'])},
+        'pos': {'SessionTime': _seconds(pos['SessionTime'])},
+    }
+    for ch in CAR_CONTINUOUS:
+        arrays['car'][ch] = car[ch].values.astype(float)
+    for ch in CAR_DISCRETE:
+        arrays['car'][ch] = car[ch].values
+    for ch in POS_CONTINUOUS:
+        arrays['pos'][ch] = pos[ch].values.astype(float)
+
+    return arrays
+
+
+def _window(source, start, end, pad=1):
+    # Samples inside [start, end] plus `pad` samples either side
+    t = source['SessionTime']
+    lo = max(np.searchsorted(t, start, side='left') - pad, 0)
+    hi = min(np.searchsorted(t, end, side='right') + pad, len(t))
+    return {ch: v[lo:hi] for ch, v in source.items()}
+
+
+def _covers(t, start, end):
+    # Any sample inside [start, end] (the padding alone does not count)
+    return bool(np.any((t >= start) & (t <= end)))
+
+
+def _forward_fill(t_src, values, t):
+    # Last known sample at or before each t (first sample fills the head)
+    idx = np.searchsorted(t_src, t, side='right') - 1
+    return values[idx.clip(0, len(values) - 1)]
+
+
+def _nearest(t_src, values, t):
+    if len(t_src) == 1:
+        return np.repeat(values, len(t))
+    idx = np.searchsorted(t_src, t).clip(1, len(t_src) - 1)
+    left_closer = (t - t_src[idx - 1]) <= (t_src[idx] - t)
+    return values[idx - left_closer]
+
+
+def merge_lap(arrays, start, end, rate='native', discrete='ffill'):
+    """
+    Merge one lap of car + position data onto a single time base.
+
+    arrays   -> driver_arrays() of the lap's driver
+    start    -> lap start, session seconds (LapStartTime)
+    end      -> lap end, session seconds (Time)
+    rate     -> 'native' (union of car and pos samples) or a frequency in Hz
+    discrete -> 'ffill' (as FastF1) or 'nearest' for Brake/nGear/DRS
+
+    Raises MissingTelemetry for a lap without start/end time or samples.
+    """
+    if not (np.isfinite(start) and np.isfinite(end)):
+        raise MissingTelemetry("lap has no start/end time")
+
+    car = _window(arrays['car'], start, end)
+    pos = _window(arrays['pos'], start, end)
+    car_t = car['SessionTime']
+    pos_t = pos['SessionTime']
+    if not (_covers(car_t, start, end) and _covers(pos_t, start, end)):
+        raise MissingTelemetry(f"no car/position samples in {start:.1f}-{end:.1f} s")
+
+    if rate == 'native':
+        t = np.union1d(car_t, pos_t)
+        t = np.concatenate(([start], t[(t > start) & (t < end)], [end]))
+    else:
+        t = np.append(np.arange(start, end, 1.0 / rate), end)
+
+    out = {'SessionTime': t, 'Time': t - start}
+
+    for ch in CAR_CONTINUOUS:
+        out[ch] = np.interp(t, car_t, car[ch])
+    for ch in POS_CONTINUOUS:
+        out[ch] = np.interp(t, pos_t, pos[ch])
+
+    pick = _forward_fill if discrete == 'ffill' else _nearest
+    for ch in CAR_DISCRETE:
+        out[ch] = pick(car_t, car[ch], t)
+
+    # Distance integrated on the car samples (as Telemetry.add_distance),
+    # from 0 at the first one — the padded sample before the lap start
+    # must not put the start below zero
+    dt = np.diff(car_t, prepend=car_t[:1])
+    distance = np.cumsum(car['Speed'] / 3.6 * dt)
+    out['Distance'] = np.interp(t, car_t, distance)
+
+    span = out['Distance'][-1] - out['Distance'][0]
+    out['RelativeDistance'] = (out['Distance'] - out['Distance'][0]) / (span or 1.0)
+
+    return out
+
+
+def resample_distance(tel, step):
+    """
+    Resample merged telemetry to a fixed distance step (m).
+    """
+    d = tel['Distance']
+    grid = np.arange(d[0], d[-1], step)
+
+    out = {}
+    for ch, values in tel.items():
+        if ch in CAR_DISCRETE:
+            out[ch] = _forward_fill(d, values, grid)
+        else:
+            out[ch] = np.interp(grid, d, values)
+    out['Distance'] = grid
+
+    return out
+
+
+def lap_telemetry(lap, arrays=None, rate='native', step=None):
+    """
+    Drop-in for lap.get_telemetry(): dict of NumPy arrays, Time in seconds
+    from the lap start, with the derived channels of channels.py added.
+    Channels are CHANNELS — no Date, Status, Source, DriverAhead or
+    DistanceToDriverAhead.
+    Pass `arrays` to reuse one driver's raw arrays across many laps;
+    `step` resamples to a fixed distance step (m).
+    """
+    if arrays is None:
+        arrays = driver_arrays(lap.session, lap['DriverNumber'])
+
+    tel = merge_lap(arrays,
+                    lap['LapStartTime'].total_seconds(),
+                    lap['Time'].total_seconds(),
+                    rate=rate)
+
+    if step is not None:
+        tel = resample_distance(tel, step)
+
+    return add_derived_channels(tel)
+
+
+# --------------------------------------------------------
+# Validation against Lap.get_telemetry()
+# --------------------------------------------------------
+TOLERANCE = {
+    'Speed': 2.0,        # km/h
+    'RPM': 150.0,
+    'Throttle': 2.0,     # %
+    'X': 30.0,           # 1/10 m (FastF1 uses quadratic interpolation)
+    'Y': 30.0,
+    'Z': 30.0,
+    'Distance': 5.0,     # m
+    'Brake': 0.0,
+    'nGear': 0.0,
+    'DRS': 0.0,
+}
+
+
+def validate(lap, within=0.99):
+    """
+    Compare the native engine with lap.get_telemetry() on FastF1's own time
+    base. Returns {channel: fraction of samples within TOLERANCE}.
+    """
+    ref = lap.get_telemetry()
+    ours = lap_telemetry(lap)
+    t = _seconds(ref['Time'])
+
+    report = {}
+    for ch, tol in TOLERANCE.items():
+        expected = ref[ch].values.astype(float)
+        if ch in CAR_DISCRETE:
+            got = _forward_fill(ours['Time'], ours[ch], t).astype(float)
+        else:
+            got = np.interp(t, ours['Time'], ours[ch])
+        report[ch] = float(np.mean(np.abs(got - expected) <= tol))
+
+    report['ok'] = all(v >= within for v in report.values())
+    return report
+
+
+def benchmark(session, n_laps=20):
+    """
+    Seconds per lap for lap.get_telemetry() vs. the native engine.
+    """
+    laps = session.laps.pick_wo_box()
+    laps = laps[laps['LapTime'].notna()].iloc[:n_laps]
+
+    t0 = time.perf_counter()
+    for _, lap in laps.iterlaps():
+        lap.get_telemetry()
+    fastf1_time = (time.perf_counter() - t0) / len(laps)
+
+    t0 = time.perf_counter()
+    cache = {}
+    for _, lap in laps.iterlaps():
+        drv = lap['DriverNumber']
+        if drv not in cache:
+            cache[drv] = driver_arrays(session, drv)
+        lap_telemetry(lap, cache[drv])
+    native_time = (time.perf_counter() - t0) / len(laps)
+
+    return fastf1_time, native_time
+
+
+if __name__ == "__main__":
+    import fastf1
+
+    year, race, session_type = (sys.argv[1:4] if len(sys.argv) > 3
+                                else ('2023', 'Monaco', 'Q'))
+    fastf1.Cache.enable_cache("fastf1_cache")
+    session = fastf1.get_session(int(year), race, session_type)
+    session.load()
+
+    for drv in session.laps['Driver'].unique()[:5]:
+        lap = session.laps.pick_drivers(drv).pick_fastest()
+        print(drv, validate(lap))
+
+    ff1, native = benchmark(session)
+    print(f"get_telemetry(): {ff1 * 1000:.1f} ms/lap   "
+          f"native: {native * 1000:.1f} ms/lap   ({ff1 / native:.0f}x)")
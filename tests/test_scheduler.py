@@ -0,0 +1,40 @@
+import threading
+import time
+
+from scheduler import POOL_WORKERS, Graph, NodeTimeout, SkippedNode
+
+
+def test_hung_nodes_do_not_block_the_next_graph():
+    release = threading.Event()
+    try:
+        # Enough hung nodes to hold every worker, plus one queued behind them
+        hung = Graph("hung", timeout=0.3)
+        for i in range(POOL_WORKERS + 1):
+            hung.add(f'stuck{i}', release.wait)
+        hung.add('after', lambda _: 'ran', deps=('stuck0',))
+
+        start = time.perf_counter()
+        results = hung.run()
+        assert time.perf_counter() - start < 2
+        assert all(isinstance(results[f'stuck{i}'], NodeTimeout) for i in range(POOL_WORKERS + 1))
+        assert isinstance(results['after'], SkippedNode)
+
+        # The abandoned workers are not the next graph's problem
+        after = Graph("after_hung", timeout=2)
+        after.add('a', lambda: 1)
+        after.add('b', lambda a: a + 1, deps=('a',))
+        assert after.run() == {'a': 1, 'b': 2}
+    finally:
+        release.set()
+
+
+def test_timeout_counts_from_run_start():
+    g = Graph("deadline", workers=0, timeout=0.1)
+    g.add('slow', time.sleep, 0.2)
+    g.add('late', lambda _: 'ran', deps=('slow',), timeout=5)
+    g.add('next', lambda: 'ran')
+
+    results = g.run()
+    assert results['slow'] is None
+    assert results['late'] == 'ran'
+    assert isinstance(results['next'], NodeTimeout)
@@ -0,0 +1,63 @@
+import os
+
+import numpy as np
+import pytest
+
+from loadtest import FIXTURE_CACHE, FIXTURE_SESSIONS
+from telemetry import MissingTelemetry, benchmark, merge_lap, validate
+
+
+def synthetic_arrays(start=100.0, end=180.0):
+    # Car at ~4 Hz, position at ~3.7 Hz, both starting before the lap
+    car_t = np.arange(start - 0.7, end + 0.5, 0.27)
+    pos_t = np.arange(start - 0.5, end + 0.5, 0.22)
+    speed = 200 + 80 * np.sin(car_t / 7)
+    return {
+        'car': {'SessionTime': car_t, 'Speed': speed, 'RPM': speed * 50,
+                'Throttle': np.clip(speed - 180, 0, 100),
+                'Brake': speed < 150, 'nGear': (speed // 40).astype(int),
+                'DRS': np.zeros(len(car_t), dtype=int)},
+        'pos': {'SessionTime': pos_t, 'X': np.cos(pos_t / 13) * 1e4,
+                'Y': np.sin(pos_t / 13) * 1e4, 'Z': np.zeros(len(pos_t))},
+    }
+
+
+@pytest.mark.parametrize('rate', ['native', 10])
+def test_distance_starts_at_zero_and_never_decreases(rate):
+    out = merge_lap(synthetic_arrays(), 100.0, 180.0, rate=rate)
+    d = out['Distance']
+    assert d[0] >= 0
+    assert d[0] < 0.7 * 280 / 3.6      # at most the padded sample's gap
+    assert np.all(np.diff(d) >= 0)
+
+
+def test_lap_without_samples_is_missing_telemetry():
+    with pytest.raises(MissingTelemetry):
+        merge_lap(synthetic_arrays(), 500.0, 580.0)
+    with pytest.raises(MissingTelemetry):
+        merge_lap(synthetic_arrays(), float('nan'), 180.0)
+
+
+def fixture_session():
+    fastf1 = pytest.importorskip("fastf1")
+    cache = os.environ.get("LAPVIS_CACHE_DIR", FIXTURE_CACHE)
+    if not os.path.isdir(cache):
+        pytest.skip(f"no FastF1 fixture cache at {cache} (python loadtest.py --record)")
+
+    fastf1.Cache.enable_cache(cache)
+    fastf1.Cache.offline_mode(True)
+    session = fastf1.get_session(*FIXTURE_SESSIONS[0])
+    session.load()
+    return session
+
+
+def test_matches_get_telemetry():
+    session = fixture_session()
+    for drv in session.laps['Driver'].unique()[:5]:
+        report = validate(session.laps.pick_drivers(drv).pick_fastest())
+        assert report['ok'], (drv, report)
+
+
+def test_faster_than_get_telemetry():
+    fastf1_time, native_time = benchmark(fixture_session(), n_laps=10)
+    assert native_time < fastf1_time